@@ -10,17 +10,20 @@ from sqlalchemy.ext.asyncio import async_engine_from_config
 from alembic import context
 
 from app.core.database import Base
+from app.core.ratelimit import rate_limit_buckets
 
 # Импорт всех моделей для регистрации в Base.metadata (autogenerate)
 from app.modules.agents.models import Agent
-from app.modules.events.models import Event
-from app.modules.integrations.models import Integration
+from app.modules.events.models import Event, EventDailyRollup
+from app.modules.integrations.models import Integration, IntegrationCursor
 from app.modules.tenants.models import Tenant
 from app.modules.threads.models import Message, Thread
+from migrations.framework import checkpoints
 
 config = context.config
 
-if config.config_file_name is not None:
+# configure_logger=False: вызов из кода со своим выводом (scripts/migrate.py up --dry-run)
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
     fileConfig(config.config_file_name)
 
 # URL из DATABASE_URL, fallback как в app
@@ -41,6 +44,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        transaction_per_migration=True,
     )
 
     with context.begin_transaction():
@@ -48,7 +52,12 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    # Своя транзакция на ревизию: блокировки отпускаются после каждой
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        transaction_per_migration=True,
+    )
 
     with context.begin_transaction():
         context.run_migrations()
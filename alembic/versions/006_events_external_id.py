@@ -0,0 +1,37 @@
+"""Events: external_id with unique (tenant_id, integration_id, external_id).
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19
+
+- external_id: provider-side id (Telegram chat_id:message_id etc.), nullable
+- uq_events_tenant_integration_external_id: idempotent webhook ingestion;
+  the unique index is built CONCURRENTLY and attached with
+  ADD CONSTRAINT ... USING INDEX (migrations.online), so event writes are
+  not blocked while it builds
+"""
+from typing import Sequence, Union
+
+from migrations import online
+
+
+revision: str = "006"
+down_revision: Union[str, Sequence[str], None] = "005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    online.execute_with_lock_retries("ALTER TABLE events ADD COLUMN IF NOT EXISTS external_id VARCHAR(255)")
+    online.add_unique_constraint(
+        "uq_events_tenant_integration_external_id",
+        "events",
+        ["tenant_id", "integration_id", "external_id"],
+    )
+
+
+def downgrade() -> None:
+    online.execute_with_lock_retries(
+        "ALTER TABLE events DROP CONSTRAINT IF EXISTS uq_events_tenant_integration_external_id"
+    )
+    online.execute_with_lock_retries("ALTER TABLE events DROP COLUMN IF EXISTS external_id")
@@ -0,0 +1,43 @@
+"""Integration cursors: checkpoints for pull-based ingestion (Telegram long polling).
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19
+
+- integration_cursors: (tenant_id, integration_key, stream) -> position
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+
+revision: str = "007"
+down_revision: Union[str, Sequence[str], None] = "006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "integration_cursors",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("tenant_id", sa.String(64), nullable=False),
+        sa.Column("integration_key", sa.String(64), nullable=False),
+        sa.Column("stream", sa.String(255), nullable=False),
+        sa.Column("position", sa.BigInteger, nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=True),
+        sa.UniqueConstraint(
+            "tenant_id",
+            "integration_key",
+            "stream",
+            name="uq_integration_cursors_tenant_key_stream",
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("integration_cursors")
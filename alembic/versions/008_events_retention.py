@@ -0,0 +1,61 @@
+"""Events retention: per-tenant window, daily rollups, time indexes.
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19
+
+- tenants.event_retention_days: per-tenant raw events window (NULL: default)
+- event_daily_rollups: counts per (tenant, integration, event_type, day)
+- ix_events_tenant_id_created_at replaces ix_events_tenant_id (same leading column)
+- ix_events_created_at_brin: BRIN on created_at for time-range scans
+
+The events indexes are built CONCURRENTLY outside the migration transaction
+(migrations.online): ingest is not blocked while they build.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+from migrations import online
+
+
+revision: str = "008"
+down_revision: Union[str, Sequence[str], None] = "007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("tenants", sa.Column("event_retention_days", sa.Integer, nullable=True))
+
+    op.create_table(
+        "event_daily_rollups",
+        sa.Column("tenant_id", sa.String(64), primary_key=True),
+        sa.Column("integration_id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("event_type", sa.String(64), primary_key=True),
+        sa.Column("day", sa.Date, primary_key=True),
+        sa.Column("count", sa.BigInteger, nullable=False, server_default="0"),
+    )
+
+    online.create_index_concurrently(
+        "ix_events_tenant_id_created_at",
+        "events",
+        ["tenant_id", "created_at", "id"],
+    )
+    online.drop_index_concurrently("ix_events_tenant_id", "events")
+    online.create_index_concurrently(
+        "ix_events_created_at_brin",
+        "events",
+        ["created_at"],
+        postgresql_using="brin",
+    )
+
+
+def downgrade() -> None:
+    online.drop_index_concurrently("ix_events_created_at_brin", "events")
+    online.create_index_concurrently("ix_events_tenant_id", "events", ["tenant_id"])
+    online.drop_index_concurrently("ix_events_tenant_id_created_at", "events")
+    op.drop_table("event_daily_rollups")
+    op.drop_column("tenants", "event_retention_days")
@@ -0,0 +1,54 @@
+"""Agents: unique (tenant_id, origin_type, origin_id) for bulk origin upserts.
+
+Revision ID: 010
+Revises: 008
+Create Date: 2026-10-19
+
+- Duplicate origins within a tenant keep the oldest agent; the others lose
+  origin_id/origin_type (rows and their messages are kept)
+- uq_agents_tenant_origin replaces ix_agents_origin_type; ix_agents_origin_id
+  stays for lookups without tenant
+
+Built CONCURRENTLY outside the migration transaction (migrations.online):
+writes are not blocked.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from migrations import online
+
+
+revision: str = "010"
+down_revision: Union[str, Sequence[str], None] = "008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        UPDATE agents SET origin_id = NULL, origin_type = NULL
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, row_number() OVER (
+                    PARTITION BY tenant_id, origin_type, origin_id
+                    ORDER BY created_at, id
+                ) AS n
+                FROM agents
+                WHERE origin_id IS NOT NULL AND tenant_id IS NOT NULL
+            ) ranked
+            WHERE n > 1
+        )
+    """)
+    online.create_index_concurrently(
+        "uq_agents_tenant_origin",
+        "agents",
+        ["tenant_id", "origin_type", "origin_id"],
+        unique=True,
+    )
+    online.drop_index_concurrently("ix_agents_origin_type", "agents")
+
+
+def downgrade() -> None:
+    online.create_index_concurrently("ix_agents_origin_type", "agents", ["origin_type"])
+    online.drop_index_concurrently("uq_agents_tenant_origin", "agents")
@@ -0,0 +1,30 @@
+"""Tenants: external_id, the idempotency key of (bulk) provisioning.
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-19
+
+- external_id: caller-supplied tenant key, nullable, unique
+
+The unique index is built CONCURRENTLY and attached with ADD CONSTRAINT ...
+USING INDEX (migrations.online): writes are not blocked while it builds.
+"""
+from typing import Sequence, Union
+
+from migrations import online
+
+
+revision: str = "011"
+down_revision: Union[str, Sequence[str], None] = "010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    online.execute_with_lock_retries("ALTER TABLE tenants ADD COLUMN IF NOT EXISTS external_id VARCHAR(255)")
+    online.add_unique_constraint("tenants_external_id_key", "tenants", ["external_id"])
+
+
+def downgrade() -> None:
+    online.execute_with_lock_retries("ALTER TABLE tenants DROP CONSTRAINT IF EXISTS tenants_external_id_key")
+    online.execute_with_lock_retries("ALTER TABLE tenants DROP COLUMN IF EXISTS external_id")
@@ -0,0 +1,37 @@
+"""Keyset pagination indexes for tenant and agent listings.
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-19
+
+- ix_tenants_created_at_id: GET /tenants/ in (created_at, id) order
+- ix_agents_tenant_id_created_at_id replaces ix_agents_tenant_id
+
+Built CONCURRENTLY outside the migration transaction (migrations.online):
+writes are not blocked.
+"""
+from typing import Sequence, Union
+
+from migrations import online
+
+
+revision: str = "012"
+down_revision: Union[str, Sequence[str], None] = "011"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    online.create_index_concurrently("ix_tenants_created_at_id", "tenants", ["created_at", "id"])
+    online.create_index_concurrently(
+        "ix_agents_tenant_id_created_at_id",
+        "agents",
+        ["tenant_id", "created_at", "id"],
+    )
+    online.drop_index_concurrently("ix_agents_tenant_id", "agents")
+
+
+def downgrade() -> None:
+    online.create_index_concurrently("ix_agents_tenant_id", "agents", ["tenant_id"])
+    online.drop_index_concurrently("ix_agents_tenant_id_created_at_id", "agents")
+    online.drop_index_concurrently("ix_tenants_created_at_id", "tenants")
@@ -0,0 +1,33 @@
+"""Rate limiting: shared token buckets synced by all workers.
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-19
+
+- rate_limit_buckets: key ("<route class>:<tenant>") -> tokens, rate, burst
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "013"
+down_revision: Union[str, Sequence[str], None] = "012"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "rate_limit_buckets",
+        sa.Column("key", sa.String(255), primary_key=True),
+        sa.Column("tokens", sa.Float, nullable=False),
+        sa.Column("rate", sa.Float, nullable=False),
+        sa.Column("burst", sa.Float, nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("rate_limit_buckets")
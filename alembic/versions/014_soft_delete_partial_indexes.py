@@ -0,0 +1,59 @@
+"""Soft delete: hot indexes become partial over active rows.
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-19
+
+ORM selects of BaseEntity models skip soft-deleted rows (app.core.database),
+so listing and lookup indexes only cover deleted_at IS NULL and do not grow
+with deletions:
+
+- ix_tenants_active_created_at_id replaces ix_tenants_created_at_id
+- ix_agents_active_tenant_id_created_at_id replaces ix_agents_tenant_id_created_at_id
+- ix_agents_active_origin_id replaces ix_agents_origin_id
+- ix_threads_active_tenant_id replaces ix_threads_tenant_id
+
+Unique indexes (ON CONFLICT targets), messages indexes (ON DELETE CASCADE,
+purges) and events indexes (retention scans all rows) stay full. Tenants are
+never hard-deleted by the app; a manual tenant delete cascades to agents and
+threads without an index.
+
+Built CONCURRENTLY outside the migration transaction (migrations.online):
+writes are not blocked.
+"""
+from typing import Sequence, Union
+
+from migrations import online
+
+
+revision: str = "014"
+down_revision: Union[str, Sequence[str], None] = "013"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE_WHERE = "deleted_at IS NULL"
+
+# (new partial index, table, columns, replaced full index)
+INDEXES = [
+    ("ix_tenants_active_created_at_id", "tenants", ["created_at", "id"], "ix_tenants_created_at_id"),
+    (
+        "ix_agents_active_tenant_id_created_at_id",
+        "agents",
+        ["tenant_id", "created_at", "id"],
+        "ix_agents_tenant_id_created_at_id",
+    ),
+    ("ix_agents_active_origin_id", "agents", ["origin_id"], "ix_agents_origin_id"),
+    ("ix_threads_active_tenant_id", "threads", ["tenant_id"], "ix_threads_tenant_id"),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns, replaced in INDEXES:
+        online.create_index_concurrently(name, table, columns, where=ACTIVE_WHERE)
+        online.drop_index_concurrently(replaced, table)
+
+
+def downgrade() -> None:
+    for name, table, columns, replaced in reversed(INDEXES):
+        online.create_index_concurrently(replaced, table, columns)
+        online.drop_index_concurrently(name, table)
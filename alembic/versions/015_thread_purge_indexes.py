@@ -0,0 +1,39 @@
+"""Threads: indexes for soft delete with background purge.
+
+Revision ID: 015
+Revises: 014
+Create Date: 2026-10-19
+
+- ix_threads_deleted_at: partial over soft-deleted threads, the purger's queue
+- ix_messages_thread_id_created_at_id replaces ix_messages_thread_id: thread
+  history in order and keyset purge batches; same leading column for
+  ON DELETE CASCADE
+
+Built CONCURRENTLY outside the migration transaction (migrations.online):
+writes are not blocked.
+"""
+from typing import Sequence, Union
+
+from migrations import online
+
+
+revision: str = "015"
+down_revision: Union[str, Sequence[str], None] = "014"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    online.create_index_concurrently(
+        "ix_threads_deleted_at", "threads", ["deleted_at"], where="deleted_at IS NOT NULL"
+    )
+    online.create_index_concurrently(
+        "ix_messages_thread_id_created_at_id", "messages", ["thread_id", "created_at", "id"]
+    )
+    online.drop_index_concurrently("ix_messages_thread_id", "messages")
+
+
+def downgrade() -> None:
+    online.create_index_concurrently("ix_messages_thread_id", "messages", ["thread_id"])
+    online.drop_index_concurrently("ix_messages_thread_id_created_at_id", "messages")
+    online.drop_index_concurrently("ix_threads_deleted_at", "threads")
@@ -0,0 +1,38 @@
+"""Data migrations: checkpoints for resumable batched runs.
+
+Revision ID: 016
+Revises: 015
+Create Date: 2026-10-19
+
+- data_migration_checkpoints: (migration, range_no) -> key range, position,
+  rows, done; advanced in the same transaction as each batch
+  (migrations/framework.py)
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "016"
+down_revision: Union[str, Sequence[str], None] = "015"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "data_migration_checkpoints",
+        sa.Column("migration", sa.String(255), primary_key=True),
+        sa.Column("range_no", sa.Integer, primary_key=True),
+        sa.Column("lower", sa.Text, nullable=False),
+        sa.Column("upper", sa.Text, nullable=False),
+        sa.Column("position", sa.Text, nullable=False),
+        sa.Column("rows", sa.BigInteger, nullable=False, server_default="0"),
+        sa.Column("done", sa.Boolean, nullable=False, server_default=sa.false()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("data_migration_checkpoints")
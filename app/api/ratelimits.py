@@ -0,0 +1,69 @@
+"""Rate limit route classes for the API and their lifecycle (see app.core.ratelimit)."""
+import logging
+import os
+import re
+
+from fastapi import FastAPI
+
+from app.core.ratelimit import RateLimiter, RouteClass, SharedBudget
+from app.modules.threads.service import thread_tenants
+
+logger = logging.getLogger(__name__)
+
+
+def _limits(name: str, default: str) -> tuple[float, float]:
+    """RATE_LIMIT_<NAME>=rate,burst (requests per second, bucket size)."""
+    rate, burst = os.getenv(f"RATE_LIMIT_{name.upper()}", default).split(",")
+    return float(rate), float(burst)
+
+
+def _thread_tenant(match: re.Match) -> str:
+    # Tenant known once the thread has been read in this worker; until then per thread
+    thread_id = match["thread_id"]
+    tenant_id = thread_tenants.get(thread_id)
+    return str(tenant_id) if tenant_id is not None else f"thread:{thread_id}"
+
+
+def build_limiter() -> RateLimiter | None:
+    if os.getenv("RATE_LIMIT_ENABLED", "1") != "1":
+        return None
+    messages = _limits("messages", "5,20")
+    webhooks = _limits("webhooks", "200,1000")
+    return RateLimiter([
+        RouteClass(
+            name="messages",
+            methods=frozenset({"POST"}),
+            pattern=re.compile(r"^/api/threads/(?P<thread_id>[^/]+)/messages/?$"),
+            rate=messages[0],
+            burst=messages[1],
+            key=_thread_tenant,
+        ),
+        RouteClass(
+            name="webhooks",
+            methods=frozenset({"POST"}),
+            pattern=re.compile(r"^/api/webhooks/[^/]+/(?P<tenant_id>[^/]+)(?:/batch)?/?$"),
+            rate=webhooks[0],
+            burst=webhooks[1],
+            key=lambda match: match["tenant_id"],
+        ),
+    ])
+
+
+limiter = build_limiter()
+
+
+async def init_rate_limits(app: FastAPI) -> None:
+    """Start syncing buckets through Postgres (RATE_LIMIT_SHARED, default 1)."""
+    app.state.rate_limit_budget = None
+    if limiter is None or os.getenv("RATE_LIMIT_SHARED", "1") != "1":
+        return
+    budget = SharedBudget(limiter, interval=float(os.getenv("RATE_LIMIT_SYNC_INTERVAL", "1.0")))
+    budget.start()
+    app.state.rate_limit_budget = budget
+    logger.info("Rate limit shared budget started")
+
+
+async def close_rate_limits(app: FastAPI) -> None:
+    budget = getattr(app.state, "rate_limit_budget", None)
+    if budget is not None:
+        await budget.close()
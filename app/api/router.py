@@ -1,6 +1,8 @@
 from fastapi import APIRouter
 
 from app.modules.agents import router as agents_router
+from app.modules.events import router as events_router
+from app.modules.integrations import catalog_router as integrations_catalog_router
 from app.modules.integrations import router as integrations_router
 from app.modules.tenants import router as tenants_router
 from app.modules.threads import router as threads_router
@@ -8,6 +10,8 @@ from app.modules.threads import router as threads_router
 api_router = APIRouter(prefix="/api")
 
 api_router.include_router(agents_router)
+api_router.include_router(events_router)
 api_router.include_router(integrations_router)
+api_router.include_router(integrations_catalog_router)
 api_router.include_router(tenants_router)
 api_router.include_router(threads_router)
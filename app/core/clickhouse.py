@@ -0,0 +1,45 @@
+"""
+ClickHouse client (clickhouse-connect, HTTP). Configured by CLICKHOUSE_* env vars.
+"""
+import asyncio
+import os
+
+
+def get_client():
+    """New synchronous client; call its methods via asyncio.to_thread. Connects (blocking)."""
+    # Imported here: the SDK is only needed when ClickHouse is used
+    import clickhouse_connect
+
+    return clickhouse_connect.get_client(
+        host=os.getenv("CLICKHOUSE_HOST", "clickhouse"),
+        port=int(os.getenv("CLICKHOUSE_PORT", "8123")),
+        username=os.getenv("CLICKHOUSE_USER", "default"),
+        password=os.getenv("CLICKHOUSE_PASSWORD", ""),
+        # Shared by concurrent to_thread queries: a session allows one query at a time
+        autogenerate_session_id=False,
+    )
+
+
+class LazyClient:
+    """Client created on first use, in a thread: startup neither blocks on nor needs ClickHouse."""
+
+    def __init__(self) -> None:
+        self._client = None
+        self._lock = asyncio.Lock()
+
+    async def get(self):
+        if self._client is None:
+            async with self._lock:
+                if self._client is None:
+                    self._client = await asyncio.to_thread(get_client)
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            client, self._client = self._client, None
+            await asyncio.to_thread(client.close)
+
+
+def enabled() -> bool:
+    """ClickHouse configured for this deployment (EVENT_SINK=clickhouse)."""
+    return os.getenv("EVENT_SINK", "none") == "clickhouse"
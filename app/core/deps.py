@@ -1,5 +1,5 @@
 """Core dependency providers: db, shared infra only. Wiring only."""
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 
-__all__ = ["get_db"]
+__all__ = ["get_db", "get_read_db"]
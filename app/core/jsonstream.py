@@ -0,0 +1,174 @@
+"""
+Incremental parsing of large request bodies: a JSON array or NDJSON, item by item.
+A body whose first line is not a complete JSON value (e.g. one pretty-printed
+object) is parsed whole as a single item.
+
+Only the current item (plus one network chunk) is held in memory, so bodies of
+tens of MB are processed in bounded memory.
+"""
+import codecs
+import json
+from typing import Any, AsyncIterator
+
+_WS = " \t\r\n"
+_DELIMS = _WS + ",]"
+
+
+class JSONStreamError(ValueError):
+    """Body is not a well-formed JSON array, NDJSON or single JSON value."""
+
+
+class ItemTooLarge(JSONStreamError):
+    pass
+
+
+async def iter_json_items(
+    chunks: AsyncIterator[bytes],
+    max_item_bytes: int = 1 << 20,
+) -> AsyncIterator[Any | json.JSONDecodeError]:
+    """
+    Yield parsed items of a JSON array or NDJSON body (detected by the first
+    non-whitespace character). An invalid NDJSON line is yielded as its
+    JSONDecodeError so callers can report it per item; an invalid array raises.
+    If the first line does not parse, the body must be one JSON value (a
+    multi-line object is one item, not one error per line) or it raises.
+    """
+    stream = _TextStream(chunks)
+    await stream.skip_ws()
+    if stream.peek() == "[":
+        stream.pos += 1
+        async for item in _iter_array(stream, max_item_bytes):
+            yield item
+    else:
+        async for item in _iter_ndjson(stream, max_item_bytes):
+            yield item
+
+
+class _TextStream:
+    """UTF-8 decoded text buffer refilled from an async byte iterator."""
+
+    def __init__(self, chunks: AsyncIterator[bytes]) -> None:
+        self._chunks = chunks.__aiter__()
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    async def more(self) -> bool:
+        """Append next chunk; False at end of body."""
+        if self.eof:
+            return False
+        try:
+            chunk = await self._chunks.__anext__()
+        except StopAsyncIteration:
+            self.eof = True
+            self.text = self.text[self.pos:] + self._decoder.decode(b"", final=True)
+            self.pos = 0
+            return False
+        # Drop consumed prefix so the buffer only holds the unparsed tail
+        self.text = self.text[self.pos:] + self._decoder.decode(chunk)
+        self.pos = 0
+        return True
+
+    async def skip_ws(self) -> None:
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in _WS:
+                self.pos += 1
+            if self.pos < len(self.text) or not await self.more():
+                return
+
+    def peek(self) -> str:
+        return self.text[self.pos] if self.pos < len(self.text) else ""
+
+    @property
+    def pending(self) -> int:
+        return len(self.text) - self.pos
+
+
+async def _iter_array(stream: _TextStream, max_item_bytes: int) -> AsyncIterator[Any]:
+    decoder = json.JSONDecoder()
+
+    await stream.skip_ws()
+    if stream.peek() == "]":
+        stream.pos += 1
+        await _expect_end(stream)
+        return
+
+    while True:
+        await stream.skip_ws()
+        while True:
+            try:
+                item, end = decoder.raw_decode(stream.text, stream.pos)
+            except json.JSONDecodeError as e:
+                if stream.pending > max_item_bytes:
+                    raise ItemTooLarge(f"Array item exceeds {max_item_bytes} bytes") from e
+                if not await stream.more():
+                    raise JSONStreamError(f"Invalid JSON array: {e.msg}") from e
+                continue
+            # A value not followed by a delimiter may be cut at the chunk
+            # boundary (e.g. the number 4.5 split as "4" | ".5"): read more
+            if not stream.eof and (end == len(stream.text) or stream.text[end] not in _DELIMS):
+                if stream.pending > max_item_bytes:
+                    raise ItemTooLarge(f"Array item exceeds {max_item_bytes} bytes")
+                await stream.more()
+                continue
+            break
+        stream.pos = end
+        yield item
+
+        await stream.skip_ws()
+        sep = stream.peek()
+        stream.pos += 1
+        if sep == "]":
+            await _expect_end(stream)
+            return
+        if sep != ",":
+            raise JSONStreamError(f"Invalid JSON array: expected ',' or ']', got {sep!r}")
+
+
+async def _expect_end(stream: _TextStream) -> None:
+    await stream.skip_ws()
+    if stream.pending:
+        raise JSONStreamError("Invalid JSON array: trailing data")
+
+
+async def _iter_ndjson(
+    stream: _TextStream, max_item_bytes: int
+) -> AsyncIterator[Any | json.JSONDecodeError]:
+    first = True
+    while True:
+        newline = stream.text.find("\n", stream.pos)
+        if newline < 0:
+            if stream.pending > max_item_bytes:
+                raise ItemTooLarge(f"NDJSON line exceeds {max_item_bytes} bytes")
+            if await stream.more():
+                continue
+            newline = len(stream.text)
+        start = stream.pos
+        line = stream.text[start:newline]
+        stream.pos = newline + 1
+        if line.strip():
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError as e:
+                if first:
+                    # Not NDJSON: a single value spanning several lines
+                    stream.pos = start
+                    yield await _single_value(stream, max_item_bytes)
+                    return
+                yield e
+            else:
+                yield item
+            first = False
+        if stream.eof and stream.pos >= len(stream.text):
+            return
+
+
+async def _single_value(stream: _TextStream, max_item_bytes: int) -> Any:
+    while await stream.more():
+        if stream.pending > max_item_bytes:
+            raise ItemTooLarge(f"JSON value exceeds {max_item_bytes} bytes")
+    try:
+        return json.loads(stream.text[stream.pos:])
+    except json.JSONDecodeError as e:
+        raise JSONStreamError(f"Invalid body: not a JSON array, NDJSON or one JSON value: {e.msg}") from e
@@ -0,0 +1,100 @@
+"""
+In-process metrics: counters and gauges with labels, rendered in Prometheus text format.
+Per worker; values reset on restart.
+"""
+import threading
+from typing import Iterable
+
+LabelValues = tuple[tuple[str, str], ...]
+
+
+class _Metric:
+    type_: str = ""
+
+    def __init__(self, name: str, description: str) -> None:
+        self.name = name
+        self.description = description
+        self._values: dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(labels: dict[str, str]) -> LabelValues:
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> Iterable[tuple[LabelValues, float]]:
+        with self._lock:
+            return list(self._values.items())
+
+
+class Counter(_Metric):
+    """Monotonic counter."""
+
+    type_ = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    type_ = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+
+_registry: dict[str, _Metric] = {}
+_registry_lock = threading.Lock()
+
+
+def _get_or_create(cls: type[_Metric], name: str, description: str) -> _Metric:
+    with _registry_lock:
+        metric = _registry.get(name)
+        if metric is None:
+            metric = cls(name, description)
+            _registry[name] = metric
+        elif not isinstance(metric, cls):
+            raise ValueError(f"Metric '{name}' already registered as {metric.type_}")
+        return metric
+
+
+def counter(name: str, description: str) -> Counter:
+    """Get or register a counter. Safe to call at import time from several modules."""
+    return _get_or_create(Counter, name, description)  # type: ignore[return-value]
+
+
+def gauge(name: str, description: str) -> Gauge:
+    """Get or register a gauge."""
+    return _get_or_create(Gauge, name, description)  # type: ignore[return-value]
+
+
+def render() -> str:
+    """All registered metrics in Prometheus text exposition format."""
+    lines: list[str] = []
+    with _registry_lock:
+        metrics = list(_registry.values())
+    for metric in metrics:
+        lines.append(f"# HELP {metric.name} {metric.description}")
+        lines.append(f"# TYPE {metric.name} {metric.type_}")
+        for labels, value in metric.samples():
+            if labels:
+                label_str = ",".join(f'{k}="{v}"' for k, v in labels)
+                lines.append(f"{metric.name}{{{label_str}}} {value}")
+            else:
+                lines.append(f"{metric.name} {value}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,115 @@
+"""
+Postgres LISTEN/NOTIFY: one listening connection per worker shared by all channels.
+
+Modules register a callback per channel (listener.listen); the connection is
+reopened with backoff when it drops. Notifications sent while disconnected are
+lost, so listen() takes an optional on_reconnect hook to resynchronise (e.g.
+clear a cache).
+"""
+import asyncio
+import logging
+from typing import Callable
+
+import asyncpg
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import DATABASE_URL
+
+logger = logging.getLogger(__name__)
+
+NotifyCallback = Callable[[str], None]
+
+
+class PgListener:
+    def __init__(self, dsn: str | None = None, max_backoff: float = 30.0) -> None:
+        # asyncpg takes a plain postgresql:// DSN
+        self.dsn = dsn or DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://", 1)
+        self.max_backoff = max_backoff
+        self._callbacks: dict[str, list[NotifyCallback]] = {}
+        self._on_reconnect: list[Callable[[], None]] = []
+        self._conn: asyncpg.Connection | None = None
+        self._task: asyncio.Task | None = None
+
+    async def listen(
+        self,
+        channel: str,
+        callback: NotifyCallback,
+        on_reconnect: Callable[[], None] | None = None,
+    ) -> None:
+        """Call callback(payload) for every notification on channel."""
+        callbacks = self._callbacks.setdefault(channel, [])
+        callbacks.append(callback)
+        if on_reconnect is not None:
+            self._on_reconnect.append(on_reconnect)
+        if len(callbacks) == 1 and self._conn is not None and not self._conn.is_closed():
+            await self._conn.add_listener(channel, self._dispatch)
+
+    def start(self) -> None:
+        """Open the connection in the background. Idempotent."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="pg-listener")
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self._callbacks.clear()
+        self._on_reconnect.clear()
+
+    async def _run(self) -> None:
+        backoff = 1.0
+        connected_before = False
+        while True:
+            try:
+                self._conn = await asyncpg.connect(self.dsn)
+                # listen() may register a channel while add_listener awaits
+                for channel in list(self._callbacks):
+                    await self._conn.add_listener(channel, self._dispatch)
+                logger.info("Listening on %s", ", ".join(self._callbacks) or "no channels yet")
+                if connected_before:
+                    for hook in self._on_reconnect:
+                        hook()
+                connected_before = True
+                backoff = 1.0
+                # Notifications arrive via asyncpg's protocol; this only probes the connection
+                while not self._conn.is_closed():
+                    await asyncio.sleep(5)
+                    await self._conn.execute("SELECT 1")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Postgres listener failed, reconnecting in %ss: %s", backoff, e)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+            finally:
+                if self._conn is not None:
+                    conn, self._conn = self._conn, None
+                    await asyncio.shield(_close_quietly(conn))
+
+    def _dispatch(self, connection, pid: int, channel: str, payload: str) -> None:
+        for callback in self._callbacks.get(channel, ()):
+            try:
+                callback(payload)
+            except Exception:
+                logger.exception("Notification handler for %s failed", channel)
+
+
+async def _close_quietly(conn: asyncpg.Connection) -> None:
+    try:
+        await conn.close(timeout=5)
+    except Exception:
+        conn.terminate()
+
+
+async def notify(session: AsyncSession, channel: str, payload: str) -> None:
+    """NOTIFY in the session's transaction: delivered only if it commits."""
+    await session.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": channel, "payload": payload},
+    )
+
+
+# Process-wide listener; started by the first module that needs it
+listener = PgListener()
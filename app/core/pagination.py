@@ -0,0 +1,127 @@
+"""
+Keyset pagination over (created_at, id) and cheap totals.
+
+Pages are requested with ?limit=&cursor=; the cursor is opaque (base64 of the
+last row's created_at and id), so the next page is an index range scan no
+matter how deep it is. Listing endpoints return the page as a plain list and
+put paging info in headers:
+
+- X-Next-Cursor: cursor of the next page (absent on the last page)
+- X-Total-Count / X-Total-Exact: with ?total=true; planner estimate for large
+  sets, exact count when the estimate is below EXACT_COUNT_BELOW
+"""
+import base64
+import json
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Sequence
+
+from fastapi import HTTPException, Query, Response, status
+from sqlalchemy import Select, func, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import INCLUDE_DELETED, exclude_deleted
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+EXACT_COUNT_BELOW = 10_000
+
+
+@dataclass(frozen=True)
+class Cursor:
+    created_at: datetime
+    id: uuid.UUID
+
+    def encode(self) -> str:
+        raw = json.dumps([self.created_at.isoformat(), str(self.id)]).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, value: str) -> "Cursor":
+        """Raises ValueError on a malformed cursor."""
+        try:
+            raw = base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+            created_at, id_ = json.loads(raw)
+            return cls(datetime.fromisoformat(created_at), uuid.UUID(id_))
+        except (TypeError, ValueError) as e:
+            raise ValueError("Invalid cursor") from e
+
+
+@dataclass
+class PageParams:
+    limit: int
+    after: Cursor | None
+    total: bool
+
+
+def page_params(
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    cursor: str | None = Query(None, description="X-Next-Cursor of the previous page"),
+    total: bool = Query(False, description="Add X-Total-Count (estimated for large sets)"),
+) -> PageParams:
+    """FastAPI dependency for listing endpoints."""
+    try:
+        after = Cursor.decode(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+    return PageParams(limit=limit, after=after, total=total)
+
+
+def keyset(stmt: Select, entity: Any, params: PageParams) -> Select:
+    """Order stmt by (created_at, id), start after the cursor, fetch one extra row."""
+    if params.after is not None:
+        stmt = stmt.where(
+            tuple_(entity.created_at, entity.id) > (params.after.created_at, params.after.id)
+        )
+    return stmt.order_by(entity.created_at, entity.id).limit(params.limit + 1)
+
+
+def split_page(rows: Sequence[Any], params: PageParams) -> tuple[list[Any], Cursor | None]:
+    """Rows of a keyset() query -> (page, cursor of the next page or None)."""
+    items = list(rows[:params.limit])
+    if len(rows) <= params.limit:
+        return items, None
+    last = items[-1]
+    return items, Cursor(last.created_at, last.id)
+
+
+async def count(session: AsyncSession, stmt: Select) -> tuple[int, bool]:
+    """
+    (total, exact) for the rows of stmt (without keyset/limit). Uses the
+    planner's estimate; counts exactly only when the estimate is small.
+    """
+    stmt = stmt.order_by(None).limit(None)
+    include_deleted = bool(stmt.get_execution_options().get(INCLUDE_DELETED))
+    # Compiled outside session.execute(): the soft-delete filter is added here
+    compiled = (stmt if include_deleted else exclude_deleted(stmt)).compile(
+        dialect=session.bind.dialect,
+        compile_kwargs={"literal_binds": True},
+    )
+    plan = await session.scalar(text(f"EXPLAIN (FORMAT JSON) {compiled}"))
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    estimate = int(plan[0]["Plan"]["Plan Rows"])
+    if estimate >= EXACT_COUNT_BELOW:
+        return estimate, False
+    exact = await session.scalar(
+        select(func.count())
+        .select_from(stmt.subquery())
+        .execution_options(**{INCLUDE_DELETED: include_deleted})
+    )
+    return exact or 0, True
+
+
+def set_page_headers(
+    response: Response,
+    next_cursor: Cursor | None,
+    total: tuple[int, bool] | None = None,
+) -> None:
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor.encode()
+    if total is not None:
+        response.headers["X-Total-Count"] = str(total[0])
+        response.headers["X-Total-Exact"] = "true" if total[1] else "false"
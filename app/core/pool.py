@@ -0,0 +1,155 @@
+"""
+Connection pool instrumentation and admission control.
+
+instrument() attaches pool event listeners (checkout/checkin) to an engine
+created with poolclass=InstrumentedPool, which also times every checkout and
+counts checkout timeouts. Exported metrics, labelled by pool name:
+
+- db_pool_checked_out, db_pool_overflow, db_pool_waiting (gauges)
+- db_pool_checkout_wait_seconds_total / db_pool_checkouts_total: average
+  checkout wait is their ratio
+- db_pool_timeouts_total: checkouts that gave up after the pool timeout
+
+AdmissionMiddleware sheds new API requests with 503 and Retry-After when the
+expected checkout wait exceeds a threshold, so requests already running keep
+their connections instead of queueing behind a backlog.
+"""
+import math
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core import metrics
+
+checked_out_gauge = metrics.gauge("db_pool_checked_out", "Connections checked out by pool")
+overflow_gauge = metrics.gauge("db_pool_overflow", "Connections open beyond pool_size by pool")
+waiting_gauge = metrics.gauge("db_pool_waiting", "Checkouts waiting for a connection by pool")
+checkout_wait = metrics.counter(
+    "db_pool_checkout_wait_seconds_total",
+    "Time spent waiting for a connection by pool",
+)
+checkouts = metrics.counter("db_pool_checkouts_total", "Connection checkouts by pool")
+timeouts = metrics.counter("db_pool_timeouts_total", "Checkouts that timed out by pool")
+admission_rejected = metrics.counter(
+    "db_admission_rejected_total",
+    "Requests shed with 503 because of the expected pool wait",
+)
+
+_CHECKOUT_AT = "checkout_at"
+
+# Weight of the newest sample in the connection hold time average
+_EWMA_ALPHA = 0.1
+# Samples are clipped: a long hold (stream, background batch) counts as this
+# much, so a few of them cannot keep expected_wait() above the threshold
+_MAX_HOLD_SAMPLE = 1.0
+
+
+@dataclass
+class PoolStats:
+    name: str
+    pool_size: int
+    capacity: int
+    checked_out: int = 0
+    waiting: int = 0
+    hold_time: float = 0.0
+
+    def expected_wait(self) -> float:
+        """Seconds a new checkout would wait: queued checkouts x average hold time / capacity."""
+        if self.checked_out < self.capacity:
+            return 0.0
+        return (self.waiting + 1) * self.hold_time / self.capacity
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool timing checkouts; stats are set by instrument()."""
+
+    stats: PoolStats | None = None
+
+    def connect(self):
+        stats = self.stats
+        if stats is None:
+            return super().connect()
+        stats.waiting += 1
+        waiting_gauge.set(stats.waiting, pool=stats.name)
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            timeouts.inc(pool=stats.name)
+            raise
+        finally:
+            stats.waiting -= 1
+            waiting_gauge.set(stats.waiting, pool=stats.name)
+            checkout_wait.inc(time.perf_counter() - started, pool=stats.name)
+            checkouts.inc(pool=stats.name)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+def instrument(engine: AsyncEngine, name: str, pool_size: int, max_overflow: int) -> PoolStats:
+    """Collect pool metrics for engine (created with poolclass=InstrumentedPool)."""
+    stats = PoolStats(name=name, pool_size=pool_size, capacity=pool_size + max(max_overflow, 0))
+    engine.sync_engine.pool.stats = stats
+
+    def report() -> None:
+        checked_out_gauge.set(stats.checked_out, pool=name)
+        overflow_gauge.set(max(0, stats.checked_out - stats.pool_size), pool=name)
+
+    @event.listens_for(engine.sync_engine, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+        connection_record.info[_CHECKOUT_AT] = time.perf_counter()
+        stats.checked_out += 1
+        report()
+
+    @event.listens_for(engine.sync_engine, "checkin")
+    def _checkin(dbapi_connection, connection_record) -> None:
+        checkout_at = connection_record.info.pop(_CHECKOUT_AT, None)
+        if checkout_at is None:
+            return
+        held = min(time.perf_counter() - checkout_at, _MAX_HOLD_SAMPLE)
+        stats.hold_time += _EWMA_ALPHA * (held - stats.hold_time)
+        stats.checked_out -= 1
+        report()
+
+    report()
+    return stats
+
+
+class AdmissionMiddleware:
+    """Pure ASGI middleware: 503 + Retry-After for paths under prefix when the pool is backed up."""
+
+    def __init__(self, app, stats: PoolStats, max_wait: float, prefix: str = "/api") -> None:
+        self.app = app
+        self.stats = stats
+        self.max_wait = max_wait
+        self.prefix = prefix
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] == "http" and scope["path"].startswith(self.prefix):
+            wait = self.stats.expected_wait()
+            if wait > self.max_wait:
+                admission_rejected.inc(pool=self.stats.name)
+                await _send_503(send, wait)
+                return
+        await self.app(scope, receive, send)
+
+
+async def _send_503(send, wait: float) -> None:
+    body = b'{"detail":"Database is overloaded, retry later"}'
+    await send({
+        "type": "http.response.start",
+        "status": 503,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, math.ceil(wait))).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
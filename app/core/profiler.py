@@ -0,0 +1,230 @@
+"""
+Opt-in per-request query profiler with N+1 detection and query budgets.
+
+With QUERY_PROFILER=1, QueryProfilerMiddleware records every statement a
+request runs (count, DB time, slowest statements). The same SQL run
+QUERY_PROFILER_REPEAT_THRESHOLD or more times in one request (typically with
+different parameters) is reported as a likely N+1 in the log. A request sent
+with X-Debug-Queries: 1 gets a summary in the X-Query-Profile response header;
+it covers the queries run before the response started.
+
+query_budget() asserts a statement budget around a block, e.g. in tests:
+
+    with query_budget(2) as profile:
+        client.get(f"/api/threads/{thread_id}")
+
+It sees every statement on the engine while active (any thread, any request),
+so use it where nothing else runs concurrently.
+"""
+import logging
+import os
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.database import engine as default_engine
+
+logger = logging.getLogger(__name__)
+
+DEBUG_HEADER = b"x-debug-queries"
+PROFILE_HEADER = b"x-query-profile"
+
+_STARTED_ATTR = "_profiler_started"
+_SQL_PREVIEW = 200
+
+
+@dataclass
+class StatementStats:
+    count: int = 0
+    total: float = 0.0
+    slowest: float = 0.0
+
+
+@dataclass
+class QueryProfile:
+    count: int = 0
+    total: float = 0.0
+    statements: dict[str, StatementStats] = field(default_factory=dict)
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.total += elapsed
+        stats = self.statements.get(statement)
+        if stats is None:
+            stats = self.statements[statement] = StatementStats()
+        stats.count += 1
+        stats.total += elapsed
+        stats.slowest = max(stats.slowest, elapsed)
+
+    def repeated(self, threshold: int) -> list[tuple[str, StatementStats]]:
+        """Statements run at least threshold times, most frequent first (likely N+1)."""
+        found = [(sql, s) for sql, s in self.statements.items() if s.count >= threshold]
+        return sorted(found, key=lambda item: item[1].count, reverse=True)
+
+    def slowest(self, n: int = 5) -> list[tuple[str, StatementStats]]:
+        return sorted(self.statements.items(), key=lambda item: item[1].slowest, reverse=True)[:n]
+
+    def summary(self, threshold: int) -> str:
+        slowest = max((s.slowest for s in self.statements.values()), default=0.0)
+        return (
+            f"queries={self.count}; db_ms={self.total * 1000:.1f}; "
+            f"repeated={len(self.repeated(threshold))}; slowest_ms={slowest * 1000:.1f}"
+        )
+
+    def report(self, threshold: int) -> str:
+        """Multi-line description for logs and assertion messages."""
+        lines = [self.summary(threshold)]
+        for sql, stats in self.slowest():
+            lines.append(f"  {stats.count}x {stats.total * 1000:.1f} ms  {_preview(sql)}")
+        return "\n".join(lines)
+
+
+_profile: ContextVar[QueryProfile | None] = ContextVar("query_profile", default=None)
+# Profiles recording every statement regardless of context (query_budget)
+_global_profiles: list[QueryProfile] = []
+
+
+def _preview(sql: str) -> str:
+    sql = " ".join(sql.split())
+    return sql if len(sql) <= _SQL_PREVIEW else sql[:_SQL_PREVIEW] + "..."
+
+
+def install(engine: AsyncEngine) -> None:
+    """Time statements on engine. Idempotent; costs two event calls per statement."""
+    sync_engine = engine.sync_engine
+    if event.contains(sync_engine, "before_cursor_execute", _before_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_execute)
+
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    # On the execution context, not the connection: a statement that raises
+    # never reaches after_cursor_execute and must not leave a start time behind
+    if context is not None:
+        setattr(context, _STARTED_ATTR, time.perf_counter())
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = getattr(context, _STARTED_ATTR, None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    profile = _profile.get()
+    if profile is not None:
+        profile.record(statement, elapsed)
+    for budget_profile in _global_profiles:
+        budget_profile.record(statement, elapsed)
+
+
+class QueryProfilerMiddleware:
+    """Pure ASGI middleware: one QueryProfile per HTTP request."""
+
+    def __init__(self, app, repeat_threshold: int = 3, slow_ms: float = 100.0) -> None:
+        self.app = app
+        self.repeat_threshold = repeat_threshold
+        self.slow = slow_ms / 1000
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = QueryProfile()
+        token = _profile.set(profile)
+        debug = any(
+            name == DEBUG_HEADER and value.strip() in (b"1", b"true")
+            for name, value in scope["headers"]
+        )
+
+        async def send_with_summary(message) -> None:
+            if debug and message["type"] == "http.response.start":
+                summary = profile.summary(self.repeat_threshold).encode()
+                message = {**message, "headers": [*message.get("headers", ()), (PROFILE_HEADER, summary)]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_summary)
+        finally:
+            _profile.reset(token)
+            self._log(scope, profile)
+
+    def _log(self, scope, profile: QueryProfile) -> None:
+        request = f"{scope['method']} {scope['path']}"
+        for sql, stats in profile.repeated(self.repeat_threshold):
+            logger.warning(
+                "Possible N+1 in %s: %d x %s (%.1f ms)",
+                request, stats.count, _preview(sql), stats.total * 1000,
+            )
+        for sql, stats in profile.statements.items():
+            if stats.slowest >= self.slow:
+                logger.warning("Slow query in %s: %.1f ms %s", request, stats.slowest * 1000, _preview(sql))
+        logger.debug("Queries for %s: %s", request, profile.report(self.repeat_threshold))
+
+
+def enabled() -> bool:
+    return os.getenv("QUERY_PROFILER", "0") == "1"
+
+
+def middleware_options() -> dict:
+    return {
+        "repeat_threshold": int(os.getenv("QUERY_PROFILER_REPEAT_THRESHOLD", "3")),
+        "slow_ms": float(os.getenv("QUERY_PROFILER_SLOW_MS", "100")),
+    }
+
+
+# -------- query budgets --------
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryBudget:
+    """See query_budget()."""
+
+    def __init__(
+        self,
+        max_queries: int,
+        max_repeats: int | None = None,
+        engine: AsyncEngine | None = None,
+    ) -> None:
+        self.max_queries = max_queries
+        self.max_repeats = max_repeats
+        self.engine = engine or default_engine
+        self.profile = QueryProfile()
+
+    def __enter__(self) -> QueryProfile:
+        install(self.engine)
+        _global_profiles.append(self.profile)
+        return self.profile
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        _global_profiles.remove(self.profile)
+        if exc_type is not None:
+            return
+        problems = []
+        if self.profile.count > self.max_queries:
+            problems.append(f"{self.profile.count} queries, budget {self.max_queries}")
+        if self.max_repeats is not None:
+            repeated = self.profile.repeated(self.max_repeats + 1)
+            if repeated:
+                problems.append(f"{len(repeated)} statement(s) repeated more than {self.max_repeats} times")
+        if problems:
+            threshold = self.max_repeats + 1 if self.max_repeats is not None else 3
+            raise QueryBudgetExceeded("; ".join(problems) + "\n" + self.profile.report(threshold))
+
+
+def query_budget(
+    max_queries: int,
+    max_repeats: int | None = None,
+    engine: AsyncEngine | None = None,
+) -> QueryBudget:
+    """
+    Context manager failing with QueryBudgetExceeded when the block runs more
+    than max_queries statements, or one statement more than max_repeats times.
+    """
+    return QueryBudget(max_queries, max_repeats, engine)
@@ -0,0 +1,30 @@
+"""
+Row projections for list endpoints: selected columns straight to JSON bytes.
+
+Listing services select only the columns of the response schema (labelled
+with the schema's field names) and return plain rows; rows_response()
+serializes them with pydantic_core in one call. No ORM instances, identity
+map or Pydantic models are built, and the JSON matches what the response
+model would produce (UUIDs as strings, datetimes in ISO 8601 with Z, enums
+by value). Routes keep response_model for the OpenAPI schema.
+"""
+from typing import Collection, Sequence
+
+from fastapi import Response
+from pydantic_core import to_json
+from sqlalchemy.engine import Row
+
+
+def json_rows(rows: Sequence[Row], exclude: Collection[str] = ()) -> bytes:
+    """Rows -> JSON array of objects keyed by column label, minus exclude."""
+    if not rows:
+        return b"[]"
+    keys = rows[0]._fields
+    if not exclude:
+        return to_json([dict(zip(keys, row)) for row in rows])
+    kept = [(i, key) for i, key in enumerate(keys) if key not in exclude]
+    return to_json([{key: row[i] for i, key in kept} for row in rows])
+
+
+def rows_response(rows: Sequence[Row], exclude: Collection[str] = ()) -> Response:
+    return Response(content=json_rows(rows, exclude), media_type="application/json")
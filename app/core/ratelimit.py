@@ -0,0 +1,231 @@
+"""
+Per-tenant rate limiting: ASGI middleware with in-process token buckets.
+
+A request is matched against route classes (method + path regex); the class
+derives a bucket key from the path, typically the tenant id. Buckets live in
+process so the check costs a dict lookup and a few float operations; a
+rejected request gets 429 with Retry-After.
+
+With a shared budget (SharedBudget) each worker periodically reports what its
+buckets consumed to rate_limit_buckets in Postgres and adopts the global
+balance it gets back, so limits hold across workers. Between syncs a worker
+refills locally at the full rate: the overshoot is bounded by
+workers x rate x sync interval and paid back at the next sync.
+"""
+import asyncio
+import json
+import logging
+import math
+import re
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+import sqlalchemy as sa
+from sqlalchemy import text
+
+from app.core import metrics
+from app.core.database import Base, engine
+
+logger = logging.getLogger(__name__)
+
+rate_limited = metrics.counter(
+    "rate_limit_rejected_total",
+    "Requests rejected with 429 by route class",
+)
+
+
+class TokenBucket:
+    __slots__ = ("rate", "burst", "tokens", "updated", "consumed")
+
+    def __init__(self, rate: float, burst: float) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        # Taken since the last shared-budget sync
+        self.consumed = 0.0
+
+    def take(self, now: float, cost: float = 1.0) -> float:
+        """0.0 if allowed, else seconds until cost tokens are available."""
+        tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if tokens >= cost:
+            self.tokens = tokens - cost
+            self.consumed += cost
+            return 0.0
+        self.tokens = tokens
+        return (cost - tokens) / self.rate
+
+
+@dataclass(frozen=True)
+class RouteClass:
+    """Requests limited together. key(match) -> bucket key, None: not limited."""
+
+    name: str
+    methods: frozenset[str]
+    pattern: re.Pattern
+    rate: float
+    burst: float
+    key: Callable[[re.Match], str | None]
+
+
+class RateLimiter:
+    def __init__(self, classes: list[RouteClass], max_buckets: int = 100_000) -> None:
+        self.classes = classes
+        self.max_buckets = max_buckets
+        self.buckets: dict[str, TokenBucket] = {}
+        # Set by SharedBudget: unsynced consumption must not be evicted
+        self.shared = False
+
+    def check(self, method: str, path: str) -> tuple[RouteClass, float] | None:
+        """None if the request is not limited or allowed; else (class, retry_after)."""
+        for route_class in self.classes:
+            if method not in route_class.methods:
+                continue
+            match = route_class.pattern.match(path)
+            if match is None:
+                continue
+            key = route_class.key(match)
+            if key is None:
+                return None
+            bucket_key = f"{route_class.name}:{key}"
+            bucket = self.buckets.get(bucket_key)
+            if bucket is None:
+                if len(self.buckets) >= self.max_buckets:
+                    self._evict_full()
+                bucket = self.buckets[bucket_key] = TokenBucket(route_class.rate, route_class.burst)
+            wait = bucket.take(time.monotonic())
+            return (route_class, wait) if wait else None
+        return None
+
+    def _evict_full(self) -> None:
+        """Drop buckets that have refilled completely (they carry no state)."""
+        now = time.monotonic()
+        for key, bucket in list(self.buckets.items()):
+            if self.shared and bucket.consumed:
+                continue
+            if bucket.tokens + (now - bucket.updated) * bucket.rate >= bucket.burst:
+                del self.buckets[key]
+
+
+class RateLimitMiddleware:
+    """Pure ASGI middleware (no per-request Request/Response objects)."""
+
+    def __init__(self, app, limiter: RateLimiter) -> None:
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] == "http":
+            rejected = self.limiter.check(scope["method"], scope["path"])
+            if rejected is not None:
+                route_class, wait = rejected
+                rate_limited.inc(route_class=route_class.name)
+                await _send_429(send, wait)
+                return
+        await self.app(scope, receive, send)
+
+
+async def _send_429(send, wait: float) -> None:
+    body = b'{"detail":"Rate limit exceeded"}'
+    await send({
+        "type": "http.response.start",
+        "status": 429,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, math.ceil(wait))).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+# -------- shared budget (Postgres) --------
+
+rate_limit_buckets = sa.Table(
+    "rate_limit_buckets",
+    Base.metadata,
+    sa.Column("key", sa.String(255), primary_key=True),
+    sa.Column("tokens", sa.Float, nullable=False),
+    sa.Column("rate", sa.Float, nullable=False),
+    sa.Column("burst", sa.Float, nullable=False),
+    sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+)
+
+# EXCLUDED.tokens carries burst - consumed: the stored balance is refilled for
+# the elapsed time, capped at burst, then charged with what this worker used.
+# Debt is capped at one burst. Rows are locked in key order, so workers syncing
+# the same tenants cannot deadlock.
+_SYNC_SQL = text("""
+INSERT INTO rate_limit_buckets AS b (key, tokens, rate, burst, updated_at)
+SELECT u.key, u.burst - u.consumed, u.rate, u.burst, now()
+FROM jsonb_to_recordset(CAST(:buckets AS jsonb))
+    AS u(key text, consumed double precision, rate double precision, burst double precision)
+ORDER BY u.key
+ON CONFLICT (key) DO UPDATE SET
+    tokens = GREATEST(
+        -EXCLUDED.burst,
+        LEAST(
+            EXCLUDED.burst,
+            b.tokens + EXTRACT(EPOCH FROM now() - b.updated_at) * EXCLUDED.rate
+        ) - (EXCLUDED.burst - EXCLUDED.tokens)
+    ),
+    rate = EXCLUDED.rate,
+    burst = EXCLUDED.burst,
+    updated_at = now()
+RETURNING key, tokens
+""")
+
+
+class SharedBudget:
+    """Background task syncing a RateLimiter's buckets through Postgres."""
+
+    def __init__(self, limiter: RateLimiter, interval: float = 1.0) -> None:
+        self.limiter = limiter
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+        limiter.shared = True
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="rate-limit-sync")
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.sync()
+            except Exception as e:
+                logger.warning("Rate limit sync failed: %s", e)
+
+    async def sync(self) -> None:
+        # Buckets used since the last sync; consumption is reset before the
+        # round trip so requests admitted meanwhile count toward the next one
+        active = {k: b for k, b in self.limiter.buckets.items() if b.consumed}
+        if not active:
+            return
+        payload = []
+        for key in sorted(active):
+            bucket = active[key]
+            payload.append({"key": key, "consumed": bucket.consumed, "rate": bucket.rate, "burst": bucket.burst})
+            bucket.consumed = 0.0
+        try:
+            async with engine.begin() as conn:
+                rows = (await conn.execute(_SYNC_SQL, {"buckets": json.dumps(payload)})).all()
+        except BaseException:
+            # Not reported: carry the consumption over to the next sync
+            for item in payload:
+                active[item["key"]].consumed += item["consumed"]
+            raise
+        now = time.monotonic()
+        for key, tokens in rows:
+            bucket = active[key]
+            # Global balance, minus what was admitted here during the round trip
+            bucket.tokens = min(bucket.burst, tokens - bucket.consumed)
+            bucket.updated = now
@@ -0,0 +1,269 @@
+"""
+Read-replica routing with read-your-writes tokens.
+
+Read-only sessions (session_context(readonly=True), get_read_db) go to the
+replica when it is caught up enough, otherwise to the primary. A background
+monitor polls the replica's replay LSN and lag; a read is sent to the primary
+when the replica is unreachable, lags more than max_lag, or has not yet
+replayed the caller's last write.
+
+The caller's last write is carried by a token: the primary's WAL LSN after
+the request committed, returned in the X-Read-After header and the read_after
+cookie, and sent back by the client (header or cookie) on later requests.
+ReadYourWritesMiddleware commits the request's primary sessions that wrote
+when the response starts, so the token covers the write. Writes made after
+the response started (streamed replies) are not covered.
+"""
+import asyncio
+import logging
+import re
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from http.cookies import CookieError, SimpleCookie
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import TextClause
+
+from app.core import metrics
+
+logger = logging.getLogger(__name__)
+
+HEADER = b"x-read-after"
+COOKIE = "read_after"
+
+_LSN = re.compile(r"^[0-9A-Fa-f]{1,8}/[0-9A-Fa-f]{1,8}$")
+# text() statements that never write
+_READ_TEXT = re.compile(r"^\s*(SELECT|EXPLAIN|SHOW|VALUES)\b", re.IGNORECASE)
+
+_WROTE_KEY = "replica_wrote"
+
+# On a primary, pg_last_wal_replay_lsn() is NULL: the URL points at the
+# primary itself (e.g. in development) and is never behind
+_STATUS_SQL = text("""
+SELECT
+    COALESCE(pg_last_wal_replay_lsn(), pg_current_wal_lsn())::text,
+    CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+         ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+_CURRENT_LSN_SQL = text("SELECT pg_current_wal_lsn()::text")
+
+read_routes = metrics.counter(
+    "db_read_routes_total",
+    "Read-only sessions by target (replica, primary) and reason",
+)
+replica_lag = metrics.gauge(
+    "db_replica_lag_seconds",
+    "Replica replay lag at the last check",
+)
+
+
+def parse_lsn(value: str) -> int | None:
+    """'16/B374D848' -> int; None if malformed."""
+    if not _LSN.match(value):
+        return None
+    high, low = value.split("/")
+    return (int(high, 16) << 32) | int(low, 16)
+
+
+def format_lsn(lsn: int) -> str:
+    return f"{lsn >> 32:X}/{lsn & 0xFFFFFFFF:X}"
+
+
+@dataclass
+class RequestState:
+    """Per-request routing state, shared by the middleware and sessions."""
+
+    read_after: int | None = None
+    written: bool = False
+    sessions: list[AsyncSession] = field(default_factory=list)
+
+
+_request: ContextVar[RequestState | None] = ContextVar("replica_request", default=None)
+
+
+class ReplicaRouter:
+    def __init__(
+        self,
+        primary: AsyncEngine,
+        replica: AsyncEngine | None,
+        max_lag: float = 5.0,
+        interval: float = 0.5,
+    ) -> None:
+        self.primary = primary
+        self.replica = replica
+        self.max_lag = max_lag
+        self.interval = interval
+        self.replay_lsn: int | None = None
+        self.lag: float | None = None
+        self._checked_at = 0.0
+        self._task: asyncio.Task | None = None
+        if replica is not None:
+            _track_writes()
+
+    @property
+    def enabled(self) -> bool:
+        return self.replica is not None
+
+    def use_replica(self) -> bool:
+        """Whether a read-only session of the current request may use the replica."""
+        if self.replica is None:
+            return False
+        reason = self._primary_reason()
+        if reason is None:
+            read_routes.inc(target="replica", reason="caught_up")
+            return True
+        read_routes.inc(target="primary", reason=reason)
+        return False
+
+    def _primary_reason(self) -> str | None:
+        if self.replay_lsn is None or time.monotonic() - self._checked_at > 3 * self.interval:
+            return "unavailable"
+        if self.lag > self.max_lag:
+            return "lagging"
+        state = _request.get()
+        if state is None:
+            return None
+        if state.written or any(s.info.get(_WROTE_KEY) for s in state.sessions):
+            return "own_write"
+        if state.read_after is not None and self.replay_lsn < state.read_after:
+            return "read_after"
+        return None
+
+    def track(self, session: AsyncSession) -> None:
+        """Register a primary session of the current request (see module docstring)."""
+        state = _request.get()
+        if state is not None:
+            state.sessions.append(session)
+
+    def note_write(self) -> None:
+        """A write committed outside the request's sessions (e.g. write-behind)."""
+        state = _request.get()
+        if state is not None:
+            state.written = True
+
+    # -------- lag monitor --------
+
+    def start(self) -> None:
+        if self.replica is not None and self._task is None:
+            self._task = asyncio.create_task(self._run(), name="replica-monitor")
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.check()
+            except Exception as e:
+                logger.warning("Replica status check failed: %s", e)
+            await asyncio.sleep(self.interval)
+
+    async def check(self) -> None:
+        async with self.replica.connect() as conn:
+            lsn, lag = (await conn.execute(_STATUS_SQL)).one()
+        self.replay_lsn = parse_lsn(lsn)
+        self.lag = float(lag)
+        self._checked_at = time.monotonic()
+        replica_lag.set(self.lag)
+
+    # -------- request hooks (ReadYourWritesMiddleware) --------
+
+    async def finish_writes(self, state: RequestState) -> int | None:
+        """Commit the request's sessions that wrote; the primary's LSN if anything was written."""
+        for session in state.sessions:
+            if session.info.get(_WROTE_KEY) and session.in_transaction():
+                await session.commit()
+        if not state.written:
+            return None
+        async with self.primary.connect() as conn:
+            return parse_lsn(await conn.scalar(_CURRENT_LSN_SQL))
+
+
+def _track_writes() -> None:
+    """Mark sessions that wrote; a committed write marks the request."""
+    if event.contains(Session, "after_flush", _on_flush):
+        return
+    event.listen(Session, "after_flush", _on_flush)
+    event.listen(Session, "do_orm_execute", _on_execute)
+    event.listen(Session, "after_commit", _on_commit)
+    event.listen(Session, "after_soft_rollback", _on_rollback)
+
+
+def _on_flush(session: Session, flush_context) -> None:
+    session.info[_WROTE_KEY] = True
+
+
+def _on_execute(state) -> None:
+    statement = state.statement
+    if statement.is_dml or (isinstance(statement, TextClause) and not _READ_TEXT.match(statement.text)):
+        state.session.info[_WROTE_KEY] = True
+
+
+def _on_commit(session: Session) -> None:
+    if session.info.pop(_WROTE_KEY, False):
+        request = _request.get()
+        if request is not None:
+            request.written = True
+
+
+def _on_rollback(session: Session, previous_transaction) -> None:
+    session.info.pop(_WROTE_KEY, None)
+
+
+class ReadYourWritesMiddleware:
+    """Pure ASGI middleware: reads the token, returns a new one after writes."""
+
+    def __init__(self, app, router: ReplicaRouter, token_ttl: int = 60) -> None:
+        self.app = app
+        self.router = router
+        self.token_ttl = token_ttl
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        state = RequestState(read_after=_read_token(scope["headers"]))
+        token = _request.set(state)
+
+        async def send_with_token(message) -> None:
+            if message["type"] == "http.response.start":
+                lsn = await self.router.finish_writes(state)
+                if lsn is not None:
+                    value = format_lsn(lsn).encode()
+                    message = {**message, "headers": [
+                        *message.get("headers", ()),
+                        (HEADER, value),
+                        (b"set-cookie", b"%s=%s; Max-Age=%d; Path=/; HttpOnly; SameSite=Lax"
+                         % (COOKIE.encode(), value, self.token_ttl)),
+                    ]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_token)
+        finally:
+            _request.reset(token)
+
+
+def _read_token(headers: list[tuple[bytes, bytes]]) -> int | None:
+    """Header wins over cookie; malformed tokens are ignored."""
+    cookie = None
+    for name, value in headers:
+        if name == HEADER:
+            return parse_lsn(value.decode("latin-1").strip())
+        if name == b"cookie":
+            cookie = value.decode("latin-1")
+    if cookie is None:
+        return None
+    try:
+        morsel = SimpleCookie(cookie).get(COOKIE)
+    except CookieError:
+        return None
+    return parse_lsn(morsel.value) if morsel is not None else None
@@ -0,0 +1,236 @@
+"""
+Write-behind buffer with group commit for high-volume single-row inserts.
+
+Concurrent callers hand rows to a per-table buffer; rows arriving within
+max_delay (or up to max_batch of them) are written by one multi-row
+INSERT ... RETURNING (or COPY for large batches without RETURNING) in one
+transaction. write() returns after that transaction commits, so callers still
+get durability, at the cost of a few milliseconds of latency instead of two
+round trips per row.
+
+Rows are written in their own transaction, not the caller's session: use it
+for append-only rows whose parents are already committed (events, messages).
+A batch that fails is retried row by row so one bad row only fails its writer.
+"""
+import asyncio
+import contextvars
+import logging
+import os
+from typing import Any, Sequence
+
+from sqlalchemy import Table, insert
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.core import metrics
+from app.core.database import engine as default_engine, replica_router
+
+logger = logging.getLogger(__name__)
+
+writebehind_rows = metrics.counter(
+    "writebehind_rows_total",
+    "Rows written by write-behind buffers by table and method (insert, copy, single)",
+)
+writebehind_batch_size = metrics.gauge(
+    "writebehind_last_batch_size",
+    "Rows in the last group commit by table",
+)
+
+_buffers: list["WriteBehindBuffer"] = []
+
+
+class WriteBehindBuffer:
+    def __init__(
+        self,
+        table: Table,
+        *,
+        returning: Sequence[str] = (),
+        max_batch: int | None = None,
+        max_delay: float | None = None,
+        copy_threshold: int | None = None,
+        max_inflight: int = 4,
+        engine: AsyncEngine | None = None,
+    ) -> None:
+        self.table = table
+        self.returning = [table.c[name] for name in returning]
+        # Built once: executemany with it compiles and prepares one statement
+        # for every batch size (multi-row VALUES differ per row count)
+        self._insert_stmt = insert(table)
+        self.max_batch = max_batch or int(os.getenv("WRITE_BEHIND_MAX_BATCH", "1000"))
+        self.max_delay = (
+            max_delay if max_delay is not None
+            else float(os.getenv("WRITE_BEHIND_MAX_DELAY_MS", "2")) / 1000
+        )
+        # Capped at max_batch: a larger threshold would never be reached
+        self.copy_threshold = min(
+            copy_threshold or int(os.getenv("WRITE_BEHIND_COPY_THRESHOLD", "500")),
+            self.max_batch,
+        )
+        self.max_inflight = max_inflight
+        self._engine = engine
+
+        self._pending: list[tuple[dict[str, Any], asyncio.Future]] = []
+        self._full: asyncio.Event | None = None
+        self._inflight: asyncio.Semaphore | None = None
+        self._flusher: asyncio.Task | None = None
+        self._writes: set[asyncio.Task] = set()
+        _buffers.append(self)
+
+    @property
+    def engine(self) -> AsyncEngine:
+        return self._engine or default_engine
+
+    # -------- callers --------
+
+    async def write(self, row: dict[str, Any]) -> Row | None:
+        """Queue one row; returns its RETURNING row (or None) once committed."""
+        [result] = await self.write_many([row])
+        return result
+
+    async def write_many(self, rows: list[dict[str, Any]]) -> list[Row | None]:
+        """Queue rows; returns after the batches holding them commit."""
+        if not rows:
+            return []
+        loop = asyncio.get_running_loop()
+        if self._full is None:
+            self._full = asyncio.Event()
+            self._inflight = asyncio.Semaphore(self.max_inflight)
+
+        futures = []
+        for row in rows:
+            future = loop.create_future()
+            self._pending.append((self._with_defaults(row), future))
+            futures.append(future)
+
+        if len(self._pending) >= self.max_batch:
+            self._full.set()
+        if self._flusher is None or self._flusher.done():
+            # Fresh context: batches carry rows of many requests, they must not
+            # be attributed to the one that happened to start the flusher
+            self._flusher = asyncio.create_task(
+                self._flush_soon(),
+                name=f"writebehind-{self.table.name}",
+                context=contextvars.Context(),
+            )
+        # Shielded: a cancelled caller does not cancel the write of its row
+        results = list(await asyncio.shield(asyncio.gather(*futures)))
+        replica_router.note_write()
+        return results
+
+    def _with_defaults(self, row: dict[str, Any]) -> dict[str, Any]:
+        """Fill Python-side column defaults so every row in a batch has the same keys."""
+        row = dict(row)
+        for column in self.table.columns:
+            if column.key in row or column.default is None:
+                continue
+            default = column.default
+            if default.is_callable:
+                row[column.key] = default.arg(None)
+            elif default.is_scalar:
+                row[column.key] = default.arg
+        return row
+
+    # -------- group commit --------
+
+    async def _flush_soon(self) -> None:
+        while self._pending:
+            try:
+                await asyncio.wait_for(self._full.wait(), timeout=self.max_delay)
+            except asyncio.TimeoutError:
+                pass
+            self._full.clear()
+            while self._pending:
+                batch = self._pending[:self.max_batch]
+                del self._pending[:self.max_batch]
+                # Next batch fills up while this one commits
+                await self._inflight.acquire()
+                task = asyncio.create_task(self._write_batch(batch))
+                self._writes.add(task)
+                task.add_done_callback(self._writes.discard)
+                if len(self._pending) < self.max_batch:
+                    break
+
+    async def _write_batch(self, batch: list[tuple[dict[str, Any], asyncio.Future]]) -> None:
+        try:
+            rows = [row for row, _ in batch]
+            try:
+                async with self.engine.begin() as conn:
+                    results = await self._insert(conn, rows)
+            except Exception as e:
+                if len(batch) == 1:
+                    _set_exception(batch[0][1], e)
+                    return
+                logger.warning("Write-behind batch into %s failed, retrying rows one by one: %s", self.table.name, e)
+                await self._write_singly(batch)
+                return
+            writebehind_batch_size.set(len(rows), table=self.table.name)
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self._inflight.release()
+
+    async def _write_singly(self, batch: list[tuple[dict[str, Any], asyncio.Future]]) -> None:
+        for row, future in batch:
+            try:
+                async with self.engine.begin() as conn:
+                    [result] = await self._insert(conn, [row], method="single")
+            except Exception as e:
+                _set_exception(future, e)
+            else:
+                if not future.done():
+                    future.set_result(result)
+
+    async def _insert(
+        self,
+        conn: AsyncConnection,
+        rows: list[dict[str, Any]],
+        method: str | None = None,
+    ) -> list[Row | None]:
+        if not self.returning and len(rows) >= self.copy_threshold:
+            await self._copy(conn, rows)
+            writebehind_rows.inc(len(rows), table=self.table.name, method="copy")
+            return [None] * len(rows)
+
+        if self.returning:
+            # Multi-row VALUES ... RETURNING yields rows in VALUES order
+            stmt = insert(self.table).values(rows).returning(*self.returning)
+            results: list[Row | None] = list((await conn.execute(stmt)).all())
+        else:
+            await conn.execute(self._insert_stmt, rows)
+            results = [None] * len(rows)
+        writebehind_rows.inc(len(rows), table=self.table.name, method=method or "insert")
+        return results
+
+    async def _copy(self, conn: AsyncConnection, rows: list[dict[str, Any]]) -> None:
+        columns = list(rows[0])
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            self.table.name,
+            records=[tuple(row[c] for c in columns) for row in rows],
+            columns=columns,
+            schema_name=self.table.schema,
+        )
+
+    # -------- lifecycle --------
+
+    async def close(self) -> None:
+        """Write everything still pending and wait for in-flight batches."""
+        if self._flusher is not None:
+            if self._full is not None:
+                self._full.set()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+        if self._writes:
+            await asyncio.gather(*self._writes, return_exceptions=True)
+
+
+def _set_exception(future: asyncio.Future, error: Exception) -> None:
+    if not future.done():
+        future.set_exception(error)
+
+
+async def close_all() -> None:
+    """Flush all buffers. Call on app shutdown before close_db()."""
+    for buffer in _buffers:
+        await buffer.close()
@@ -20,12 +20,28 @@ class BaseIntegration(ABC):
     events: ClassVar[list[EventSpec]] = []
     secrets: ClassVar[list[SecretSpec]] = []
 
+    # action name -> spec, built once per subclass
+    _actions_by_name: ClassVar[dict[str, ActionSpec]] = {}
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._actions_by_name = {spec.name: spec for spec in cls.actions}
+
     # -------- public API --------
 
     @abstractmethod
     async def handle_webhook(self, payload: dict) -> Event:
         ...
 
+    @classmethod
+    def webhook_external_id(cls, payload: dict) -> str | None:
+        """
+        external_id of a raw webhook payload, read without credentials, so
+        redeliveries are dropped before the connector is built. None: not
+        known until handle_webhook() parses the payload.
+        """
+        return None
+
     async def execute(self, action: Action) -> Any:
         spec = self.get_action_spec(action.type)
 
@@ -39,10 +55,10 @@ class BaseIntegration(ABC):
 
     @classmethod
     def get_action_spec(cls, name: str) -> ActionSpec:
-        for spec in cls.actions:
-            if spec.name == name:
-                return spec
-        raise ValueError(f"Unknown action: {name}")
+        try:
+            return cls._actions_by_name[name]
+        except KeyError:
+            raise ValueError(f"Unknown action: {name}") from None
 
     @classmethod
     def validate_action_payload(cls, action: Action):
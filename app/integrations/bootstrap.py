@@ -6,6 +6,7 @@ from fastapi import FastAPI
 
 from app.core.database import session_context
 from app.modules.events.service import EventService
+from app.modules.integrations.polling import PollingRunner, polling_tenants
 from app.modules.integrations.service import IntegrationService
 from app.modules.secrets.base import SecretsManager
 
@@ -27,4 +28,17 @@ async def init_integrations(app: FastAPI, secrets: SecretsManager) -> None:
         service = IntegrationService(db, registry, secrets, event_service)
         await service.sync()
 
+    tenants = polling_tenants()
+    if tenants:
+        runner = PollingRunner(registry, secrets)
+        await runner.start(tenants)
+        app.state.polling = runner
+
     logger.info("Integrations initialized")
+
+
+async def close_integrations(app: FastAPI) -> None:
+    """Stop background ingestion started in init_integrations."""
+    runner: PollingRunner | None = getattr(app.state, "polling", None)
+    if runner is not None:
+        await runner.stop()
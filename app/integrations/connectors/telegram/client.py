@@ -1,13 +1,27 @@
 import httpx
 
 class TelegramClient:
-    def __init__(self, token: str):
+    def __init__(self, token: str, http: httpx.AsyncClient | None = None):
         self.token = token
         self.base_url = f"https://api.telegram.org/bot{token}"
+        # Shared client for long-lived users (polling); otherwise one per call
+        self._http = http
 
-    async def _post(self, method: str, payload: dict):
+    @property
+    def bot_id(self) -> str:
+        """Numeric bot id (token prefix) — safe to log and store, unlike the token."""
+        return self.token.split(":", 1)[0]
+
+    async def _post(self, method: str, payload: dict, timeout: float | None = None):
+        kwargs = {"json": payload}
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+        if self._http is not None:
+            r = await self._http.post(f"{self.base_url}/{method}", **kwargs)
+            r.raise_for_status()
+            return r.json()
         async with httpx.AsyncClient() as client:
-            r = await client.post(f"{self.base_url}/{method}", json=payload)
+            r = await client.post(f"{self.base_url}/{method}", **kwargs)
             r.raise_for_status()
             return r.json()
 
@@ -16,3 +30,26 @@ class TelegramClient:
             "chat_id": chat_id,
             "text": text
         })
+
+    async def get_updates(
+        self,
+        offset: int | None = None,
+        timeout: int = 30,
+        limit: int = 100,
+        allowed_updates: list[str] | None = None,
+    ) -> list[dict]:
+        """Long polling. Passing offset confirms all updates with a lower update_id."""
+        payload: dict = {"timeout": timeout, "limit": limit}
+        if offset is not None:
+            payload["offset"] = offset
+        if allowed_updates is not None:
+            payload["allowed_updates"] = allowed_updates
+        # HTTP timeout must outlive the server-side long poll
+        data = await self._post("getUpdates", payload, timeout=timeout + 10)
+        return data["result"]
+
+    async def delete_webhook(self, drop_pending_updates: bool = False):
+        """getUpdates is rejected while a webhook is set."""
+        return await self._post("deleteWebhook", {
+            "drop_pending_updates": drop_pending_updates
+        })
@@ -46,12 +46,21 @@ class TelegramConnector(BaseIntegration):
 
     # ---------------------------
 
+    @classmethod
+    def webhook_external_id(cls, payload: dict) -> str | None:
+        # message_id is unique only within its chat
+        message = payload.get("message")
+        if not isinstance(message, dict) or "message_id" not in message:
+            return None
+        chat_id = message.get("chat", {}).get("id")
+        return f"{chat_id}:{message['message_id']}"
+
     async def handle_webhook(self, payload: dict) -> Event:
         message = payload["message"]
 
         return Event(
             type="telegram.message.received",
-            external_id=str(message["message_id"]),
+            external_id=f"{message['chat']['id']}:{message['message_id']}",
             payload={
                 "chat_id": str(message["chat"]["id"]),
                 "user_id": str(message["from"]["id"]),
@@ -0,0 +1,75 @@
+"""
+Long-polling ingestion for deployments without a public webhook URL.
+
+TelegramPoller only talks to the Bot API; what happens to a batch (events,
+offset checkpoint) is up to the sink, so the poller stays free of DB code.
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+from .client import TelegramClient
+
+logger = logging.getLogger(__name__)
+
+# sink(updates, next_offset): must persist updates and next_offset atomically
+BatchSink = Callable[[list[dict], int], Awaitable[None]]
+
+ALLOWED_UPDATES = ["message"]
+
+
+class TelegramPoller:
+    """getUpdates loop for one bot token."""
+
+    def __init__(
+        self,
+        client: TelegramClient,
+        sink: BatchSink,
+        offset: int | None = None,
+        timeout: int = 30,
+        limit: int = 100,
+        max_backoff: float = 60.0,
+    ) -> None:
+        self.client = client
+        self.sink = sink
+        self.offset = offset
+        self.timeout = timeout
+        self.limit = limit
+        self.max_backoff = max_backoff
+
+    async def run(self) -> None:
+        logger.info("Telegram polling started: bot=%s offset=%s", self.client.bot_id, self.offset)
+
+        webhook_deleted = False
+        backoff = 1.0
+        while True:
+            try:
+                if not webhook_deleted:
+                    # getUpdates is refused while a webhook is set
+                    await self.client.delete_webhook()
+                    webhook_deleted = True
+                updates = await self.client.get_updates(
+                    offset=self.offset,
+                    timeout=self.timeout,
+                    limit=self.limit,
+                    allowed_updates=ALLOWED_UPDATES,
+                )
+                if updates:
+                    next_offset = max(u["update_id"] for u in updates) + 1
+                    # Offset advances only after the sink committed the batch together
+                    # with its checkpoint; on failure the same batch is fetched again
+                    await self.sink(updates, next_offset)
+                    self.offset = next_offset
+                backoff = 1.0
+            except asyncio.CancelledError:
+                logger.info("Telegram polling stopped: bot=%s", self.client.bot_id)
+                raise
+            except Exception as e:
+                logger.warning(
+                    "Telegram polling error: bot=%s retry_in=%.0fs error=%s",
+                    self.client.bot_id,
+                    backoff,
+                    e,
+                )
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
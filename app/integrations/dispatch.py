@@ -0,0 +1,103 @@
+"""
+Compiled connectors: dispatch tables built once at discovery.
+
+For every action the handler is resolved from the class (called with the
+connector instance), the payload validator is bound and the JSON schema is
+generated up front, so executing an action is a dict lookup plus validation.
+"""
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Type
+
+from pydantic import BaseModel
+
+from app.integrations.base import BaseIntegration
+from app.integrations.specs import ActionSpec
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledAction:
+    spec: ActionSpec
+    handler: Callable[[BaseIntegration, BaseModel], Awaitable[Any]]
+    validate: Callable[[dict], BaseModel]
+    validate_json: Callable[[bytes | str], BaseModel]
+    schema: dict
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledIntegration:
+    integration: Type[BaseIntegration]
+    actions: dict[str, CompiledAction] = field(default_factory=dict)
+
+    @classmethod
+    def compile(cls, integration: Type[BaseIntegration]) -> "CompiledIntegration":
+        actions: dict[str, CompiledAction] = {}
+        for spec in integration.actions:
+            handler = getattr(integration, spec.handler, None)
+            if handler is None:
+                raise TypeError(
+                    f"{integration.__name__}: handler '{spec.handler}' "
+                    f"for action '{spec.name}' is not defined"
+                )
+            actions[spec.name] = CompiledAction(
+                spec=spec,
+                handler=handler,
+                validate=spec.model.model_validate,
+                validate_json=spec.model.model_validate_json,
+                schema=spec.schema,
+            )
+        return cls(integration=integration, actions=actions)
+
+    def action(self, name: str) -> CompiledAction:
+        try:
+            return self.actions[name]
+        except KeyError:
+            raise ValueError(f"Unknown action: {name}") from None
+
+    async def dispatch(
+        self,
+        connector: BaseIntegration,
+        action_type: str,
+        payload: dict | bytes | str,
+    ) -> Any:
+        """Validate payload (dict or raw JSON) and call the action handler."""
+        compiled = self.action(action_type)
+        if isinstance(payload, dict):
+            data = compiled.validate(payload)
+        else:
+            data = compiled.validate_json(payload)
+        return await compiled.handler(connector, data)
+
+    def describe(self) -> dict:
+        """Catalog entry for this connector."""
+        integration = self.integration
+        return {
+            "key": integration.key,
+            "name": integration.name,
+            "version": integration.version,
+            "actions": [
+                {
+                    "name": a.spec.name,
+                    "description": a.spec.description,
+                    "schema": a.schema,
+                }
+                for a in self.actions.values()
+            ],
+            "events": [e.model_dump() for e in integration.events],
+            "secrets": [s.model_dump() for s in integration.secrets],
+        }
+
+
+def build_catalog(entries: list[dict]) -> tuple[bytes, str]:
+    """Serialize catalog once from manifest entries; returns (body, strong ETag)."""
+    body = json.dumps(
+        [
+            {k: v for k, v in entry.items() if k not in ("module", "class")}
+            for entry in entries
+        ],
+        separators=(",", ":"),
+        sort_keys=True,
+    ).encode()
+    etag = '"' + hashlib.sha256(body).hexdigest() + '"'
+    return body, etag
@@ -0,0 +1,105 @@
+"""
+Connector manifest: keys, metadata and action schemas of every connector,
+generated ahead of time so the registry can start without importing connectors.
+
+Generate with `python scripts/build_integrations_manifest.py` (or
+`make integrations-manifest`) after adding or changing a connector.
+"""
+import importlib
+import importlib.util
+import json
+import logging
+import pkgutil
+from pathlib import Path
+from typing import Any, Iterator, Type
+
+from app.integrations.base import BaseIntegration
+from app.integrations.dispatch import CompiledIntegration
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = "manifest.json"
+MANIFEST_VERSION = 1
+DEFAULT_PACKAGE = "app.integrations.connectors"
+
+
+def package_dir(package: str = DEFAULT_PACKAGE) -> Path:
+    """Directory of the connectors package, resolved without importing connectors."""
+    spec = importlib.util.find_spec(package)
+    if spec is None or not spec.submodule_search_locations:
+        raise ModuleNotFoundError(f"Connectors package '{package}' not found")
+    return Path(list(spec.submodule_search_locations)[0])
+
+
+def manifest_path(package: str = DEFAULT_PACKAGE) -> Path:
+    return package_dir(package) / MANIFEST_FILENAME
+
+
+def connector_modules(package: str = DEFAULT_PACKAGE) -> list[str]:
+    """Names of connector subpackages (filesystem scan only)."""
+    spec = importlib.util.find_spec(package)
+    return sorted(
+        name for _, name, _ in pkgutil.iter_modules(spec.submodule_search_locations)
+    )
+
+
+def iter_integrations(module: Any) -> Iterator[Type[BaseIntegration]]:
+    for obj in module.__dict__.values():
+        if (
+            isinstance(obj, type)
+            and issubclass(obj, BaseIntegration)
+            and obj is not BaseIntegration
+        ):
+            yield obj
+
+
+def describe(cls: Type[BaseIntegration], module: str) -> dict:
+    """Manifest entry: catalog description + where to import the class from."""
+    entry = CompiledIntegration.compile(cls).describe()
+    entry["description"] = getattr(cls, "description", "")
+    entry["module"] = module
+    entry["class"] = cls.__name__
+    return entry
+
+
+def build_manifest(package: str = DEFAULT_PACKAGE) -> dict:
+    """Import every connector (eager) and describe it."""
+    connectors = []
+    for name in connector_modules(package):
+        module_name = f"{package}.{name}"
+        module = importlib.import_module(module_name)
+        for cls in iter_integrations(module):
+            if getattr(cls, "key", None):
+                connectors.append(describe(cls, module_name))
+    connectors.sort(key=lambda e: e["key"])
+    return {"version": MANIFEST_VERSION, "package": package, "connectors": connectors}
+
+
+def dumps(manifest: dict) -> str:
+    return json.dumps(manifest, indent=2, sort_keys=True, ensure_ascii=False) + "\n"
+
+
+def write_manifest(package: str = DEFAULT_PACKAGE) -> Path:
+    path = manifest_path(package)
+    path.write_text(dumps(build_manifest(package)), encoding="utf-8")
+    return path
+
+
+def load_manifest(package: str = DEFAULT_PACKAGE) -> dict | None:
+    """Manifest contents, or None if missing / unreadable / other format version."""
+    try:
+        path = manifest_path(package)
+        manifest = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning("Cannot read integrations manifest: %s", e)
+        return None
+    if manifest.get("version") != MANIFEST_VERSION:
+        logger.warning(
+            "Integrations manifest version %s != %s, ignoring",
+            manifest.get("version"),
+            MANIFEST_VERSION,
+        )
+        return None
+    return manifest
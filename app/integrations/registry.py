@@ -1,39 +1,75 @@
-import pkgutil
 import importlib
 import logging
+import os
 from typing import Dict, Type
 from app.integrations.base import BaseIntegration
+from app.integrations.dispatch import CompiledIntegration, build_catalog
+from app.integrations import manifest as connector_manifest
 
 logger = logging.getLogger(__name__)
 
 class IntegrationRegistry:
     """
+    Connector classes by key.
+
+    With a manifest (default) discover() only reads metadata; connector modules
+    are imported on first get(). Without one, every connector is imported eagerly.
     """
-    def __init__(self):
+    def __init__(self, package: str = connector_manifest.DEFAULT_PACKAGE):
+        self.package = package
         self._map: Dict[str, Type[BaseIntegration]] = {}
+        self._compiled: Dict[str, CompiledIntegration] = {}
+        self._manifest: Dict[str, dict] = {}
+        self._catalog: tuple[bytes, str] | None = None
 
-    def discover(self) -> None:
-        import app.integrations.connectors as pkg
+    def discover(self, lazy: bool | None = None) -> None:
+        if lazy is None:
+            lazy = os.getenv("INTEGRATIONS_LAZY", "1") == "1"
 
-        logger.info("Starting integration discovery...")
+        logger.info("Starting integration discovery (lazy=%s)...", lazy)
 
-        count = 0
+        manifest = connector_manifest.load_manifest(self.package) if lazy else None
 
-        for _, module_name, _ in pkgutil.iter_modules(pkg.__path__):
-            module = importlib.import_module(
-                f"{pkg.__name__}.{module_name}"
-            )
+        if manifest is None:
+            if lazy:
+                logger.warning("Integrations manifest not found, importing all connectors")
+            for module_name in connector_manifest.connector_modules(self.package):
+                self._import(f"{self.package}.{module_name}")
+        else:
+            for entry in manifest["connectors"]:
+                self._manifest[entry["key"]] = entry
+
+            # Connectors added after the manifest was generated: import eagerly
+            known = {entry["module"] for entry in manifest["connectors"]}
+            for module_name in connector_manifest.connector_modules(self.package):
+                full_name = f"{self.package}.{module_name}"
+                if full_name not in known:
+                    logger.warning(
+                        "Connector %s missing from manifest (regenerate it), importing",
+                        full_name,
+                    )
+                    self._import(full_name)
 
-            for obj in module.__dict__.values():
-                if (
-                    isinstance(obj, type)
-                    and issubclass(obj, BaseIntegration)
-                    and obj is not BaseIntegration
-                ):
-                    self._register(obj)
-                    count += 1
+        logger.info("Integration discovery finished. Known=%s", len(self._manifest))
 
-        logger.info("Integration discovery finished. Loaded=%s", count)
+    def _import(self, module_name: str) -> None:
+        module = importlib.import_module(module_name)
+        for obj in connector_manifest.iter_integrations(module):
+            self._register(obj)
+            if obj.key:
+                self._manifest[obj.key] = connector_manifest.describe(obj, module_name)
+
+    def _load(self, key: str) -> None:
+        """Import connector module from its manifest entry."""
+        entry = self._manifest[key]
+        module = importlib.import_module(entry["module"])
+        cls = getattr(module, entry["class"], None)
+        if cls is None or getattr(cls, "key", None) != key:
+            raise KeyError(
+                f"Integration '{key}': manifest points to {entry['module']}.{entry['class']} "
+                "which does not define it (regenerate manifest)"
+            )
+        self._register(cls)
 
     def _register(self, cls: Type[BaseIntegration]) -> None:
         key = cls.key
@@ -45,7 +81,7 @@ class IntegrationRegistry:
             )
             return
 
-        if key in self._map:
+        if key in self._map and self._map[key] is not cls:
             logger.warning(
                 "Duplicate integration key '%s'. Overriding %s with %s",
                 key,
@@ -54,6 +90,7 @@ class IntegrationRegistry:
             )
 
         self._map[key] = cls
+        self._compiled[key] = CompiledIntegration.compile(cls)
 
         logger.info(
             "Registered integration: key=%s class=%s",
@@ -63,8 +100,30 @@ class IntegrationRegistry:
 
     def get(self, key: str) -> Type[BaseIntegration]:
         if key not in self._map:
-            raise KeyError(f"Integration '{key}' not registered")
+            if key not in self._manifest:
+                raise KeyError(f"Integration '{key}' not registered")
+            self._load(key)
         return self._map[key]
 
+    def compiled(self, key: str) -> CompiledIntegration:
+        """Dispatch table for connector (built at registration)."""
+        self.get(key)
+        return self._compiled[key]
+
+    def manifest(self) -> Dict[str, dict]:
+        """Metadata of all known connectors by key. Does not import connectors."""
+        return self._manifest
+
+    def catalog(self) -> tuple[bytes, str]:
+        """Serialized catalog of all connectors and its ETag. Built once, reused."""
+        if self._catalog is None:
+            self._catalog = build_catalog(
+                [self._manifest[key] for key in sorted(self._manifest)]
+            )
+        return self._catalog
+
     def all(self) -> Dict[str, Type[BaseIntegration]]:
-        return self._map
\ No newline at end of file
+        """All connector classes. Imports every connector; prefer manifest()."""
+        for key in self._manifest:
+            self.get(key)
+        return self._map
@@ -1,3 +1,4 @@
+from functools import cached_property
 from typing import Type, Any
 from pydantic import BaseModel
 
@@ -9,10 +10,15 @@ class ActionSpec(BaseModel):
     handler: str
 
     def validate(self, payload: dict) -> BaseModel:
-        return self.model(**payload)
+        return self.model.model_validate(payload)
 
-    @property
+    def validate_json(self, raw: bytes | str) -> BaseModel:
+        """Validate straight from JSON text; skips building an intermediate dict."""
+        return self.model.model_validate_json(raw)
+
+    @cached_property
     def schema(self) -> dict:
+        # Specs are declared once per connector class; generate the schema once
         return self.model.model_json_schema()
 
 
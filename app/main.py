@@ -1,38 +1,109 @@
+import asyncio
+import importlib
 import logging
+import os
+import time
 
 from contextlib import asynccontextmanager
 
 from fastapi import Depends, FastAPI
 
+from app.api.metrics import router as metrics_router
+from app.api.ratelimits import close_rate_limits, init_rate_limits, limiter
 from app.api.router import api_router
-from app.core.database import close_db, init_db
-from app.integrations.bootstrap import init_integrations
+from app.core import notify, profiler, writebehind
+from app.core.database import (
+    close_db,
+    engine,
+    init_db,
+    pool_stats,
+    replica_engine,
+    replica_router,
+)
+from app.core.pool import AdmissionMiddleware
+from app.core.ratelimit import RateLimitMiddleware
+from app.core.replica import ReadYourWritesMiddleware
+from app.integrations.bootstrap import close_integrations, init_integrations
 from app.modules.agents.bootstrap import init_agents
+from app.modules.events.bootstrap import close_events, init_events
 from app.integrations.models import Action
 from app.modules.integrations.deps import get_integration_service
 from app.modules.secrets.deps import get_secrets
 from app.modules.integrations.service import IntegrationService
 from app.modules.secrets.base import SecretsManager
 from app.modules.secrets.bootstrap import init_secrets
+from app.modules.threads.bootstrap import close_threads, init_threads
 
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
 )
+logger = logging.getLogger(__name__)
+
+# Imported lazily by the code using them; STARTUP_PRELOAD=1 loads them in a
+# worker thread once the app is serving, so the first request does not pay
+PRELOAD_MODULES = ("hvac", "langchain_core.messages", "langchain_openai")
+
+
+def _preload() -> None:
+    for name in PRELOAD_MODULES:
+        importlib.import_module(name)
+
+
+async def _init_integrations(app: FastAPI, events: asyncio.Task, secrets: asyncio.Task) -> None:
+    # Polling may ingest events right away: the sink must be set up first
+    await events
+    await init_integrations(app, await secrets)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    started = time.perf_counter()
     await init_db()
-    await init_agents()
-    secrets = await init_secrets(app)
-    await init_integrations(app, secrets)
+    # Independent steps run concurrently; integrations wait for events and secrets
+    async with asyncio.TaskGroup() as tg:
+        tg.create_task(init_agents())
+        tg.create_task(init_rate_limits(app))
+        tg.create_task(init_threads(app))
+        events = tg.create_task(init_events(app))
+        secrets = tg.create_task(init_secrets(app))
+        tg.create_task(_init_integrations(app, events, secrets))
+    logger.info("Startup finished in %.0f ms", (time.perf_counter() - started) * 1000)
+    preload = None
+    if os.getenv("STARTUP_PRELOAD", "1") == "1":
+        preload = asyncio.create_task(asyncio.to_thread(_preload))
     yield
+    if preload is not None:
+        await asyncio.gather(preload, return_exceptions=True)
+    await close_rate_limits(app)
+    await close_threads(app)
+    await close_integrations(app)
+    await writebehind.close_all()
+    await close_events(app)
+    await notify.listener.close()
     await close_db()
 
 
 app = FastAPI(lifespan=lifespan)
+if profiler.enabled():
+    profiler.install(engine)
+    if replica_engine is not None:
+        profiler.install(replica_engine)
+    app.add_middleware(profiler.QueryProfilerMiddleware, **profiler.middleware_options())
+if replica_router.enabled:
+    app.add_middleware(
+        ReadYourWritesMiddleware,
+        router=replica_router,
+        token_ttl=int(os.getenv("DATABASE_REPLICA_TOKEN_TTL", "60")),
+    )
+if limiter is not None:
+    app.add_middleware(RateLimitMiddleware, limiter=limiter)
+# Outermost: shed load before any other work is done for the request
+admission_max_wait = float(os.getenv("DB_ADMISSION_MAX_WAIT_MS", "1000")) / 1000
+if admission_max_wait > 0:
+    app.add_middleware(AdmissionMiddleware, stats=pool_stats, max_wait=admission_max_wait)
 app.include_router(api_router)
+app.include_router(metrics_router)
 
 
 @app.get("/")
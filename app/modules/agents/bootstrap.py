@@ -1,8 +1,10 @@
-"""Bootstrap: ensure platform LLM agent exists on startup."""
+"""Bootstrap: ensure platform LLM agent exists on startup; subscribe the agent cache to invalidations."""
 
 import logging
 
+from app.core import notify
 from app.core.database import session_context
+from app.modules.agents.cache import CHANNEL, directory
 from app.modules.agents.service import AgentService
 
 logger = logging.getLogger(__name__)
@@ -16,4 +18,8 @@ async def init_agents() -> None:
         service = AgentService(db)
         await service.ensure_platform_llm_agent()
 
+    # Agent changes in other workers; a reconnect may have missed some
+    await notify.listener.listen(CHANNEL, directory.on_notify, on_reconnect=directory.clear)
+    notify.listener.start()
+
     logger.info("Agents initialized")
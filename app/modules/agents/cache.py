@@ -0,0 +1,165 @@
+"""
+Agent directory cache: read-through, size-bounded, per worker.
+
+Caches agents by id, each tenant's system and human agent, the platform
+LLM agents, and (separately, LRU) agent ids by integration origin. Agents
+change rarely; AgentService invalidates on create/update: locally once the
+transaction commits, and in other workers through NOTIFY agents_changed
+(sent in the same transaction).
+
+Lookups return detached copies, so a cached agent is never shared between
+sessions. A generation counter stops a read that raced an invalidation from
+caching the stale row; AGENTS_CACHE_TTL bounds staleness if a notification
+is lost while the listener reconnects (the cache is also cleared then).
+
+Origin -> id entries need no invalidation: an agent's origin never changes.
+"""
+import json
+import os
+import threading
+import uuid
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core import metrics
+from app.core.cache import TTLCache
+from app.modules.agents.models import Agent, AgentNature
+
+CHANNEL = "agents_changed"
+
+cache_requests = metrics.counter(
+    "agents_cache_requests_total",
+    "Agent directory cache lookups by kind (id, tenant, platform, origin) and result (hit, miss)",
+)
+cache_hit_ratio = metrics.gauge(
+    "agents_cache_hit_ratio",
+    "Agent directory cache hit ratio since start by kind",
+)
+
+# Cached "no such agent" for tenant lookups (tenants without a system agent)
+NONE = object()
+
+
+def snapshot(agent: Agent) -> Agent:
+    """Detached copy of the agent's column values."""
+    copy = Agent(**{attr.key: getattr(agent, attr.key) for attr in inspect(Agent).column_attrs})
+    make_transient_to_detached(copy)
+    return copy
+
+
+OriginKey = tuple[str, str]
+
+
+class AgentDirectory:
+    def __init__(self, maxsize: int, ttl: float | None, origins_maxsize: int = 100_000) -> None:
+        self._cache: TTLCache[tuple, object] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._origins: TTLCache[tuple, uuid.UUID] = TTLCache(maxsize=origins_maxsize, ttl=ttl)
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._hits: dict[str, int] = {}
+        self._lookups: dict[str, int] = {}
+
+    @property
+    def generation(self) -> int:
+        """Read before querying the DB; pass to put() so stale reads are not cached."""
+        return self._generation
+
+    def get(self, key: tuple):
+        """Cached value (an Agent copy, list of copies, or NONE), or None on miss."""
+        kind = key[0]
+        value = self._cache.get(key)
+        self._record(kind, value is not None)
+        if value is None or value is NONE:
+            return value
+        if isinstance(value, list):
+            return [snapshot(a) for a in value]
+        return snapshot(value)
+
+    def put(self, key: tuple, value: Agent | list[Agent] | None, generation: int) -> None:
+        with self._lock:
+            if generation != self._generation:
+                return
+            if value is None:
+                stored: object = NONE
+            elif isinstance(value, list):
+                stored = [snapshot(a) for a in value]
+            else:
+                stored = snapshot(value)
+            self._cache.set(key, stored)
+
+    def invalidate(self, agent_id: uuid.UUID | None, tenant_id: uuid.UUID | None) -> None:
+        with self._lock:
+            self._generation += 1
+            if agent_id is not None:
+                self._cache.pop(by_id(agent_id))
+            if tenant_id is None:
+                self._cache.pop(platform())
+            else:
+                for nature in AgentNature:
+                    self._cache.pop(by_tenant(tenant_id, nature))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._cache.clear()
+            self._origins.clear()
+
+    def origin_ids(
+        self, tenant_id: uuid.UUID, origins: list[OriginKey]
+    ) -> tuple[dict[OriginKey, uuid.UUID], list[OriginKey]]:
+        """Split origins into cached agent ids and misses."""
+        found: dict[OriginKey, uuid.UUID] = {}
+        missing: list[OriginKey] = []
+        for origin in origins:
+            agent_id = self._origins.get((tenant_id, *origin))
+            self._record("origin", agent_id is not None)
+            if agent_id is None:
+                missing.append(origin)
+            else:
+                found[origin] = agent_id
+        return found, missing
+
+    def put_origin_ids(self, tenant_id: uuid.UUID, ids: dict[OriginKey, uuid.UUID]) -> None:
+        for origin, agent_id in ids.items():
+            self._origins.set((tenant_id, *origin), agent_id)
+
+    def on_notify(self, payload: str) -> None:
+        """Callback for the shared listener (app.core.notify) on CHANNEL."""
+        data = json.loads(payload)
+        self.invalidate(
+            uuid.UUID(data["id"]) if data.get("id") else None,
+            uuid.UUID(data["tenant_id"]) if data.get("tenant_id") else None,
+        )
+
+    def _record(self, kind: str, hit: bool) -> None:
+        cache_requests.inc(kind=kind, result="hit" if hit else "miss")
+        self._lookups[kind] = self._lookups.get(kind, 0) + 1
+        self._hits[kind] = self._hits.get(kind, 0) + hit
+        cache_hit_ratio.set(self._hits[kind] / self._lookups[kind], kind=kind)
+
+
+def by_id(agent_id: uuid.UUID) -> tuple:
+    return ("id", agent_id)
+
+
+def by_tenant(tenant_id: uuid.UUID, nature: AgentNature) -> tuple:
+    return ("tenant", tenant_id, nature)
+
+
+def platform() -> tuple:
+    return ("platform",)
+
+
+def notification(agent_id: uuid.UUID | None, tenant_id: uuid.UUID | None) -> str:
+    return json.dumps({
+        "id": str(agent_id) if agent_id else None,
+        "tenant_id": str(tenant_id) if tenant_id else None,
+    })
+
+
+directory = AgentDirectory(
+    maxsize=int(os.getenv("AGENTS_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("AGENTS_CACHE_TTL", "300")) or None,
+    origins_maxsize=int(os.getenv("AGENTS_ORIGIN_CACHE_SIZE", "100000")),
+)
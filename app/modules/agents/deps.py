@@ -3,10 +3,15 @@
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.deps import get_db
+from app.core.deps import get_db, get_read_db
 from app.modules.agents.service import AgentService
 
 
 def get_agent_service(db: AsyncSession = Depends(get_db)) -> AgentService:
     """Request-scoped agent service."""
     return AgentService(db)
+
+
+def get_agent_reader(db: AsyncSession = Depends(get_read_db)) -> AgentService:
+    """Request-scoped agent service on a read-only session (replica when caught up)."""
+    return AgentService(db)
@@ -2,7 +2,7 @@
 import enum
 import uuid
 
-from sqlalchemy import Enum, ForeignKey, String
+from sqlalchemy import Enum, ForeignKey, Index, String, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -23,12 +23,25 @@ AgentType = AgentNature
 
 class Agent(BaseEntity):
     __tablename__ = "agents"
+    __table_args__ = (
+        # One agent per external user per tenant; target of bulk origin upserts
+        Index("uq_agents_tenant_origin", "tenant_id", "origin_type", "origin_id", unique=True),
+        # Keyset pagination of a tenant's agents; also serves tenant_id lookups.
+        # Partial: queries see active agents only (app.core.database)
+        Index(
+            "ix_agents_active_tenant_id_created_at_id",
+            "tenant_id",
+            "created_at",
+            "id",
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+        Index("ix_agents_active_origin_id", "origin_id", postgresql_where=text("deleted_at IS NULL")),
+    )
 
     tenant_id: Mapped[uuid.UUID | None] = mapped_column(
         UUID(as_uuid=True),
         ForeignKey("tenants.id", ondelete="CASCADE"),
         nullable=True,
-        index=True,
     )
     first_name: Mapped[str] = mapped_column(String(255), nullable=False)
     second_name: Mapped[str] = mapped_column(String(255), nullable=False, default="")
@@ -43,8 +56,8 @@ class Agent(BaseEntity):
         nullable=False,
     )
     # External integration: origin_type = "telegram" | "whatsapp" | connector key
-    origin_id: Mapped[str | None] = mapped_column(String(255), nullable=True, index=True)
-    origin_type: Mapped[str | None] = mapped_column(String(64), nullable=True, index=True)
+    origin_id: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    origin_type: Mapped[str | None] = mapped_column(String(64), nullable=True)
 
     threads: Mapped[list["Thread"]] = relationship(
         "Thread",
@@ -3,7 +3,10 @@ import uuid
 
 from fastapi import APIRouter, Depends, HTTPException, status
 
-from app.modules.agents.deps import get_agent_service
+from app.core.pagination import PageParams, page_params, set_page_headers
+from app.core.projection import rows_response
+
+from app.modules.agents.deps import get_agent_reader, get_agent_service
 from app.modules.agents.models import AgentNature
 from app.modules.agents.schemas import AgentCreate, AgentRead, AgentUpdate
 from app.modules.agents.service import AgentService
@@ -59,7 +62,12 @@ async def update_agent(
 @router.get("/tenant/{tenant_id}", response_model=list[AgentRead])
 async def get_agents_by_tenant(
     tenant_id: uuid.UUID,
-    service: AgentService = Depends(get_agent_service),
-) -> list[AgentRead]:
-    agents = await service.get_by_tenant(tenant_id)
-    return [AgentRead.model_validate(a) for a in agents]
+    page: PageParams = Depends(page_params),
+    service: AgentService = Depends(get_agent_reader),
+):
+    """Keyset-paginated: see X-Next-Cursor / X-Total-Count headers."""
+    agents, next_cursor = await service.list_by_tenant(tenant_id, page)
+    total = await service.count_by_tenant(tenant_id) if page.total else None
+    response = rows_response(agents, exclude=("created_at",))
+    set_page_headers(response, next_cursor, total)
+    return response
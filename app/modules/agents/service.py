@@ -1,25 +1,62 @@
 """Agent service: DB operations for agents."""
 import uuid
+from datetime import datetime, timezone
+from functools import partial
+from typing import NamedTuple
 
-from sqlalchemy import select
+from sqlalchemy import bindparam, literal, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core import notify, pagination
+from app.core.database import on_commit
+from app.core.pagination import Cursor, PageParams
+from app.modules.agents import cache
+from app.modules.agents.cache import directory
 from app.modules.agents.models import Agent, AgentNature
 from app.modules.agents.schemas import AgentCreate, AgentUpdate
 
 PLATFORM_SYSTEM_AGENT_FIRST_NAME = "Assistant"
 PLATFORM_SYSTEM_AGENT_SECOND_NAME = ""
 
+# Hot statements, built once (see app.core.database)
+_AGENT_BY_ID = select(Agent).where(Agent.id == bindparam("agent_id"))
+_TENANT_AGENT = (
+    select(Agent)
+    .where(Agent.tenant_id == bindparam("tenant_id"), Agent.nature == bindparam("nature"))
+    .limit(1)
+)
+
+# Origins per statement (11 bind params per origin, Postgres allows 32767)
+ORIGIN_CHUNK_SIZE = 1000
+
+
+class AgentOrigin(NamedTuple):
+    """External user of an integration; names are used only when the agent is created."""
+
+    origin_type: str
+    origin_id: str
+    first_name: str | None = None
+    second_name: str = ""
+
 
 class AgentService:
     def __init__(self, session: AsyncSession) -> None:
         self._session = session
 
     async def get_by_id(self, agent_id: uuid.UUID) -> Agent | None:
-        result = await self._session.execute(
-            select(Agent).where(Agent.id == agent_id)
-        )
-        return result.scalar_one_or_none()
+        """Cached (detached copy); update() reloads it into the session."""
+        key = cache.by_id(agent_id)
+        cached = directory.get(key)
+        if cached is not None and cached is not cache.NONE:
+            return cached
+        generation = directory.generation
+        result = await self._session.execute(_AGENT_BY_ID, {"agent_id": agent_id})
+        agent = result.scalar_one_or_none()
+        if agent is not None:
+            directory.put(key, agent, generation)
+        return agent
 
     async def get_by_tenant(self, tenant_id: uuid.UUID) -> list[Agent]:
         result = await self._session.execute(
@@ -27,8 +64,43 @@ class AgentService:
         )
         return list(result.scalars().all())
 
+    async def list_by_tenant(
+        self, tenant_id: uuid.UUID, page: PageParams
+    ) -> tuple[list[Row], Cursor | None]:
+        """
+        One keyset page of the tenant's agents in creation order: rows with the
+        AgentRead fields and created_at.
+        """
+        stmt = pagination.keyset(
+            select(
+                Agent.id,
+                Agent.tenant_id,
+                Agent.first_name,
+                Agent.second_name,
+                Agent.email,
+                Agent.nature,
+                Agent.origin_id,
+                Agent.origin_type,
+                Agent.created_at,
+            ).where(Agent.tenant_id == tenant_id),
+            Agent,
+            page,
+        )
+        result = await self._session.execute(stmt)
+        return pagination.split_page(result.all(), page)
+
+    async def count_by_tenant(self, tenant_id: uuid.UUID) -> tuple[int, bool]:
+        return await pagination.count(
+            self._session, select(Agent.id).where(Agent.tenant_id == tenant_id)
+        )
+
     async def get_platform_llm_agents(self) -> list[Agent]:
-        """Platform LLM agents (tenant_id is None): system and worker."""
+        """Platform LLM agents (tenant_id is None): system and worker. Cached."""
+        key = cache.platform()
+        cached = directory.get(key)
+        if cached is not None:
+            return cached
+        generation = directory.generation
         result = await self._session.execute(
             select(Agent)
             .where(
@@ -37,7 +109,9 @@ class AgentService:
             )
             .order_by(Agent.id)
         )
-        return list(result.scalars().all())
+        agents = list(result.scalars().all())
+        directory.put(key, agents, generation)
+        return agents
 
     async def get_available_for_tenant(self, tenant_id: uuid.UUID) -> list[Agent]:
         """Tenant agents + platform LLM agents for thread creation."""
@@ -45,6 +119,9 @@ class AgentService:
         return tenant_agents
 
     async def update(self, agent: Agent, data: AgentUpdate) -> Agent:
+        if agent not in self._session:
+            # Cached copy: apply changes to the current row
+            agent = await self._session.get(Agent, agent.id, populate_existing=True)
         if data.first_name is not None:
             agent.first_name = data.first_name
         if data.second_name is not None:
@@ -55,6 +132,7 @@ class AgentService:
             agent.nature = data.nature
         await self._session.flush()
         await self._session.refresh(agent)
+        await self._changed(agent)
         return agent
 
     async def create(self, tenant_id: uuid.UUID, data: AgentCreate) -> Agent:
@@ -68,8 +146,28 @@ class AgentService:
         self._session.add(agent)
         await self._session.flush()
         await self._session.refresh(agent)
+        await self._changed(agent)
         return agent
 
+    @staticmethod
+    def default_agent_rows(tenant_id: uuid.UUID, now: datetime) -> list[dict]:
+        """Column values of a new tenant's human and system agents, for bulk inserts."""
+        return [
+            {
+                "id": uuid.uuid4(),
+                "tenant_id": tenant_id,
+                "first_name": first_name,
+                "second_name": second_name,
+                "nature": nature,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for first_name, second_name, nature in (
+                ("User", "", AgentNature.Human),
+                (PLATFORM_SYSTEM_AGENT_FIRST_NAME, PLATFORM_SYSTEM_AGENT_SECOND_NAME, AgentNature.System),
+            )
+        ]
+
     async def create_human_for_tenant(self, tenant_id: uuid.UUID) -> Agent:
         """Create user (human) agent for a new tenant. Used when tenant is created."""
         agent = Agent(
@@ -81,6 +179,7 @@ class AgentService:
         self._session.add(agent)
         await self._session.flush()
         await self._session.refresh(agent)
+        await self._changed(agent)
         return agent
 
     async def create_system_for_tenant(self, tenant_id: uuid.UUID) -> Agent:
@@ -94,19 +193,12 @@ class AgentService:
         self._session.add(agent)
         await self._session.flush()
         await self._session.refresh(agent)
+        await self._changed(agent)
         return agent
 
     async def get_system_agent_for_tenant(self, tenant_id: uuid.UUID) -> Agent | None:
         """Get tenant's system agent (for LLM responses). Fallback to platform agent."""
-        result = await self._session.execute(
-            select(Agent)
-            .where(
-                Agent.tenant_id == tenant_id,
-                Agent.nature == AgentNature.System,
-            )
-            .limit(1)
-        )
-        agent = result.scalar_one_or_none()
+        agent = await self._get_tenant_agent(tenant_id, AgentNature.System)
         if agent:
             return agent
         # Fallback: platform system agent (for tenants created before per-tenant agents)
@@ -126,17 +218,114 @@ class AgentService:
         result = await self._session.execute(q.limit(1))
         return result.scalar_one_or_none()
 
+    async def resolve_or_create_by_origin(
+        self, tenant_id: uuid.UUID, origins: list[AgentOrigin]
+    ) -> dict[tuple[str, str], uuid.UUID]:
+        """
+        Agent ids for (origin_type, origin_id) pairs of a tenant, creating human
+        agents for new ones. Cache misses go to one INSERT ... ON CONFLICT DO
+        NOTHING per chunk whose CTE also selects the rows that already existed.
+        """
+        requested = {(o.origin_type, o.origin_id): o for o in origins}
+        ids, missing = directory.origin_ids(tenant_id, list(requested))
+        if not missing:
+            return ids
+
+        resolved: dict[tuple[str, str], uuid.UUID] = {}
+        created = False
+        for start in range(0, len(missing), ORIGIN_CHUNK_SIZE):
+            chunk = missing[start:start + ORIGIN_CHUNK_SIZE]
+            rows = await self._upsert_origins(tenant_id, [requested[k] for k in chunk])
+            for agent_id, origin_type, origin_id, inserted in rows:
+                resolved[(origin_type, origin_id)] = agent_id
+                created = created or inserted
+
+            # Inserted by a concurrent transaction after this statement's snapshot
+            late = [k for k in chunk if k not in resolved]
+            if late:
+                result = await self._session.execute(
+                    select(Agent.id, Agent.origin_type, Agent.origin_id)
+                    .where(
+                        Agent.tenant_id == tenant_id,
+                        tuple_(Agent.origin_type, Agent.origin_id).in_(late),
+                    )
+                    .execution_options(include_deleted=True)
+                )
+                for agent_id, origin_type, origin_id in result:
+                    resolved[(origin_type, origin_id)] = agent_id
+
+        on_commit(self._session, partial(directory.put_origin_ids, tenant_id, resolved))
+        if created:
+            # New human agents: the tenant's cached human agent may change
+            await self._invalidate(None, tenant_id)
+        return {**ids, **resolved}
+
+    async def _upsert_origins(
+        self, tenant_id: uuid.UUID, origins: list[AgentOrigin]
+    ) -> list[tuple[uuid.UUID, str, str, bool]]:
+        """(id, origin_type, origin_id, inserted) for every origin visible to the statement."""
+        now = datetime.now(timezone.utc)
+        inserted = (
+            insert(Agent.__table__)
+            .values([
+                {
+                    "id": uuid.uuid4(),
+                    "tenant_id": tenant_id,
+                    "first_name": o.first_name or o.origin_id,
+                    "second_name": o.second_name,
+                    "nature": AgentNature.Human,
+                    "origin_type": o.origin_type,
+                    "origin_id": o.origin_id,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for o in origins
+            ])
+            .on_conflict_do_nothing(index_elements=["tenant_id", "origin_type", "origin_id"])
+            .returning(Agent.__table__.c.id, Agent.__table__.c.origin_type, Agent.__table__.c.origin_id)
+            .cte("inserted")
+        )
+        pairs = [(o.origin_type, o.origin_id) for o in origins]
+        existing = select(
+            Agent.id, Agent.origin_type, Agent.origin_id, literal(False)
+        ).where(
+            Agent.tenant_id == tenant_id,
+            tuple_(Agent.origin_type, Agent.origin_id).in_(pairs),
+        )
+        # uq_agents_tenant_origin covers soft-deleted agents too: ON CONFLICT
+        # skips them, so they must be selected as well
+        stmt = select(
+            inserted.c.id, inserted.c.origin_type, inserted.c.origin_id, literal(True)
+        ).union_all(existing).execution_options(include_deleted=True)
+        result = await self._session.execute(stmt)
+        return [tuple(row) for row in result]
+
     async def get_human_agent_for_tenant(self, tenant_id: uuid.UUID) -> Agent | None:
         """Get tenant's human agent (for user messages)."""
+        return await self._get_tenant_agent(tenant_id, AgentNature.Human)
+
+    async def _get_tenant_agent(self, tenant_id: uuid.UUID, nature: AgentNature) -> Agent | None:
+        key = cache.by_tenant(tenant_id, nature)
+        cached = directory.get(key)
+        if cached is not None:
+            return None if cached is cache.NONE else cached
+        generation = directory.generation
         result = await self._session.execute(
-            select(Agent)
-            .where(
-                Agent.tenant_id == tenant_id,
-                Agent.nature == AgentNature.Human,
-            )
-            .limit(1)
+            _TENANT_AGENT, {"tenant_id": tenant_id, "nature": nature}
+        )
+        agent = result.scalar_one_or_none()
+        directory.put(key, agent, generation)
+        return agent
+
+    async def _changed(self, agent: Agent) -> None:
+        await self._invalidate(agent.id, agent.tenant_id)
+
+    async def _invalidate(self, agent_id: uuid.UUID | None, tenant_id: uuid.UUID | None) -> None:
+        """Invalidate cached directory entries here and, via NOTIFY, in other workers."""
+        on_commit(self._session, partial(directory.invalidate, agent_id, tenant_id))
+        await notify.notify(
+            self._session, cache.CHANNEL, cache.notification(agent_id, tenant_id)
         )
-        return result.scalar_one_or_none()
 
     async def ensure_platform_llm_agent(self) -> Agent:
         """Create platform LLM agent if not exists. Used at startup."""
@@ -152,4 +341,5 @@ class AgentService:
         self._session.add(agent)
         await self._session.flush()
         await self._session.refresh(agent)
+        await self._changed(agent)
         return agent
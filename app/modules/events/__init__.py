@@ -1,4 +1,5 @@
 from app.modules.events.models import Event
+from app.modules.events.router import router
 from app.modules.events.service import EventService
 
-__all__ = ["Event", "EventService"]
+__all__ = ["Event", "EventService", "router"]
@@ -0,0 +1,58 @@
+"""Bootstrap: ClickHouse client, the process-wide event sink, retention job and tenant stream."""
+
+import logging
+
+from fastapi import FastAPI
+
+from app.core import clickhouse, notify
+from app.modules.events import retention, sink, stream
+
+logger = logging.getLogger(__name__)
+
+
+async def init_events(app: FastAPI) -> None:
+    """Create event sink from env (EVENT_SINK) and start its flush loop."""
+    app.state.clickhouse = clickhouse.LazyClient() if clickhouse.enabled() else None
+
+    app.state.event_stream = stream.from_env()
+    if app.state.event_stream is not None:
+        await notify.listener.listen(stream.CHANNEL, app.state.event_stream.on_notify)
+        await notify.listener.listen(stream.PRESENCE_CHANNEL, stream.on_presence)
+        notify.listener.start()
+        app.state.event_stream.start()
+        stream.publisher = stream.StreamPublisher()
+
+    app.state.events_retention = None
+    if retention.enabled():
+        job = retention.RetentionJob(retention.EventRetention())
+        job.start()
+        app.state.events_retention = job
+        logger.info("Events retention job started")
+
+    event_sink = sink.from_env()
+    if event_sink is None:
+        logger.info("Event sink disabled")
+        return
+    event_sink.start()
+    sink.set_sink(event_sink)
+    logger.info("Event sink started: %s", event_sink.writer.__class__.__name__)
+
+
+async def close_events(app: FastAPI) -> None:
+    """Stop retention and the stream, flush buffered events and stop the sink."""
+    hub = getattr(app.state, "event_stream", None)
+    if hub is not None:
+        await hub.stop()
+    if stream.publisher is not None:
+        publisher, stream.publisher = stream.publisher, None
+        await publisher.close()
+    job = getattr(app.state, "events_retention", None)
+    if job is not None:
+        await job.stop()
+    event_sink = sink.current()
+    if event_sink is not None:
+        sink.set_sink(None)
+        await event_sink.close()
+    client = getattr(app.state, "clickhouse", None)
+    if client is not None:
+        await client.close()
@@ -0,0 +1,66 @@
+"""
+Recent external ids cache: drops redelivered webhooks without a DB round trip.
+
+The unique (tenant_id, integration_id, external_id) constraint on events is the
+source of truth; this cache only fronts it. Keys become visible to the cache
+after the transaction commits, so a rolled back insert never suppresses the
+provider's retry.
+"""
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from functools import partial
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import on_commit
+
+EventKey = tuple[str, uuid.UUID, str]
+
+
+class RecentIdsCache:
+    """Bounded LRU set of (tenant_id, integration_id, external_id)."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._items: OrderedDict[EventKey, None] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, key: EventKey) -> bool:
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                return True
+            return False
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def add(self, key: EventKey) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._items[key] = None
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def add_many(self, keys: list[EventKey]) -> None:
+        for key in keys:
+            self.add(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+recent_ids = RecentIdsCache(
+    maxsize=int(os.getenv("EVENTS_DEDUP_CACHE_SIZE", "100000")),
+)
+
+
+def stage(session: AsyncSession, keys: list[EventKey]) -> None:
+    """Add keys to recent_ids once this session commits."""
+    if keys:
+        on_commit(session, partial(recent_ids.add_many, keys))
@@ -1,12 +1,43 @@
 """Event module dependency providers. Wiring only."""
 
-from fastapi import Depends
+from fastapi import Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.deps import get_db
 from app.modules.events.service import EventService
+from app.modules.events.stats import EventStatsService
+from app.modules.events.stream import TenantStreamHub
 
 
 def get_event_service(db: AsyncSession = Depends(get_db)) -> EventService:
     """Request-scoped event service."""
     return EventService(db)
+
+
+async def get_event_stats_service(request: Request) -> EventStatsService:
+    """Stats over the ClickHouse client from app state (set in lifespan, connected on first use)."""
+    lazy_client = getattr(request.app.state, "clickhouse", None)
+    if lazy_client is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Event analytics are not configured",
+        )
+    try:
+        client = await lazy_client.get()
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Event analytics are unavailable",
+        ) from None
+    return EventStatsService(client)
+
+
+def get_tenant_stream_hub(request: Request) -> TenantStreamHub:
+    """Per-worker LISTEN hub from app state (set in lifespan)."""
+    hub = getattr(request.app.state, "event_stream", None)
+    if hub is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Event stream is not enabled",
+        )
+    return hub
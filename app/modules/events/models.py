@@ -1,20 +1,48 @@
-"""Event ORM model (Postgres)."""
+"""Event ORM models (Postgres)."""
 import uuid
+from datetime import date
 
-from sqlalchemy import String
+from sqlalchemy import BigInteger, Date, Index, String, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
-from app.core.database import BaseEntity
+from app.core.database import Base, BaseEntity
 
 
 class Event(BaseEntity):
     __tablename__ = "events"
+    __table_args__ = (
+        # Idempotent ingestion: providers redeliver webhooks on timeouts
+        UniqueConstraint(
+            "tenant_id",
+            "integration_id",
+            "external_id",
+            name="uq_events_tenant_integration_external_id",
+        ),
+        # Per-tenant time order: retention keyset scans, tenant history
+        Index("ix_events_tenant_id_created_at", "tenant_id", "created_at", "id"),
+        # Time-range scans; rows are appended in time order, so BRIN stays tiny
+        Index("ix_events_created_at_brin", "created_at", postgresql_using="brin"),
+    )
 
-    tenant_id: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
+    tenant_id: Mapped[str] = mapped_column(String(64), nullable=False)
     integration_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         nullable=False,
         index=True,
     )
     event_type: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
+    # Provider-side id (e.g. Telegram message_id); NULL for events without one
+    external_id: Mapped[str | None] = mapped_column(String(255), nullable=True)
+
+
+class EventDailyRollup(Base):
+    """Daily event counts kept after raw events expire (retention compaction)."""
+
+    __tablename__ = "event_daily_rollups"
+
+    tenant_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    integration_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    event_type: Mapped[str] = mapped_column(String(64), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
@@ -0,0 +1,296 @@
+"""
+Postgres events retention: raw events older than the tenant's window are
+compacted into event_daily_rollups and deleted.
+
+- window: tenants.event_retention_days, else EVENTS_RETENTION_DAYS
+- deletes go in small keyset batches over (tenant_id, created_at, id); each
+  batch is one transaction that folds its rows into the daily rollups, so
+  counts are never lost or double counted
+- budgets: lock_timeout / statement_timeout per batch, a rows/s ceiling
+  (EVENTS_RETENTION_MAX_ROWS_PER_SEC) and a max run time; a batch that cannot
+  get its locks is skipped until the next run
+- if events is range-partitioned by created_at, partitions entirely older than
+  every tenant's window are rolled up and dropped instead of row-deleted
+- one worker runs the job at a time (pg_try_advisory_lock)
+
+Long-term history lives in ClickHouse; Postgres only keeps what the
+transactional path (idempotency on external_id) needs.
+"""
+import asyncio
+import logging
+import os
+import re
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core import metrics
+from app.core.database import engine, lock_engine, session_context
+from app.modules.tenants.models import Tenant
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary constant shared by all workers: only one retention run at a time
+ADVISORY_LOCK_KEY = 0x6C6F7265_72657400
+
+retention_rows = metrics.counter(
+    "events_retention_rows_total",
+    "Events removed by retention (deleted: row batches, dropped: partitions)",
+)
+retention_skipped = metrics.counter(
+    "events_retention_batches_skipped_total",
+    "Retention batches skipped on lock or statement timeout",
+)
+
+# One batch: pick the oldest expired rows after the cursor, delete them, fold
+# them into daily rollups, return the new cursor.
+_BATCH_SQL = text("""
+WITH batch AS (
+    SELECT id
+    FROM events
+    WHERE tenant_id = :tenant_id
+      AND created_at < :cutoff
+      AND (created_at, id) > (:after_ts, :after_id)
+    ORDER BY created_at, id
+    LIMIT :limit
+),
+deleted AS (
+    DELETE FROM events e
+    USING batch
+    WHERE e.id = batch.id
+    RETURNING e.tenant_id, e.integration_id, e.event_type, e.created_at, e.id
+),
+rolled AS (
+    INSERT INTO event_daily_rollups AS r (tenant_id, integration_id, event_type, day, count)
+    SELECT tenant_id, integration_id, event_type, (created_at AT TIME ZONE 'UTC')::date, count(*)
+    FROM deleted
+    GROUP BY 1, 2, 3, 4
+    ON CONFLICT (tenant_id, integration_id, event_type, day)
+    DO UPDATE SET count = r.count + EXCLUDED.count
+    RETURNING 1
+)
+SELECT count(*) AS deleted, max(created_at) AS last_ts,
+       (array_agg(id ORDER BY created_at DESC, id DESC))[1] AS last_id
+FROM deleted
+""")
+
+_ROLLUP_PARTITION_SQL = """
+INSERT INTO event_daily_rollups AS r (tenant_id, integration_id, event_type, day, count)
+SELECT tenant_id, integration_id, event_type, (created_at AT TIME ZONE 'UTC')::date, count(*)
+FROM {partition}
+GROUP BY 1, 2, 3, 4
+ON CONFLICT (tenant_id, integration_id, event_type, day)
+DO UPDATE SET count = r.count + EXCLUDED.count
+"""
+
+_PARTITIONS_SQL = text("""
+SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) AS bound
+FROM pg_inherits i
+JOIN pg_class c ON c.oid = i.inhrelid
+JOIN pg_class p ON p.oid = i.inhparent
+WHERE p.relname = 'events'
+""")
+
+_BOUND_TO = re.compile(r"TO \('([^']+)'\)")
+
+_MIN_TS = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MIN_ID = uuid.UUID(int=0)
+
+
+@dataclass
+class RetentionConfig:
+    default_days: int = 30
+    batch_size: int = 5000
+    max_rows_per_sec: int = 20_000
+    lock_timeout_ms: int = 2000
+    statement_timeout_ms: int = 30_000
+    max_run_seconds: float = 600.0
+    interval: float = 3600.0
+
+    @classmethod
+    def from_env(cls) -> "RetentionConfig":
+        return cls(
+            default_days=int(os.getenv("EVENTS_RETENTION_DAYS", "30")),
+            batch_size=int(os.getenv("EVENTS_RETENTION_BATCH_SIZE", "5000")),
+            max_rows_per_sec=int(os.getenv("EVENTS_RETENTION_MAX_ROWS_PER_SEC", "20000")),
+            lock_timeout_ms=int(os.getenv("EVENTS_RETENTION_LOCK_TIMEOUT_MS", "2000")),
+            statement_timeout_ms=int(os.getenv("EVENTS_RETENTION_STATEMENT_TIMEOUT_MS", "30000")),
+            max_run_seconds=float(os.getenv("EVENTS_RETENTION_MAX_RUN_SECONDS", "600")),
+            interval=float(os.getenv("EVENTS_RETENTION_INTERVAL", "3600")),
+        )
+
+
+@dataclass
+class RetentionReport:
+    deleted: int = 0
+    dropped_partitions: list[str] = field(default_factory=list)
+    skipped_batches: int = 0
+    tenants: int = 0
+    complete: bool = True
+
+
+class EventRetention:
+    def __init__(self, config: RetentionConfig | None = None) -> None:
+        self.config = config or RetentionConfig.from_env()
+
+    async def run(self) -> RetentionReport | None:
+        """One retention pass. None if another worker holds the lock."""
+        async with lock_engine.connect() as lock_conn:
+            locked = await lock_conn.scalar(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": ADVISORY_LOCK_KEY}
+            )
+            await lock_conn.commit()
+            if not locked:
+                logger.debug("Events retention already running elsewhere")
+                return None
+            try:
+                return await self._run()
+            finally:
+                await lock_conn.execute(
+                    text("SELECT pg_advisory_unlock(:key)"), {"key": ADVISORY_LOCK_KEY}
+                )
+                await lock_conn.commit()
+
+    async def _run(self) -> RetentionReport:
+        report = RetentionReport()
+        deadline = time.monotonic() + self.config.max_run_seconds
+        now = datetime.now(timezone.utc)
+
+        windows = await self._tenant_windows()
+        # Oldest cutoff any tenant may still need: partitions below it go whole
+        longest = max([self.config.default_days, *windows.values()])
+        await self._drop_partitions(now - timedelta(days=longest), report)
+
+        for tenant_id, days in windows.items():
+            if time.monotonic() >= deadline:
+                report.complete = False
+                break
+            report.tenants += 1
+            await self._purge_tenant(tenant_id, now - timedelta(days=days), deadline, report)
+
+        logger.info(
+            "Events retention: %s rows deleted, %s partitions dropped, %s batches skipped%s",
+            report.deleted,
+            len(report.dropped_partitions),
+            report.skipped_batches,
+            "" if report.complete else " (time budget exhausted)",
+        )
+        return report
+
+    async def _tenant_windows(self) -> dict[str, int]:
+        async with session_context() as db:
+            # Events of soft-deleted tenants still expire
+            rows = await db.execute(
+                select(Tenant.id, Tenant.event_retention_days).execution_options(include_deleted=True)
+            )
+            return {
+                str(tenant_id): days or self.config.default_days
+                for tenant_id, days in rows
+            }
+
+    async def _purge_tenant(
+        self,
+        tenant_id: str,
+        cutoff: datetime,
+        deadline: float,
+        report: RetentionReport,
+    ) -> None:
+        after_ts, after_id = _MIN_TS, _MIN_ID
+        while time.monotonic() < deadline:
+            started = time.monotonic()
+            try:
+                async with engine.begin() as conn:
+                    await self._set_budgets(conn)
+                    row = (await conn.execute(_BATCH_SQL, {
+                        "tenant_id": tenant_id,
+                        "cutoff": cutoff,
+                        "after_ts": after_ts,
+                        "after_id": after_id,
+                        "limit": self.config.batch_size,
+                    })).one()
+            except DBAPIError as e:
+                # lock_timeout / statement_timeout: leave the rest for the next run
+                logger.warning("Events retention batch skipped for tenant=%s: %s", tenant_id, e.orig)
+                retention_skipped.inc()
+                report.skipped_batches += 1
+                return
+
+            if not row.deleted:
+                return
+            report.deleted += row.deleted
+            retention_rows.inc(row.deleted, mode="deleted")
+            after_ts, after_id = row.last_ts, row.last_id
+
+            # I/O budget: no faster than max_rows_per_sec
+            min_duration = row.deleted / self.config.max_rows_per_sec
+            pause = min_duration - (time.monotonic() - started)
+            if pause > 0:
+                await asyncio.sleep(pause)
+        report.complete = False
+
+    async def _drop_partitions(self, cutoff: datetime, report: RetentionReport) -> None:
+        async with engine.connect() as conn:
+            partitions = (await conn.execute(_PARTITIONS_SQL)).all()
+            await conn.commit()
+        for name, bound in partitions:
+            match = _BOUND_TO.search(bound or "")
+            if match is None:
+                continue
+            upper = datetime.fromisoformat(match.group(1))
+            if upper.tzinfo is None:
+                upper = upper.replace(tzinfo=timezone.utc)
+            if upper > cutoff:
+                continue
+            partition = '"' + name.replace('"', '""') + '"'
+            try:
+                async with engine.begin() as conn:
+                    await self._set_budgets(conn)
+                    count = await conn.scalar(text(f"SELECT count(*) FROM {partition}"))
+                    await conn.execute(text(_ROLLUP_PARTITION_SQL.format(partition=partition)))
+                    await conn.execute(text(f"DROP TABLE {partition}"))
+            except DBAPIError as e:
+                logger.warning("Events retention: partition %s not dropped: %s", name, e.orig)
+                retention_skipped.inc()
+                report.skipped_batches += 1
+                continue
+            report.dropped_partitions.append(name)
+            report.deleted += count or 0
+            retention_rows.inc(count or 0, mode="dropped")
+
+    async def _set_budgets(self, conn: AsyncConnection) -> None:
+        await conn.execute(text(f"SET LOCAL lock_timeout = {int(self.config.lock_timeout_ms)}"))
+        await conn.execute(text(f"SET LOCAL statement_timeout = {int(self.config.statement_timeout_ms)}"))
+
+
+class RetentionJob:
+    """Background task: EventRetention.run() every EVENTS_RETENTION_INTERVAL seconds."""
+
+    def __init__(self, retention: EventRetention) -> None:
+        self.retention = retention
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._loop(), name="events-retention")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.retention.run()
+            except Exception:
+                logger.exception("Events retention run failed")
+            await asyncio.sleep(self.retention.config.interval)
+
+
+def enabled() -> bool:
+    return os.getenv("EVENTS_RETENTION_ENABLED", "0") == "1"
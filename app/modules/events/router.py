@@ -0,0 +1,90 @@
+"""Events API router: analytics over ClickHouse rollups and the real-time tenant stream."""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+
+from app.modules.events.deps import get_event_stats_service, get_tenant_stream_hub
+from app.modules.events.schemas import EventStatsRead, StatsInterval
+from app.modules.events.stats import MINUTE_RETENTION, EventStatsService, minute_counts_cover
+from app.modules.events.stream import TenantStreamHub
+
+# Comment frame so proxies keep the connection and dead clients are noticed
+HEARTBEAT_INTERVAL = 15.0
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+
+@router.get("/stats", response_model=EventStatsRead)
+async def get_event_stats(
+    tenant_id: str,
+    start: datetime | None = Query(None, description="Default: end - 24h"),
+    end: datetime | None = Query(None, description="Default: now"),
+    interval: StatsInterval = StatsInterval.auto,
+    integration_id: str | None = None,
+    event_type: str | None = None,
+    service: EventStatsService = Depends(get_event_stats_service),
+) -> EventStatsRead:
+    """Event counts per bucket, by integration and event type."""
+    end = end or datetime.now(timezone.utc)
+    start = start or end - timedelta(days=1)
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+    if start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must be before end",
+        )
+    if interval == StatsInterval.minute and not minute_counts_cover(start):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"interval=minute covers the last {MINUTE_RETENTION.days} days; use hour, day or auto",
+        )
+    return await service.counts(
+        tenant_id=tenant_id,
+        start=start,
+        end=end,
+        interval=interval,
+        integration_id=integration_id,
+        event_type=event_type,
+    )
+
+
+@router.get("/tenant/{tenant_id}/stream")
+async def stream_tenant_events(
+    tenant_id: str,
+    hub: TenantStreamHub = Depends(get_tenant_stream_hub),
+) -> StreamingResponse:
+    """SSE feed of new events (`event: event`) and thread messages (`event: message`)."""
+    subscription = hub.subscribe(tenant_id)
+
+    async def frames():
+        try:
+            yield b": connected\n\n"
+            while True:
+                try:
+                    yield await asyncio.wait_for(subscription.queue.get(), timeout=HEARTBEAT_INTERVAL)
+                except asyncio.TimeoutError:
+                    if subscription.dropped:
+                        break
+                    yield b": ping\n\n"
+                    continue
+                if subscription.dropped and subscription.queue.empty():
+                    break
+            # Queue overflowed: tell the client to reconnect
+            yield b"event: dropped\ndata: {}\n\n"
+        finally:
+            hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        frames(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        },
+    )
@@ -0,0 +1,28 @@
+"""Pydantic schemas for events API."""
+from datetime import datetime
+from enum import Enum
+
+from pydantic import BaseModel
+
+
+class StatsInterval(str, Enum):
+    auto = "auto"
+    minute = "minute"
+    hour = "hour"
+    day = "day"
+
+
+class EventStatsPoint(BaseModel):
+    ts: datetime
+    integration_id: str
+    event_type: str
+    count: int
+
+
+class EventStatsRead(BaseModel):
+    tenant_id: str
+    interval: StatsInterval
+    source: str  # rollup table that answered the query
+    start: datetime
+    end: datetime
+    points: list[EventStatsPoint]
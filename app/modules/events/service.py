@@ -1,10 +1,37 @@
 """Event service — insert events into Postgres."""
 import uuid
+from datetime import datetime, timezone
+from functools import partial
+from typing import NamedTuple
 
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core import metrics
+from app.core.database import on_commit
+from app.core.writebehind import WriteBehindBuffer
+
+from . import dedup, sink, stream
 from .models import Event
 
+duplicates_suppressed = metrics.counter(
+    "events_duplicates_suppressed_total",
+    "Redelivered events dropped by idempotent ingestion",
+)
+
+# Single-row creates from concurrent requests share one INSERT and commit
+_event_writes = WriteBehindBuffer(Event.__table__)
+
+# Rows per INSERT statement (7 bind params per row, Postgres allows 32767)
+INSERT_CHUNK_SIZE = 1000
+
+
+class NewEvent(NamedTuple):
+    tenant_id: str
+    integration_id: uuid.UUID
+    event_type: str
+    external_id: str | None = None
+
 
 class EventService:
     def __init__(self, db: AsyncSession):
@@ -15,12 +42,129 @@ class EventService:
         tenant_id: str,
         integration_id: uuid.UUID,
         event_type: str,
+        external_id: str | None = None,
     ) -> Event:
+        """
+        Durable create through the write-behind buffer: returns once the row is
+        committed (in its own transaction, not self.db). Returned event is detached.
+        """
+        now = datetime.now(timezone.utc)
         event = Event(
+            id=uuid.uuid4(),
             tenant_id=tenant_id,
             integration_id=integration_id,
             event_type=event_type,
+            external_id=external_id,
+            created_at=now,
+            updated_at=now,
+        )
+        await _event_writes.write(_row(event))
+        stream.publish([stream.event_item(event)])
+        event_sink = sink.current()
+        if event_sink is not None:
+            event_sink.add([_sink_row(event)])
+        return event
+
+    async def ingest(
+        self,
+        tenant_id: str,
+        integration_id: uuid.UUID,
+        event_type: str,
+        external_id: str | None,
+    ) -> Event | None:
+        """
+        Idempotent create. Returns None if an event with the same
+        (tenant_id, integration_id, external_id) was already stored.
+        Events without external_id are always inserted.
+        """
+        [event] = await self.ingest_many(
+            [NewEvent(tenant_id, integration_id, event_type, external_id)]
         )
-        self.db.add(event)
-        await self.db.flush()
         return event
+
+    async def ingest_many(self, rows: list[NewEvent]) -> list[Event | None]:
+        """
+        Idempotent bulk create: one multi-row INSERT ... ON CONFLICT DO NOTHING
+        per chunk. Result is aligned with rows; None marks a duplicate. Returned
+        events are not attached to the session.
+        """
+        results: list[Event | None] = [None] * len(rows)
+        candidates: list[tuple[int, Event]] = []
+
+        event_sink = sink.current()
+        if event_sink is not None:
+            await event_sink.wait_for_capacity()
+
+        now = datetime.now(timezone.utc)
+        for i, row in enumerate(rows):
+            if row.external_id is not None and (
+                (row.tenant_id, row.integration_id, row.external_id) in dedup.recent_ids
+            ):
+                duplicates_suppressed.inc(source="cache")
+                continue
+            # Ids assigned here so RETURNING id tells which rows were inserted
+            candidates.append((
+                i,
+                Event(
+                    id=uuid.uuid4(),
+                    tenant_id=row.tenant_id,
+                    integration_id=row.integration_id,
+                    event_type=row.event_type,
+                    external_id=row.external_id,
+                    created_at=now,
+                    updated_at=now,
+                ),
+            ))
+
+        for start in range(0, len(candidates), INSERT_CHUNK_SIZE):
+            chunk = candidates[start:start + INSERT_CHUNK_SIZE]
+            stmt = (
+                insert(Event.__table__)
+                .values([_row(e) for _, e in chunk])
+                .on_conflict_do_nothing(
+                    constraint="uq_events_tenant_integration_external_id",
+                )
+                .returning(Event.__table__.c.id)
+            )
+            inserted = set((await self.db.scalars(stmt)).all())
+
+            dedup.stage(
+                self.db,
+                [(e.tenant_id, e.integration_id, e.external_id) for _, e in chunk if e.external_id is not None],
+            )
+            for i, e in chunk:
+                if e.id in inserted:
+                    results[i] = e
+                else:
+                    duplicates_suppressed.inc(source="db")
+
+        stored = [e for e in results if e is not None]
+        if stored:
+            on_commit(self.db, partial(stream.publish, [stream.event_item(e) for e in stored]))
+            if event_sink is not None:
+                on_commit(self.db, partial(event_sink.add, [_sink_row(e) for e in stored]))
+
+        return results
+
+
+def _row(event: Event) -> dict:
+    return {
+        "id": event.id,
+        "tenant_id": event.tenant_id,
+        "integration_id": event.integration_id,
+        "event_type": event.event_type,
+        "external_id": event.external_id,
+        "created_at": event.created_at,
+        "updated_at": event.updated_at,
+    }
+
+
+def _sink_row(event: Event) -> dict:
+    return {
+        "timestamp": event.created_at,
+        "event_id": event.id,
+        "tenant_id": event.tenant_id,
+        "integration_id": str(event.integration_id),
+        "event_type": event.event_type,
+        "external_id": event.external_id,
+    }
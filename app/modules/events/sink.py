@@ -0,0 +1,305 @@
+"""
+Event sink: buffers committed events in memory and writes them to ClickHouse
+(events.log) in columnar batches.
+
+- flush on size (EVENT_SINK_BATCH_SIZE) or time (EVENT_SINK_FLUSH_INTERVAL)
+- bounded buffer (EVENT_SINK_MAX_BUFFER): producers await wait_for_capacity()
+- batches that cannot be written are spilled to EVENT_SINK_SPILL_DIR as NDJSON
+  and replayed once the writer is healthy again; workers sharing the directory
+  claim a file by renaming it before replaying it
+- the ClickHouse client connects on the first write, so a worker starts (and
+  spills) while ClickHouse is down
+
+Postgres keeps the events rows the transactional path needs (idempotency on
+external_id); analytics read from ClickHouse.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Protocol
+
+from app.core import clickhouse, metrics
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ("timestamp", "event_id", "tenant_id", "integration_id", "event_type", "external_id")
+
+sink_events = metrics.counter(
+    "event_sink_events_total",
+    "Events handled by the event sink by outcome (written, spilled, replayed, lost)",
+)
+sink_buffered = metrics.gauge(
+    "event_sink_buffered",
+    "Events waiting in the event sink buffer",
+)
+
+
+class EventWriter(Protocol):
+    async def insert(self, columns: dict[str, list[Any]]) -> None:
+        """Write one columnar batch. Raise on failure."""
+        pass
+
+    async def close(self) -> None:
+        pass
+
+
+class ClickHouseEventWriter:
+    """Columnar inserts into events.log via clickhouse-connect."""
+
+    def __init__(self, client=None, table: str = "events.log") -> None:
+        self.table = table
+        # Connected on first insert: the worker boots (and spills) while ClickHouse is down
+        self.client = client
+
+    async def insert(self, columns: dict[str, list[Any]]) -> None:
+        if self.client is None:
+            # A connect error fails this write like any other: the batch is spilled
+            self.client = await asyncio.to_thread(clickhouse.get_client)
+        await asyncio.to_thread(
+            self.client.insert,
+            self.table,
+            [columns[c] for c in COLUMNS],
+            column_names=list(COLUMNS),
+            column_oriented=True,
+        )
+
+    async def close(self) -> None:
+        if self.client is not None:
+            await asyncio.to_thread(self.client.close)
+
+
+class MemoryEventWriter:
+    """Local stand-in for ClickHouse: keeps batches in memory; can be told to fail."""
+
+    def __init__(self) -> None:
+        self.batches: list[dict[str, list[Any]]] = []
+        self.fail = False
+
+    @property
+    def rows(self) -> int:
+        return sum(len(b["event_id"]) for b in self.batches)
+
+    async def insert(self, columns: dict[str, list[Any]]) -> None:
+        if self.fail:
+            raise ConnectionError("MemoryEventWriter: unavailable")
+        self.batches.append(columns)
+
+    async def close(self) -> None:
+        pass
+
+
+class BufferedEventSink:
+    def __init__(
+        self,
+        writer: EventWriter,
+        batch_size: int = 5000,
+        flush_interval: float = 1.0,
+        max_buffer: int = 100_000,
+        spill_dir: str | Path | None = None,
+    ) -> None:
+        self.writer = writer
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.spill_dir = Path(spill_dir) if spill_dir else None
+
+        self._columns: dict[str, list[Any]] = {c: [] for c in COLUMNS}
+        self._size = 0
+        self._wakeup = asyncio.Event()
+        self._has_capacity = asyncio.Event()
+        self._has_capacity.set()
+        self._task: asyncio.Task | None = None
+        self._spill_seq = 0
+
+    # -------- producers --------
+
+    async def wait_for_capacity(self) -> None:
+        """Backpressure: wait while the buffer is full."""
+        while self._size >= self.max_buffer:
+            await self._has_capacity.wait()
+
+    def add(self, rows: list[dict[str, Any]]) -> None:
+        """Append committed events (keys = COLUMNS). Never blocks: overflow is spilled."""
+        if self._size + len(rows) > self.max_buffer:
+            # Over the bound despite wait_for_capacity (concurrent producers)
+            self._spill(self._to_columns(rows))
+            return
+        for row in rows:
+            for c in COLUMNS:
+                self._columns[c].append(row[c])
+        self._size += len(rows)
+        sink_buffered.set(self._size)
+        if self._size >= self.batch_size:
+            self._wakeup.set()
+        if self._size >= self.max_buffer:
+            self._has_capacity.clear()
+
+    # -------- lifecycle --------
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="event-sink")
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+        await self.writer.close()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Event sink flush failed")
+
+    # -------- flushing --------
+
+    async def flush(self) -> None:
+        while self._size:
+            batch = self._take(self.batch_size)
+            try:
+                await self.writer.insert(batch)
+            except Exception as e:
+                logger.warning("Event sink write failed, spilling %s events: %s", len(batch["event_id"]), e)
+                self._spill(batch)
+                return
+            sink_events.inc(len(batch["event_id"]), outcome="written")
+        await self._replay_spilled()
+
+    def _take(self, n: int) -> dict[str, list[Any]]:
+        batch = {c: values[:n] for c, values in self._columns.items()}
+        for values in self._columns.values():
+            del values[:n]
+        self._size = len(self._columns["event_id"])
+        sink_buffered.set(self._size)
+        if self._size < self.max_buffer:
+            self._has_capacity.set()
+        return batch
+
+    @staticmethod
+    def _to_columns(rows: list[dict[str, Any]]) -> dict[str, list[Any]]:
+        return {c: [row[c] for row in rows] for c in COLUMNS}
+
+    # -------- spill to disk --------
+
+    def _spill(self, batch: dict[str, list[Any]]) -> None:
+        count = len(batch["event_id"])
+        if self.spill_dir is None:
+            logger.error("Event sink: no spill dir, %s events lost", count)
+            sink_events.inc(count, outcome="lost")
+            return
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+        self._spill_seq += 1
+        path = self.spill_dir / f"{time.time_ns()}-{os.getpid()}-{self._spill_seq}.ndjson"
+        tmp = path.with_suffix(".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            for i in range(count):
+                f.write(json.dumps({c: _encode(batch[c][i]) for c in COLUMNS}) + "\n")
+        tmp.rename(path)
+        sink_events.inc(count, outcome="spilled")
+
+    async def _replay_spilled(self) -> None:
+        if self.spill_dir is None or not self.spill_dir.exists():
+            return
+        self._release_stale_claims()
+        for path in sorted(self.spill_dir.glob("*.ndjson")):
+            # Workers share the spill dir: the one whose rename succeeds replays the file
+            claimed = path.with_name(f"{path.stem}.{os.getpid()}{_CLAIMED_SUFFIX}")
+            try:
+                path.rename(claimed)
+            except FileNotFoundError:
+                continue
+            with claimed.open(encoding="utf-8") as f:
+                rows = [_decode(json.loads(line)) for line in f if line.strip()]
+            try:
+                await self.writer.insert(self._to_columns(rows))
+            except Exception as e:
+                claimed.rename(path)
+                logger.warning("Event sink replay of %s postponed: %s", path.name, e)
+                return
+            claimed.unlink()
+            sink_events.inc(len(rows), outcome="replayed")
+
+    def _release_stale_claims(self) -> None:
+        """Return files claimed by workers that died mid-replay (replayed again: at least once)."""
+        for claimed in self.spill_dir.glob(f"*{_CLAIMED_SUFFIX}"):
+            stem, _, pid = claimed.name[: -len(_CLAIMED_SUFFIX)].rpartition(".")
+            if not pid.isdigit() or _alive(int(pid)):
+                continue
+            try:
+                claimed.rename(claimed.with_name(f"{stem}.ndjson"))
+            except FileNotFoundError:
+                pass
+
+
+_CLAIMED_SUFFIX = ".replaying"
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _decode(row: dict[str, Any]) -> dict[str, Any]:
+    return {
+        k: datetime.fromisoformat(v["$dt"]) if isinstance(v, dict) and "$dt" in v else v
+        for k, v in row.items()
+    }
+
+
+# Process-wide sink (None: disabled). Set in init_event_sink.
+_sink: BufferedEventSink | None = None
+
+
+def current() -> BufferedEventSink | None:
+    return _sink
+
+
+def set_sink(sink: BufferedEventSink | None) -> None:
+    global _sink
+    _sink = sink
+
+
+def from_env() -> BufferedEventSink | None:
+    """Sink configured by EVENT_SINK: clickhouse | memory | none (default)."""
+    kind = os.getenv("EVENT_SINK", "none")
+    if kind == "none":
+        return None
+    if kind == "memory":
+        writer: EventWriter = MemoryEventWriter()
+    elif kind == "clickhouse":
+        writer = ClickHouseEventWriter()
+    else:
+        raise ValueError(f"Unknown EVENT_SINK: {kind}")
+    return BufferedEventSink(
+        writer,
+        batch_size=int(os.getenv("EVENT_SINK_BATCH_SIZE", "5000")),
+        flush_interval=float(os.getenv("EVENT_SINK_FLUSH_INTERVAL", "1.0")),
+        max_buffer=int(os.getenv("EVENT_SINK_MAX_BUFFER", "100000")),
+        spill_dir=os.getenv("EVENT_SINK_SPILL_DIR", "/tmp/lorecore-event-spill"),
+    )
@@ -0,0 +1,132 @@
+"""
+Event counts over time from ClickHouse rollups (events.counts_1m / counts_1h).
+
+Each query is answered from the coarsest rollup that has the requested
+granularity; responses are cached briefly per worker. Buckets and bounds are
+UTC whatever the server timezone.
+"""
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+
+from app.core.cache import TTLCache
+from app.modules.events.schemas import EventStatsPoint, EventStatsRead, StatsInterval
+
+_STEP = {
+    StatsInterval.minute: timedelta(minutes=1),
+    StatsInterval.hour: timedelta(hours=1),
+    StatsInterval.day: timedelta(days=1),
+}
+
+# interval -> (rollup table, bucket expression over its `bucket` column)
+_PLAN = {
+    StatsInterval.minute: ("events.counts_1m", "toDateTime(bucket, 'UTC')"),
+    StatsInterval.hour: ("events.counts_1h", "toDateTime(bucket, 'UTC')"),
+    StatsInterval.day: ("events.counts_1h", "toStartOfDay(bucket, 'UTC')"),
+}
+
+# TTL of events.counts_1m (infra/docker/clickhouse/init.sql)
+MINUTE_RETENTION = timedelta(days=90)
+
+# Max points per series for interval=auto
+_AUTO_MAX_POINTS = 400
+
+_cache: TTLCache[tuple, EventStatsRead] = TTLCache(
+    maxsize=int(os.getenv("EVENT_STATS_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("EVENT_STATS_CACHE_TTL", "10")),
+)
+
+
+def minute_counts_cover(start: datetime) -> bool:
+    """False when start is older than counts_1m keeps minute buckets."""
+    return start >= datetime.now(timezone.utc) - MINUTE_RETENTION
+
+
+def choose_interval(start: datetime, end: datetime) -> StatsInterval:
+    """Finest interval that keeps the series under _AUTO_MAX_POINTS points and has data for start."""
+    span = end - start
+    if span / _STEP[StatsInterval.minute] <= _AUTO_MAX_POINTS and minute_counts_cover(start):
+        return StatsInterval.minute
+    if span / _STEP[StatsInterval.hour] <= _AUTO_MAX_POINTS:
+        return StatsInterval.hour
+    return StatsInterval.day
+
+
+def _align(start: datetime, end: datetime, interval: StatsInterval) -> tuple[datetime, datetime]:
+    """Floor start and ceil end to whole buckets (UTC)."""
+    step = _STEP[interval]
+    epoch = datetime(1970, 1, 1, tzinfo=timezone.utc)
+    start = start.astimezone(timezone.utc)
+    end = end.astimezone(timezone.utc)
+    start = epoch + ((start - epoch) // step) * step
+    end = epoch + -((epoch - end) // step) * step
+    return start, end
+
+
+class EventStatsService:
+    def __init__(self, client) -> None:
+        self._client = client
+
+    async def counts(
+        self,
+        tenant_id: str,
+        start: datetime,
+        end: datetime,
+        interval: StatsInterval = StatsInterval.auto,
+        integration_id: str | None = None,
+        event_type: str | None = None,
+    ) -> EventStatsRead:
+        if interval == StatsInterval.auto:
+            interval = choose_interval(start, end)
+        start, end = _align(start, end, interval)
+
+        key = (tenant_id, start, end, interval, integration_id, event_type)
+        cached = _cache.get(key)
+        if cached is not None:
+            return cached
+
+        table, bucket = _PLAN[interval]
+        where = [
+            "tenant_id = {tenant_id:String}",
+            # Bounds parsed as UTC, not in the server timezone
+            "bucket >= {start:DateTime('UTC')}",
+            "bucket < {end:DateTime('UTC')}",
+        ]
+        params = {
+            "tenant_id": tenant_id,
+            "start": start.replace(tzinfo=None),
+            "end": end.replace(tzinfo=None),
+        }
+        if integration_id is not None:
+            where.append("integration_id = {integration_id:String}")
+            params["integration_id"] = integration_id
+        if event_type is not None:
+            where.append("event_type = {event_type:String}")
+            params["event_type"] = event_type
+
+        # `ts` alias: ClickHouse resolves aliases before columns in WHERE
+        query = (
+            f"SELECT {bucket} AS ts, integration_id, event_type, sum(events) AS count "
+            f"FROM {table} WHERE {' AND '.join(where)} "
+            "GROUP BY ts, integration_id, event_type ORDER BY ts"
+        )
+        result = await asyncio.to_thread(self._client.query, query, parameters=params)
+
+        stats = EventStatsRead(
+            tenant_id=tenant_id,
+            interval=interval,
+            source=table,
+            start=start,
+            end=end,
+            points=[
+                EventStatsPoint(
+                    ts=ts.replace(tzinfo=timezone.utc) if ts.tzinfo is None else ts,
+                    integration_id=integration,
+                    event_type=event_type_,
+                    count=count,
+                )
+                for ts, integration, event_type_, count in result.result_rows
+            ],
+        )
+        _cache.set(key, stats)
+        return stats
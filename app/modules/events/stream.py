@@ -0,0 +1,296 @@
+"""
+Real-time tenant stream: new events and thread messages as SSE frames.
+
+Writers publish rows after their transaction commits (StreamPublisher): rows
+committed within a few milliseconds go out as one pg_notify('tenant_stream')
+transaction, and only rows of tenants that some worker is streaming. NOTIFY
+serializes committing transactions database-wide, so ingest without
+listeners never pays for it.
+
+Which tenants are streamed is shared through the tenant_stream_presence
+channel: every hub announces its tenants when the first subscriber of a
+tenant arrives and then every PRESENCE_INTERVAL seconds; an announcement is
+trusted for three intervals.
+
+The worker's shared LISTEN connection (app.core.notify) hands notifications
+to the hub, which fans them out in process to the tenant's subscribers.
+Every subscriber has a bounded queue; a subscriber whose queue is full is
+dropped instead of slowing the others down (the client reconnects). A frame
+is encoded once and shared by all subscribers.
+"""
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import time
+from collections import defaultdict
+from typing import Any, Iterable
+
+from pydantic_core import to_json
+from sqlalchemy import text
+
+from app.core import metrics
+from app.core.database import engine
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "tenant_stream"
+PRESENCE_CHANNEL = "tenant_stream_presence"
+PRESENCE_INTERVAL = 10.0
+
+# NOTIFY payloads must stay under 8000 bytes
+MAX_PAYLOAD_BYTES = 7500
+# Message content is cut so one item always fits a payload (4-byte UTF-8)
+MAX_CONTENT_CHARS = 1500
+
+_NOTIFY_SQL = text("SELECT pg_notify(:channel, :payload)")
+
+stream_subscribers = metrics.gauge(
+    "tenant_stream_subscribers",
+    "Open tenant stream (SSE) subscriptions in this worker",
+)
+stream_dropped = metrics.counter(
+    "tenant_stream_dropped_total",
+    "Tenant stream subscribers dropped because their queue was full",
+)
+stream_notifications = metrics.counter(
+    "tenant_stream_notifications_total",
+    "Notifications received on the tenant_stream channel",
+)
+stream_published = metrics.counter(
+    "tenant_stream_published_total",
+    "Rows published to the tenant_stream channel by type",
+)
+
+# tenant_id -> monotonic deadline of its last presence announcement
+_watched: dict[str, float] = {}
+
+
+def watched(tenant_id: str) -> bool:
+    """True while some worker has subscribers for tenant_id."""
+    deadline = _watched.get(tenant_id)
+    if deadline is None:
+        return False
+    if deadline < time.monotonic():
+        del _watched[tenant_id]
+        return False
+    return True
+
+
+def _mark_watched(tenant_ids: Iterable[str]) -> None:
+    deadline = time.monotonic() + 3 * PRESENCE_INTERVAL
+    for tenant_id in tenant_ids:
+        _watched[tenant_id] = deadline
+
+
+def on_presence(payload: str) -> None:
+    """Callback for the shared listener on PRESENCE_CHANNEL: a JSON list of tenant ids."""
+    try:
+        tenant_ids = json.loads(payload)
+    except json.JSONDecodeError:
+        logger.warning("Tenant stream: invalid presence payload %r", payload[:200])
+        return
+    _mark_watched(str(tenant_id) for tenant_id in tenant_ids)
+
+
+def _payloads(items: list[bytes], opening: bytes, closing: bytes) -> list[str]:
+    """Join encoded items into payloads of at most MAX_PAYLOAD_BYTES."""
+    payloads, current, size = [], [], len(opening) + len(closing)
+    for item in items:
+        if current and size + len(item) + 1 > MAX_PAYLOAD_BYTES:
+            payloads.append((opening + b",".join(current) + closing).decode())
+            current, size = [], len(opening) + len(closing)
+        current.append(item)
+        size += len(item) + 1
+    if current:
+        payloads.append((opening + b",".join(current) + closing).decode())
+    return payloads
+
+
+async def _notify(channel: str, payloads: list[str]) -> None:
+    """All payloads in one transaction: one NOTIFY commit per batch."""
+    async with engine.begin() as conn:
+        for payload in payloads:
+            await conn.execute(_NOTIFY_SQL, {"channel": channel, "payload": payload})
+
+
+class Subscription:
+    """One SSE client: bounded queue of encoded frames."""
+
+    def __init__(self, tenant_id: str, maxsize: int) -> None:
+        self.tenant_id = tenant_id
+        self.queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize=maxsize)
+        self.dropped = False
+
+
+class TenantStreamHub:
+    def __init__(self, queue_size: int = 1000) -> None:
+        self.queue_size = queue_size
+        self._subscribers: dict[str, set[Subscription]] = defaultdict(set)
+        self._presence: asyncio.Task | None = None
+        self._announcements: set[asyncio.Task] = set()
+
+    def start(self) -> None:
+        self._presence = asyncio.create_task(self._announce_loop(), name="tenant-stream-presence")
+
+    async def stop(self) -> None:
+        tasks = [t for t in (self._presence, *self._announcements) if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._presence = None
+
+    # -------- subscribers --------
+
+    def subscribe(self, tenant_id: str) -> Subscription:
+        subscription = Subscription(tenant_id, self.queue_size)
+        first = tenant_id not in self._subscribers
+        self._subscribers[tenant_id].add(subscription)
+        stream_subscribers.inc()
+        if first:
+            # Other workers start publishing this tenant without waiting for the next round
+            self._announce([tenant_id])
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.tenant_id)
+        if subscribers is None or subscription not in subscribers:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.tenant_id]
+        stream_subscribers.dec()
+
+    def publish(self, tenant_id: str, frame: bytes) -> None:
+        subscribers = self._subscribers.get(tenant_id)
+        if not subscribers:
+            return
+        for subscription in list(subscribers):
+            try:
+                subscription.queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                # Slow consumer: drop it rather than buffer without bound
+                subscription.dropped = True
+                self.unsubscribe(subscription)
+                stream_dropped.inc()
+
+    # -------- presence --------
+
+    def _announce(self, tenant_ids: list[str]) -> None:
+        _mark_watched(tenant_ids)
+        task = asyncio.create_task(self._send_presence(tenant_ids), context=contextvars.Context())
+        self._announcements.add(task)
+        task.add_done_callback(self._announcements.discard)
+
+    async def _send_presence(self, tenant_ids: list[str]) -> None:
+        try:
+            await _notify(PRESENCE_CHANNEL, _payloads([to_json(t) for t in tenant_ids], b"[", b"]"))
+        except Exception as e:
+            logger.warning("Tenant stream presence announcement failed: %s", e)
+
+    async def _announce_loop(self) -> None:
+        while True:
+            await asyncio.sleep(PRESENCE_INTERVAL)
+            if self._subscribers:
+                self._announce(list(self._subscribers))
+
+    # -------- notifications --------
+
+    def on_notify(self, payload: str) -> None:
+        """Callback for the shared listener (app.core.notify) on CHANNEL: a JSON list of rows."""
+        stream_notifications.inc()
+        try:
+            items = json.loads(payload)
+        except json.JSONDecodeError:
+            logger.warning("Tenant stream: invalid payload %r", payload[:200])
+            return
+        for item in items:
+            tenant_id = item.get("tenant_id")
+            if tenant_id in self._subscribers:
+                frame = f"event: {item.get('type', 'message')}\ndata: {json.dumps(item)}\n\n".encode()
+                self.publish(tenant_id, frame)
+
+
+class StreamPublisher:
+    """
+    Collects committed rows for max_delay and sends them in one NOTIFY
+    transaction. publish() never blocks the writer: a failed send is logged
+    and its rows are not streamed.
+    """
+
+    def __init__(self, max_delay: float = 0.005) -> None:
+        self.max_delay = max_delay
+        self._pending: list[dict[str, Any]] = []
+        self._flusher: asyncio.Task | None = None
+
+    def publish(self, items: list[dict[str, Any]]) -> None:
+        items = [item for item in items if watched(str(item["tenant_id"]))]
+        if not items:
+            return
+        self._pending.extend(items)
+        if self._flusher is None or self._flusher.done():
+            # Fresh context: the batch is not attributed to the request that started it
+            self._flusher = asyncio.create_task(
+                self._flush_soon(), name="tenant-stream-publish", context=contextvars.Context()
+            )
+
+    async def _flush_soon(self) -> None:
+        while self._pending:
+            await asyncio.sleep(self.max_delay)
+            items, self._pending = self._pending, []
+            try:
+                await _notify(CHANNEL, _payloads([to_json(item) for item in items], b"[", b"]"))
+            except Exception as e:
+                logger.warning("Tenant stream: %s rows not published: %s", len(items), e)
+                continue
+            for item in items:
+                stream_published.inc(type=item["type"])
+
+    async def close(self) -> None:
+        if self._flusher is not None:
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+
+
+def event_item(event) -> dict[str, Any]:
+    return {
+        "type": "event",
+        "tenant_id": str(event.tenant_id),
+        "id": event.id,
+        "integration_id": event.integration_id,
+        "event_type": event.event_type,
+        "external_id": event.external_id,
+        "created_at": event.created_at,
+    }
+
+
+def message_item(tenant_id, message) -> dict[str, Any]:
+    return {
+        "type": "message",
+        "tenant_id": str(tenant_id),
+        "id": message.id,
+        "thread_id": message.thread_id,
+        "agent_id": message.agent_id,
+        "role": message.role,
+        "content": message.content[:MAX_CONTENT_CHARS],
+        "truncated": len(message.content) > MAX_CONTENT_CHARS,
+        "created_at": message.created_at,
+    }
+
+
+# Set by init_events() when the stream is enabled; writers call publish()
+publisher: StreamPublisher | None = None
+
+
+def publish(items: list[dict[str, Any]]) -> None:
+    """Stream committed rows (event_item / message_item); no-op when disabled."""
+    if publisher is not None and items:
+        publisher.publish(items)
+
+
+def from_env() -> TenantStreamHub | None:
+    """Hub configured by EVENTS_STREAM_ENABLED (default 1) and EVENTS_STREAM_QUEUE_SIZE."""
+    if os.getenv("EVENTS_STREAM_ENABLED", "1") != "1":
+        return None
+    return TenantStreamHub(queue_size=int(os.getenv("EVENTS_STREAM_QUEUE_SIZE", "1000")))
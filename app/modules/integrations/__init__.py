@@ -1,3 +1,3 @@
-from app.modules.integrations.router import router
+from app.modules.integrations.router import catalog_router, router
 
-__all__ = ["router"]
+__all__ = ["catalog_router", "router"]
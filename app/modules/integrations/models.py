@@ -1,5 +1,5 @@
-"""Integration ORM model."""
-from sqlalchemy import Boolean, String, Text
+"""Integration ORM models."""
+from sqlalchemy import BigInteger, Boolean, String, Text, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.core.database import BaseEntity
@@ -12,3 +12,22 @@ class Integration(BaseEntity):
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
     enabled: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+
+
+class IntegrationCursor(BaseEntity):
+    """Ingestion checkpoint of a pull-based stream (e.g. Telegram getUpdates offset per bot)."""
+
+    __tablename__ = "integration_cursors"
+    __table_args__ = (
+        UniqueConstraint(
+            "tenant_id",
+            "integration_key",
+            "stream",
+            name="uq_integration_cursors_tenant_key_stream",
+        ),
+    )
+
+    tenant_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    integration_key: Mapped[str] = mapped_column(String(64), nullable=False)
+    stream: Mapped[str] = mapped_column(String(255), nullable=False)
+    position: Mapped[int] = mapped_column(BigInteger, nullable=False)
@@ -0,0 +1,98 @@
+"""
+Polling ingestion runner: one background task per Telegram bot token.
+
+Each batch from getUpdates goes through IntegrationService.handle_updates
+(same path as webhooks) and the next offset is saved in integration_cursors
+in the same transaction, so a restart neither loses nor reprocesses updates.
+"""
+import asyncio
+import logging
+import os
+
+import httpx
+
+from app.core.database import session_context
+from app.integrations.registry import IntegrationRegistry
+from app.modules.events.service import EventService
+from app.modules.integrations.service import IntegrationService
+from app.modules.secrets.base import SecretsManager
+
+logger = logging.getLogger(__name__)
+
+TELEGRAM_KEY = "telegram"
+
+
+def polling_tenants() -> list[str]:
+    """Tenants ingesting Telegram via long polling (TELEGRAM_POLLING_TENANTS, comma-separated)."""
+    raw = os.getenv("TELEGRAM_POLLING_TENANTS", "")
+    return [t.strip() for t in raw.split(",") if t.strip()]
+
+
+class PollingRunner:
+    def __init__(self, registry: IntegrationRegistry, secrets: SecretsManager) -> None:
+        self.registry = registry
+        self.secrets = secrets
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._http: httpx.AsyncClient | None = None
+
+    async def start(self, tenant_ids: list[str]) -> None:
+        # Imported here: the connector is only loaded when polling is enabled
+        from app.integrations.connectors.telegram.client import TelegramClient
+        from app.integrations.connectors.telegram.polling import TelegramPoller
+
+        self._http = httpx.AsyncClient()
+
+        for tenant_id in tenant_ids:
+            try:
+                credentials = await self.secrets.get(tenant_id=tenant_id, integration=TELEGRAM_KEY)
+                token = credentials["token"]
+            except Exception as e:
+                # One misconfigured tenant must not keep the app (and other bots) from starting
+                logger.error("Telegram polling skipped for tenant=%s: no bot token (%r)", tenant_id, e)
+                continue
+            client = TelegramClient(token, http=self._http)
+
+            if token in self._tasks:
+                logger.warning(
+                    "Telegram bot %s already polled for another tenant, skipping tenant=%s",
+                    client.bot_id,
+                    tenant_id,
+                )
+                continue
+
+            try:
+                async with session_context() as db:
+                    service = IntegrationService(db, self.registry, self.secrets, EventService(db))
+                    offset = await service.get_cursor(tenant_id, TELEGRAM_KEY, client.bot_id)
+            except Exception:
+                logger.exception("Telegram polling skipped for tenant=%s: cursor not loaded", tenant_id)
+                continue
+
+            poller = TelegramPoller(
+                client,
+                sink=self._sink(tenant_id, client.bot_id),
+                offset=offset,
+            )
+            self._tasks[token] = asyncio.create_task(
+                poller.run(), name=f"telegram-poll-{client.bot_id}"
+            )
+
+        logger.info("Polling runner started: bots=%s", len(self._tasks))
+
+    def _sink(self, tenant_id: str, stream: str):
+        async def sink(updates: list[dict], next_offset: int) -> None:
+            async with session_context() as db:
+                service = IntegrationService(db, self.registry, self.secrets, EventService(db))
+                await service.handle_updates(tenant_id, TELEGRAM_KEY, updates)
+                await service.save_cursor(tenant_id, TELEGRAM_KEY, stream, next_offset)
+
+        return sink
+
+    async def stop(self) -> None:
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        self._tasks.clear()
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
@@ -1,9 +1,36 @@
-from fastapi import APIRouter, Request, Depends
+from fastapi import APIRouter, HTTPException, Request, Depends, Response, status
+from fastapi.responses import JSONResponse
 
-from app.modules.integrations.deps import get_integration_service
-from app.modules.integrations.service import IntegrationService
+from app.core.jsonstream import JSONStreamError, iter_json_items
+
+from app.integrations.registry import IntegrationRegistry
+from app.modules.integrations.deps import get_integration_service, get_registry
+from app.modules.integrations.service import BatchResult, IntegrationNotFoundError, IntegrationService
 
 router = APIRouter(prefix="/webhooks", tags=["webhooks"])
+catalog_router = APIRouter(prefix="/integrations", tags=["integrations"])
+
+
+def _integration_not_found() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Integration not found",
+    )
+
+
+@catalog_router.get("/catalog")
+async def catalog(
+    request: Request,
+    registry: IntegrationRegistry = Depends(get_registry),
+) -> Response:
+    """Connectors with their actions (JSON schemas), events and secrets."""
+    body, etag = registry.catalog()
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (t.strip() for t in if_none_match.split(",")):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
 
 @router.post("/{integration_key}/{tenant_id}")
 async def webhook(
@@ -13,9 +40,50 @@ async def webhook(
     service: IntegrationService = Depends(get_integration_service),
 ):
     payload = await request.json()
-    event = await service.handle_webhook(
-        tenant_id=tenant_id,
-        key=integration_key,
-        payload=payload,
-    )
+    try:
+        event = await service.handle_webhook(
+            tenant_id=tenant_id,
+            key=integration_key,
+            payload=payload,
+        )
+    except IntegrationNotFoundError:
+        raise _integration_not_found() from None
+    if event is None:
+        return {"status": "duplicate"}
     return {"status": "ok", "event_type": event.event_type}
+
+
+@router.post("/{integration_key}/{tenant_id}/batch")
+async def webhook_batch(
+    integration_key: str,
+    tenant_id: str,
+    request: Request,
+    service: IntegrationService = Depends(get_integration_service),
+):
+    """
+    Many webhook payloads in one request: a JSON array or NDJSON body.
+    The body is parsed as a stream and stored in bulk, chunk by chunk.
+    results[i] is "ok", "duplicate" or "error" for the i-th payload.
+    """
+    result = BatchResult()
+    try:
+        await service.handle_batch(
+            tenant_id=tenant_id,
+            key=integration_key,
+            items=iter_json_items(request.stream()),
+            result=result,
+        )
+    except IntegrationNotFoundError:
+        raise _integration_not_found() from None
+    except JSONStreamError as e:
+        # Chunks before the malformed part are committed; resending is safe
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"detail": str(e), "processed": result.summary()},
+        )
+    return {
+        "status": "ok",
+        **result.summary(),
+        "results": result.statuses,
+        "errors": [{"index": i, "error": msg} for i, msg in result.errors.items()],
+    }
@@ -1,19 +1,59 @@
+import asyncio
 import logging
-from typing import Type, Any
+import uuid
+from typing import Any, AsyncIterator, Type
 
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import TTLCache
 from app.integrations.base import BaseIntegration, Action
 from app.integrations.registry import IntegrationRegistry
-from app.modules.events.service import EventService
+from app.modules.events import dedup
+from app.modules.events.models import Event
+from app.modules.events.service import EventService, NewEvent, duplicates_suppressed
 from app.modules.secrets.base import SecretsManager
 
-from .models import Integration
+from .models import Integration, IntegrationCursor
 
 
 logger = logging.getLogger(__name__)
 
+# Integration key -> id; rows are only added by sync(), so a short TTL is enough
+_integration_ids: TTLCache[str, uuid.UUID] = TTLCache(maxsize=1024, ttl=300)
+
+
+class IntegrationNotFoundError(KeyError):
+    """No integration registered under the key."""
+
+
+class BatchResult:
+    """Per-item statuses of a batch, in input order, plus error details by index."""
+
+    OK = "ok"
+    DUPLICATE = "duplicate"
+    ERROR = "error"
+
+    def __init__(self) -> None:
+        self.statuses: list[str] = []
+        self.errors: dict[int, str] = {}
+
+    def add(self, status: str) -> None:
+        self.statuses.append(status)
+
+    def add_error(self, error: Exception) -> None:
+        self.errors[len(self.statuses)] = str(error) or error.__class__.__name__
+        self.statuses.append(self.ERROR)
+
+    def summary(self) -> dict:
+        return {
+            "total": len(self.statuses),
+            "ok": self.statuses.count(self.OK),
+            "duplicates": self.statuses.count(self.DUPLICATE),
+            "failed": len(self.errors),
+        }
+
 
 class IntegrationService:
     """
@@ -34,17 +74,19 @@ class IntegrationService:
     async def sync(self) -> None:
         logger.info("Syncing integrations...")
 
-        result = await self.db.execute(select(Integration))
+        # Keys are unique across soft-deleted rows too: never re-add those
+        result = await self.db.execute(select(Integration).execution_options(include_deleted=True))
         existing = {i.key: i for i in result.scalars().all()}
 
-        for key, cls in self.registry.all().items():
+        # Manifest metadata only: connectors are not imported here
+        for key, entry in self.registry.manifest().items():
 
             if key not in existing:
                 self.db.add(
                     Integration(
-                        key=cls.key,
-                        name=cls.name,
-                        description=getattr(cls, "description", ""),
+                        key=key,
+                        name=entry["name"],
+                        description=entry.get("description", ""),
                         enabled=True,
                     )
                 )
@@ -91,23 +133,172 @@ class IntegrationService:
             action.type,
         )
 
-        return await connector.execute(action)
+        compiled = self.registry.compiled(integration_key)
+
+        return await compiled.dispatch(connector, action.type, action.payload)
+
+    async def get_by_key(self, key: str) -> Integration:
+        result = await self.db.execute(
+            select(Integration).where(Integration.key == key)
+        )
+        integration = result.scalar_one_or_none()
+        if integration is None:
+            raise IntegrationNotFoundError(f"Integration '{key}' not registered")
+        return integration
+
+    async def get_id_by_key(self, key: str) -> uuid.UUID:
+        """get_by_key(key).id, cached per worker."""
+        integration_id = _integration_ids.get(key)
+        if integration_id is None:
+            integration_id = (await self.get_by_key(key)).id
+            _integration_ids.set(key, integration_id)
+        return integration_id
 
     async def handle_webhook(
         self,
         tenant_id: str,
         key: str,
         payload: dict,
-        event_type: str = "unknown",
     ):
+        """
+        Parse webhook and store the event. Returns None for a redelivery
+        of an already stored event (same external_id).
+        """
 
-        event = await self.event_service.create(
-            tenant_id=tenant_id,
-            event_type=event_type,
-        )
+        [event] = await self.handle_updates(tenant_id, key, [payload])
 
-        connector = await self._build_connector(tenant_id, key)
+        if isinstance(event, Exception):
+            raise event
 
-        await connector.handle_webhook(payload)
+        if event is None:
+            logger.info(
+                "Duplicate webhook suppressed: tenant=%s integration=%s",
+                tenant_id,
+                key,
+            )
 
         return event
+
+    async def handle_updates(
+        self,
+        tenant_id: str,
+        key: str,
+        payloads: list[dict],
+    ) -> list[Event | None | Exception]:
+        """
+        Batch variant of handle_webhook: one connector, payloads parsed
+        concurrently, events stored in order in the current transaction.
+        Per payload: Event, None (duplicate) or the parse error.
+        """
+
+        integration_id = await self.get_id_by_key(key)
+
+        # Recently stored redeliveries are dropped before the connector
+        # (and its secrets) is built
+        connector_class = self.registry.get(key)
+        results: list[Event | None | Exception] = [None] * len(payloads)
+        pending: list[int] = []
+        for i, payload in enumerate(payloads):
+            external_id = connector_class.webhook_external_id(payload)
+            if external_id is not None and (tenant_id, integration_id, external_id) in dedup.recent_ids:
+                duplicates_suppressed.inc(source="cache")
+                continue
+            pending.append(i)
+        if not pending:
+            return results
+
+        connector = await self._build_connector(tenant_id, key)
+
+        parsed = await asyncio.gather(
+            *(connector.handle_webhook(payloads[i]) for i in pending),
+            return_exceptions=True,
+        )
+
+        rows: list[NewEvent] = []
+        positions: list[int] = []
+        for i, incoming in zip(pending, parsed):
+            results[i] = incoming
+            if isinstance(incoming, Exception):
+                logger.warning(
+                    "Webhook payload rejected: tenant=%s integration=%s error=%r",
+                    tenant_id,
+                    key,
+                    incoming,
+                )
+                continue
+            rows.append(NewEvent(tenant_id, integration_id, incoming.type, incoming.external_id))
+            positions.append(i)
+
+        for i, event in zip(positions, await self.event_service.ingest_many(rows)):
+            results[i] = event
+        return results
+
+    async def handle_batch(
+        self,
+        tenant_id: str,
+        key: str,
+        items: AsyncIterator[Any],
+        chunk_size: int = 500,
+        result: BatchResult | None = None,
+    ) -> BatchResult:
+        """
+        Stream of webhook payloads (e.g. a parsed request body). Items are
+        handled chunk by chunk, each chunk in its own transaction, so memory
+        stays bounded and a failure keeps the chunks already committed
+        (a retry of the whole batch is safe thanks to external_id dedup).
+        Pass result to keep the statuses collected before such a failure.
+        """
+        result = result if result is not None else BatchResult()
+        chunk: list[Any] = []
+
+        async def flush() -> None:
+            payloads = [p for p in chunk if isinstance(p, dict)]
+            handled = iter(await self.handle_updates(tenant_id, key, payloads) if payloads else [])
+            for item in chunk:
+                if not isinstance(item, dict):
+                    result.add_error(item if isinstance(item, Exception) else ValueError("Item is not a JSON object"))
+                    continue
+                event = next(handled)
+                if isinstance(event, Exception):
+                    result.add_error(event)
+                elif event is None:
+                    result.add(BatchResult.DUPLICATE)
+                else:
+                    result.add(BatchResult.OK)
+            await self.db.commit()
+            chunk.clear()
+
+        async for item in items:
+            chunk.append(item)
+            if len(chunk) >= chunk_size:
+                await flush()
+        if chunk:
+            await flush()
+
+        return result
+
+    async def get_cursor(self, tenant_id: str, key: str, stream: str) -> int | None:
+        result = await self.db.execute(
+            select(IntegrationCursor.position).where(
+                IntegrationCursor.tenant_id == tenant_id,
+                IntegrationCursor.integration_key == key,
+                IntegrationCursor.stream == stream,
+            )
+            # Same row save_cursor() upserts, whatever its deleted_at
+            .execution_options(include_deleted=True)
+        )
+        return result.scalar_one_or_none()
+
+    async def save_cursor(self, tenant_id: str, key: str, stream: str, position: int) -> None:
+        """Upsert checkpoint; commit together with the data it covers."""
+        stmt = insert(IntegrationCursor).values(
+            tenant_id=tenant_id,
+            integration_key=key,
+            stream=stream,
+            position=position,
+        )
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_integration_cursors_tenant_key_stream",
+            set_={"position": stmt.excluded.position, "updated_at": stmt.excluded.updated_at},
+        )
+        await self.db.execute(stmt)
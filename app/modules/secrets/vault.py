@@ -1,8 +1,11 @@
-import hvac
-from typing import Dict, Any
+from functools import cached_property
+from typing import TYPE_CHECKING, Dict, Any
 
 from .base import SecretsManager
 
+if TYPE_CHECKING:
+    import hvac
+
 class VaultSecretsManager(SecretsManager):
     def __init__(
         self,
@@ -11,10 +14,18 @@ class VaultSecretsManager(SecretsManager):
         mount_point: str = "secret",
         prefix: str = "integrations"
     ):
-        self.client = hvac.Client(url=url, token=token)
+        self.url = url
+        self.token = token
         self.prefix = prefix
         self.mount_point = mount_point
 
+    @cached_property
+    def client(self) -> "hvac.Client":
+        """Created on first use: importing hvac is kept off the startup path."""
+        import hvac
+
+        return hvac.Client(url=self.url, token=self.token)
+
     async def get(self, tenant_id: str, integration: str) -> Dict[str, Any]:
         path = self._path(tenant_id, integration)
         response = self.client.secrets.kv.v2.read_secret_version(
@@ -0,0 +1,214 @@
+"""
+Bulk tenant provisioning: stream rows from NDJSON / JSON array / CSV and load
+them in batches.
+
+Each batch is COPYed into a temporary table, then one statement inserts the
+new tenants (ON CONFLICT (external_id) DO NOTHING) together with their default
+agents. Batches commit separately, so an interrupted import can simply be run
+again: tenants already present are counted as "existing".
+"""
+import codecs
+import csv
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+from pydantic import ValidationError
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.jsonstream import JSONStreamError, iter_json_items
+from app.modules.agents.models import AgentNature
+from app.modules.agents.service import (
+    PLATFORM_SYSTEM_AGENT_FIRST_NAME,
+    PLATFORM_SYSTEM_AGENT_SECOND_NAME,
+)
+from app.modules.tenants.schemas import TenantImportRow
+
+# Error details kept in the result; the counters cover every row
+MAX_REPORTED_ERRORS = 1000
+
+_STAGING_COLUMNS = ("external_id", "name", "event_retention_days")
+
+_CREATE_STAGING = text("""
+CREATE TEMP TABLE IF NOT EXISTS tenant_import (
+    external_id varchar(255) NOT NULL,
+    name varchar(255) NOT NULL,
+    event_retention_days integer
+) ON COMMIT DELETE ROWS
+""")
+
+# Later duplicates of an external_id within a batch lose to the first one
+_LOAD_BATCH = text("""
+WITH staged AS (
+    SELECT DISTINCT ON (external_id) external_id, name, event_retention_days
+    FROM tenant_import
+    ORDER BY external_id
+),
+tenants_added AS (
+    INSERT INTO tenants (id, external_id, name, event_retention_days, created_at, updated_at)
+    SELECT gen_random_uuid(), external_id, name, event_retention_days, :now, :now
+    FROM staged
+    ON CONFLICT (external_id) DO NOTHING
+    RETURNING id
+),
+agents_added AS (
+    INSERT INTO agents (id, tenant_id, first_name, second_name, nature, created_at, updated_at)
+    SELECT gen_random_uuid(), t.id, a.first_name, a.second_name, a.nature::agenttype, :now, :now
+    FROM tenants_added t
+    CROSS JOIN (VALUES
+        ('User', '', :human),
+        (:system_first_name, :system_second_name, :system)
+    ) AS a (first_name, second_name, nature)
+)
+SELECT count(*) FROM tenants_added
+""")
+
+
+@dataclass
+class ImportResult:
+    total: int = 0
+    created: int = 0
+    existing: int = 0
+    failed: int = 0
+    errors: list[dict] = field(default_factory=list)
+
+    def add_error(self, index: int, error: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"index": index, "error": error})
+
+    def summary(self) -> dict:
+        return {
+            "total": self.total,
+            "created": self.created,
+            "existing": self.existing,
+            "failed": self.failed,
+        }
+
+
+ProgressCallback = Callable[[ImportResult], Awaitable[None] | None]
+
+
+async def import_tenants(
+    session: AsyncSession,
+    rows: AsyncIterator[Any],
+    batch_size: int = 5000,
+    result: ImportResult | None = None,
+    on_progress: ProgressCallback | None = None,
+) -> ImportResult:
+    """
+    Load tenants from rows (dicts; exceptions are reported as failed rows).
+    Commits after every batch; on_progress is called with the running result.
+    """
+    result = result if result is not None else ImportResult()
+    batch: list[tuple] = []
+
+    try:
+        async for item in rows:
+            index = result.total
+            result.total += 1
+            if isinstance(item, Exception):
+                result.add_error(index, str(item))
+                continue
+            try:
+                row = TenantImportRow.model_validate(item)
+            except ValidationError as e:
+                result.add_error(index, _validation_message(e))
+                continue
+            batch.append((row.external_id, row.name, row.event_retention_days))
+            if len(batch) >= batch_size:
+                await _load(session, batch, result)
+                batch = []
+                await _report(on_progress, result)
+    except JSONStreamError:
+        # Keep the valid rows read before the malformed part
+        if batch:
+            await _load(session, batch, result)
+        raise
+
+    if batch:
+        await _load(session, batch, result)
+    await _report(on_progress, result)
+    return result
+
+
+async def _load(session: AsyncSession, batch: list[tuple], result: ImportResult) -> None:
+    await session.execute(_CREATE_STAGING)
+    conn = await session.connection()
+    raw = await conn.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(
+        "tenant_import", records=batch, columns=list(_STAGING_COLUMNS)
+    )
+    created = await session.scalar(_LOAD_BATCH, {
+        "now": datetime.now(timezone.utc),
+        "human": AgentNature.Human.value,
+        "system": AgentNature.System.value,
+        "system_first_name": PLATFORM_SYSTEM_AGENT_FIRST_NAME,
+        "system_second_name": PLATFORM_SYSTEM_AGENT_SECOND_NAME,
+    })
+    await session.commit()
+    result.created += created
+    result.existing += len(batch) - created
+
+
+async def _report(on_progress: ProgressCallback | None, result: ImportResult) -> None:
+    if on_progress is None:
+        return
+    outcome = on_progress(result)
+    if outcome is not None:
+        await outcome
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(p) for p in e['loc'])}: {e['msg']}" for e in error.errors()
+    )
+
+
+# -------- input formats --------
+
+
+def iter_rows(chunks: AsyncIterator[bytes], content_type: str | None) -> AsyncIterator[Any]:
+    """CSV for text/csv, otherwise a JSON array or NDJSON."""
+    if content_type and content_type.split(";")[0].strip() == "text/csv":
+        return iter_csv_rows(chunks)
+    return iter_json_items(chunks)
+
+
+async def iter_csv_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[dict[str, str] | ValueError]:
+    """
+    Rows of a CSV body with a header line, as dicts. One record per line
+    (quoted fields must not contain newlines); empty cells are omitted.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    header: list[str] | None = None
+    pending = ""
+
+    async def lines() -> AsyncIterator[str]:
+        nonlocal pending
+        async for chunk in chunks:
+            pending += decoder.decode(chunk)
+            *complete, pending = pending.split("\n")
+            for line in complete:
+                yield line
+        pending += decoder.decode(b"", final=True)
+        if pending:
+            yield pending
+
+    async for line in lines():
+        line = line.rstrip("\r")
+        if not line.strip():
+            continue
+        try:
+            [values] = list(csv.reader([line]))
+        except (csv.Error, ValueError) as e:
+            yield ValueError(f"Invalid CSV line: {e}")
+            continue
+        if header is None:
+            header = [h.strip() for h in values]
+            continue
+        if len(values) != len(header):
+            yield ValueError(f"Expected {len(header)} columns, got {len(values)}")
+            continue
+        yield {k: v for k, v in zip(header, values) if v != ""}
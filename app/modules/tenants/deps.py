@@ -3,8 +3,8 @@
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.deps import get_db
-from app.modules.agents.deps import get_agent_service
+from app.core.deps import get_db, get_read_db
+from app.modules.agents.deps import get_agent_reader, get_agent_service
 from app.modules.agents.service import AgentService
 from app.modules.tenants.service import TenantService
 
@@ -15,3 +15,11 @@ def get_tenant_service(
 ) -> TenantService:
     """Request-scoped tenant service."""
     return TenantService(db, agent_service)
+
+
+def get_tenant_reader(
+    db: AsyncSession = Depends(get_read_db),
+    agent_service: AgentService = Depends(get_agent_reader),
+) -> TenantService:
+    """Request-scoped tenant service on a read-only session (replica when caught up)."""
+    return TenantService(db, agent_service)
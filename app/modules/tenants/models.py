@@ -1,7 +1,7 @@
 """Tenant ORM model."""
 import uuid
 
-from sqlalchemy import String
+from sqlalchemy import Index, Integer, String, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -10,5 +10,18 @@ from app.core.database import BaseEntity
 
 class Tenant(BaseEntity):
     __tablename__ = "tenants"
+    __table_args__ = (
+        # Keyset pagination of listings; partial: soft-deleted rows are never listed
+        Index(
+            "ix_tenants_active_created_at_id",
+            "created_at",
+            "id",
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+    )
 
     name: Mapped[str] = mapped_column(String(255), nullable=False)
+    # Caller-supplied key (e.g. partner account id); makes provisioning idempotent
+    external_id: Mapped[str | None] = mapped_column(String(255), nullable=True, unique=True)
+    # Raw events older than this are compacted into daily rollups; NULL: EVENTS_RETENTION_DAYS
+    event_retention_days: Mapped[int | None] = mapped_column(Integer, nullable=True)
@@ -1,22 +1,36 @@
 """Tenants API router"""
 import uuid
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import IntegrityError
 
-from app.modules.agents.deps import get_agent_service
+from app.core.jsonstream import JSONStreamError
+from app.core.pagination import PageParams, page_params, set_page_headers
+from app.core.projection import rows_response
+
+from app.modules.agents.deps import get_agent_reader
 from app.modules.agents.schemas import AgentRead
 from app.modules.agents.service import AgentService
-from app.modules.tenants.deps import get_tenant_service
-from app.modules.tenants.schemas import TenantCreate, TenantRead
+from app.modules.tenants.deps import get_tenant_reader, get_tenant_service
+from app.modules.tenants.bulk import ImportResult, iter_rows
+from app.modules.tenants.schemas import TenantCreate, TenantImportRead, TenantRead
 from app.modules.tenants.service import TenantService
 
 router = APIRouter(prefix="/tenants", tags=["tenants"])
 
 
 @router.get("/", response_model=list[TenantRead])
-async def get_tenants(service: TenantService = Depends(get_tenant_service)) -> list[TenantRead]:
-    tenants = await service.get_tenants()
-    return [TenantRead.model_validate(t) for t in tenants]
+async def get_tenants(
+    page: PageParams = Depends(page_params),
+    service: TenantService = Depends(get_tenant_reader),
+):
+    """Keyset-paginated: see X-Next-Cursor / X-Total-Count headers."""
+    tenants, next_cursor = await service.list_tenants(page)
+    total = await service.count_tenants() if page.total else None
+    response = rows_response(tenants, exclude=("created_at",))
+    set_page_headers(response, next_cursor, total)
+    return response
 
 
 @router.post("/", response_model=TenantRead, status_code=status.HTTP_201_CREATED)
@@ -24,15 +38,50 @@ async def create_tenant(
     data: TenantCreate,
     service: TenantService = Depends(get_tenant_service),
 ) -> TenantRead:
-    tenant = await service.create_tenant(data)
+    try:
+        tenant = await service.create_tenant(data)
+    except IntegrityError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Tenant with this external_id already exists",
+        )
     return TenantRead.model_validate(tenant)
 
 
+@router.post("/bulk", response_model=TenantImportRead)
+async def import_tenants(
+    request: Request,
+    service: TenantService = Depends(get_tenant_service),
+):
+    """
+    Bulk provisioning from a streamed body: NDJSON or JSON array, or CSV with a
+    header line (Content-Type: text/csv). Rows: external_id, name,
+    event_retention_days. Idempotent by external_id; committed in batches.
+    """
+    result = ImportResult()
+    try:
+        await service.import_tenants(
+            iter_rows(request.stream(), request.headers.get("content-type")),
+            result=result,
+        )
+    except JSONStreamError as e:
+        # Batches before the malformed part are committed; resending is safe
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"detail": str(e), "processed": result.summary()},
+        )
+    return TenantImportRead(**result.summary(), errors=result.errors)
+
+
 @router.get("/{tenant_id}/agents", response_model=list[AgentRead])
 async def get_tenant_agents(
     tenant_id: uuid.UUID,
-    service: AgentService = Depends(get_agent_service),
-) -> list[AgentRead]:
-    """Tenant agents (human) + platform LLM agents available for threads."""
-    agents = await service.get_available_for_tenant(tenant_id)
-    return [AgentRead.model_validate(a) for a in agents]
+    page: PageParams = Depends(page_params),
+    service: AgentService = Depends(get_agent_reader),
+):
+    """Tenant agents available for threads. Keyset-paginated (X-Next-Cursor)."""
+    agents, next_cursor = await service.list_by_tenant(tenant_id, page)
+    total = await service.count_by_tenant(tenant_id) if page.total else None
+    response = rows_response(agents, exclude=("created_at",))
+    set_page_headers(response, next_cursor, total)
+    return response
@@ -6,10 +6,28 @@ from pydantic import BaseModel, Field
 
 class TenantCreate(BaseModel):
     name: str = Field(..., min_length=1, max_length=255)
+    external_id: str | None = Field(default=None, min_length=1, max_length=255)
+    event_retention_days: int | None = Field(default=None, ge=1)
+
+
+class TenantImportRow(TenantCreate):
+    """One tenant of a bulk import; external_id is the idempotency key."""
+
+    external_id: str = Field(..., min_length=1, max_length=255)
 
 
 class TenantRead(BaseModel):
     id: uuid.UUID
     name: str
+    external_id: str | None = None
+    event_retention_days: int | None = None
 
     model_config = {"from_attributes": True}
+
+
+class TenantImportRead(BaseModel):
+    total: int
+    created: int
+    existing: int
+    failed: int
+    errors: list[dict]
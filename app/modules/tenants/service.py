@@ -1,8 +1,18 @@
 """Tenant service: DB operations for tenants."""
+import uuid
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator
+
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core import pagination
+from app.core.pagination import Cursor, PageParams
+from app.modules.agents.models import Agent
 from app.modules.agents.service import AgentService
+from app.modules.tenants import bulk
 from app.modules.tenants.models import Tenant
 from app.modules.tenants.schemas import TenantCreate
 
@@ -12,17 +22,65 @@ class TenantService:
         self._session = session
         self._agent_service = agent_service
 
-    async def get_tenants(self) -> list[Tenant]:
-        result = await self._session.execute(select(Tenant).order_by(Tenant.id))
-        return list(result.scalars().all())
-
-    async def create_tenant(self, data: TenantCreate) -> Tenant:
-        tenant = Tenant(name=data.name)
-        self._session.add(tenant)
-        await self._session.flush()
-        await self._session.refresh(tenant)
+    async def list_tenants(self, page: PageParams) -> tuple[list[Row], Cursor | None]:
+        """One keyset page in creation order: rows with the TenantRead fields and created_at."""
+        stmt = pagination.keyset(
+            select(
+                Tenant.id,
+                Tenant.name,
+                Tenant.external_id,
+                Tenant.event_retention_days,
+                Tenant.created_at,
+            ),
+            Tenant,
+            page,
+        )
+        result = await self._session.execute(stmt)
+        return pagination.split_page(result.all(), page)
 
-        await self._agent_service.create_human_for_tenant(tenant.id)
-        await self._agent_service.create_system_for_tenant(tenant.id)
+    async def count_tenants(self) -> tuple[int, bool]:
+        return await pagination.count(self._session, select(Tenant.id))
 
+    async def create_tenant(self, data: TenantCreate) -> Tenant:
+        """Tenant and its default human and system agents in one statement."""
+        now = datetime.now(timezone.utc)
+        tenant = Tenant(
+            id=uuid.uuid4(),
+            name=data.name,
+            external_id=data.external_id,
+            event_retention_days=data.event_retention_days,
+            created_at=now,
+            updated_at=now,
+        )
+        tenant_insert = insert(Tenant.__table__).values(
+            id=tenant.id,
+            name=tenant.name,
+            external_id=tenant.external_id,
+            event_retention_days=tenant.event_retention_days,
+            created_at=now,
+            updated_at=now,
+        ).cte("new_tenant")
+        # agents.tenant_id FK is checked at the end of the statement, after both inserts
+        stmt = (
+            insert(Agent.__table__)
+            .values(self._agent_service.default_agent_rows(tenant.id, now))
+            .add_cte(tenant_insert)
+        )
+        await self._session.execute(stmt)
         return tenant
+
+    async def import_tenants(
+        self,
+        rows: AsyncIterator[Any],
+        batch_size: int = 5000,
+        result: bulk.ImportResult | None = None,
+        on_progress: bulk.ProgressCallback | None = None,
+    ) -> bulk.ImportResult:
+        """Idempotent bulk provisioning by external_id; commits per batch."""
+        return await bulk.import_tenants(
+            self._session,
+            rows,
+            batch_size=batch_size,
+            result=result,
+            on_progress=on_progress,
+        )
@@ -0,0 +1,27 @@
+"""Bootstrap: background purge of soft-deleted threads."""
+
+import logging
+
+from fastapi import FastAPI
+
+from app.modules.threads import purge
+
+logger = logging.getLogger(__name__)
+
+
+async def init_threads(app: FastAPI) -> None:
+    """Start the purge job (THREADS_PURGE_ENABLED, default 1)."""
+    app.state.threads_purge = None
+    if not purge.enabled():
+        return
+    job = purge.PurgeJob(purge.ThreadPurger())
+    job.start()
+    purge.job = app.state.threads_purge = job
+    logger.info("Thread purge job started")
+
+
+async def close_threads(app: FastAPI) -> None:
+    job = getattr(app.state, "threads_purge", None)
+    if job is not None:
+        purge.job = None
+        await job.stop()
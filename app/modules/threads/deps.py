@@ -3,7 +3,7 @@
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.deps import get_db
+from app.core.deps import get_db, get_read_db
 from app.modules.secrets.deps import get_secrets
 from app.modules.secrets.base import SecretsManager
 from app.modules.threads.langchain_service import LangChainService
@@ -20,6 +20,16 @@ def get_message_service(db: AsyncSession = Depends(get_db)) -> MessageService:
     return MessageService(db)
 
 
+def get_thread_reader(db: AsyncSession = Depends(get_read_db)) -> ThreadService:
+    """Request-scoped thread service on a read-only session (replica when caught up)."""
+    return ThreadService(db)
+
+
+def get_message_reader(db: AsyncSession = Depends(get_read_db)) -> MessageService:
+    """Request-scoped message service on a read-only session (replica when caught up)."""
+    return MessageService(db)
+
+
 def get_langchain_service(
     db: AsyncSession = Depends(get_db),
     secrets: SecretsManager = Depends(get_secrets),
@@ -3,15 +3,18 @@ import asyncio
 import logging
 import os
 import uuid
-from typing import AsyncGenerator
+from typing import TYPE_CHECKING, AsyncGenerator
 
-from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
-from langchain_openai import ChatOpenAI
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.modules.secrets.base import SecretsManager
 from app.modules.threads.models import Message, MessageRole
 
+if TYPE_CHECKING:
+    # The SDKs take over a second to import: loaded on first use (or preloaded after startup)
+    from langchain_core.messages import BaseMessage
+    from langchain_openai import ChatOpenAI
+
 logger = logging.getLogger(__name__)
 
 # In-memory map: thread_id -> asyncio.Task for cancellation on new user message
@@ -41,8 +44,10 @@ class LangChainService:
         self,
         history: list[Message],
         user_content: str,
-    ) -> list[BaseMessage]:
+    ) -> list["BaseMessage"]:
         """Build LangChain message list from history and new user message."""
+        from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
         messages: list[BaseMessage] = []
 
         if LLM_CONFIG["system_prompt"]:
@@ -68,8 +73,10 @@ class LangChainService:
                 logger.debug("OpenAI key not found in Vault for %s: %s", tid, e)
         return os.getenv("OPENAI_API_KEY")
 
-    def _create_llm(self, api_key: str | None) -> ChatOpenAI:
+    def _create_llm(self, api_key: str | None) -> "ChatOpenAI":
         """Create ChatOpenAI instance from platform config."""
+        from langchain_openai import ChatOpenAI
+
         kwargs = {
             "model": LLM_CONFIG["model"],
             "streaming": True,
@@ -3,7 +3,7 @@ import enum
 import uuid
 
 import sqlalchemy as sa
-from sqlalchemy import Enum, ForeignKey, String, Table, Text
+from sqlalchemy import Enum, ForeignKey, Index, String, Table, Text, text
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -26,12 +26,17 @@ class MessageRole(str, enum.Enum):
 
 class Thread(BaseEntity):
     __tablename__ = "threads"
+    __table_args__ = (
+        # A tenant's threads; partial: queries see active threads only (app.core.database)
+        Index("ix_threads_active_tenant_id", "tenant_id", postgresql_where=text("deleted_at IS NULL")),
+        # Soft-deleted threads waiting for the purger (threads/purge.py)
+        Index("ix_threads_deleted_at", "deleted_at", postgresql_where=text("deleted_at IS NOT NULL")),
+    )
 
     tenant_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         ForeignKey("tenants.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
     )
     title: Mapped[str] = mapped_column(String(255), nullable=False, default="New thread")
     metadata_: Mapped[dict | None] = mapped_column(
@@ -50,6 +55,9 @@ class Thread(BaseEntity):
         back_populates="thread",
         order_by="Message.created_at",
         cascade="all, delete-orphan",
+        # Deleting a thread leaves messages to ON DELETE CASCADE instead of
+        # loading and deleting them one by one
+        passive_deletes=True,
     )
 
     @property
@@ -60,12 +68,16 @@ class Thread(BaseEntity):
 
 class Message(BaseEntity):
     __tablename__ = "messages"
+    __table_args__ = (
+        # Thread history in order and keyset purge batches (threads/purge.py)
+        Index("ix_messages_thread_id_created_at_id", "thread_id", "created_at", "id"),
+    )
 
+    # Full indexes: ON DELETE CASCADE and purges look rows up whatever their deleted_at
     thread_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         ForeignKey("threads.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
     )
     agent_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
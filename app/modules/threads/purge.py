@@ -0,0 +1,264 @@
+"""
+Background purge of soft-deleted threads.
+
+DELETE /threads/{id} only sets threads.deleted_at and returns 202; the thread
+is invisible from then on (app.core.database). ThreadPurger removes the rows
+later:
+
+- messages go in small keyset batches over (thread_id, created_at, id), one
+  transaction each, under lock_timeout / statement_timeout and a rows/s
+  ceiling (THREADS_PURGE_MAX_ROWS_PER_SEC)
+- then the thread row; thread_agents and any message written meanwhile go
+  with it by ON DELETE CASCADE
+- a thread whose batch cannot get its locks is skipped until the next run;
+  the other threads are still purged
+- one worker runs the purge at a time (pg_try_advisory_lock)
+
+A delete in this worker wakes the purger right away; deletes in other
+workers are picked up within THREADS_PURGE_INTERVAL.
+"""
+import asyncio
+import logging
+import os
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core import metrics
+from app.core.database import engine, lock_engine
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary constant shared by all workers: only one purge run at a time
+ADVISORY_LOCK_KEY = 0x6C6F7265_70757267
+
+purged_rows = metrics.counter("threads_purged_rows_total", "Rows removed by the thread purger by table")
+purge_skipped = metrics.counter(
+    "threads_purge_batches_skipped_total",
+    "Thread purge batches skipped on lock or statement timeout",
+)
+
+# Oldest deletions first, after the keyset cursor: threads skipped in this
+# run stay behind it; served by the partial ix_threads_deleted_at
+_DELETED_THREADS_SQL = text("""
+SELECT id, deleted_at FROM threads
+WHERE deleted_at IS NOT NULL
+  AND (deleted_at, id) > (:after_ts, :after_id)
+ORDER BY deleted_at, id
+LIMIT :limit
+""")
+
+# One batch: the next messages of the thread after the cursor; returns the new cursor
+_MESSAGES_BATCH_SQL = text("""
+WITH batch AS (
+    SELECT id
+    FROM messages
+    WHERE thread_id = :thread_id
+      AND (created_at, id) > (:after_ts, :after_id)
+    ORDER BY created_at, id
+    LIMIT :limit
+),
+deleted AS (
+    DELETE FROM messages m
+    USING batch
+    WHERE m.id = batch.id
+    RETURNING m.created_at, m.id
+)
+SELECT count(*) AS deleted,
+       (array_agg(created_at ORDER BY created_at DESC, id DESC))[1] AS last_ts,
+       (array_agg(id ORDER BY created_at DESC, id DESC))[1] AS last_id
+FROM deleted
+""")
+
+_DELETE_THREAD_SQL = text("DELETE FROM threads WHERE id = :thread_id AND deleted_at IS NOT NULL")
+
+_MIN_TS = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MIN_ID = uuid.UUID(int=0)
+
+
+@dataclass
+class PurgeConfig:
+    batch_size: int = 1000
+    max_rows_per_sec: int = 20_000
+    lock_timeout_ms: int = 2000
+    statement_timeout_ms: int = 30_000
+    max_run_seconds: float = 300.0
+    interval: float = 60.0
+
+    @classmethod
+    def from_env(cls) -> "PurgeConfig":
+        return cls(
+            batch_size=int(os.getenv("THREADS_PURGE_BATCH_SIZE", "1000")),
+            max_rows_per_sec=int(os.getenv("THREADS_PURGE_MAX_ROWS_PER_SEC", "20000")),
+            lock_timeout_ms=int(os.getenv("THREADS_PURGE_LOCK_TIMEOUT_MS", "2000")),
+            statement_timeout_ms=int(os.getenv("THREADS_PURGE_STATEMENT_TIMEOUT_MS", "30000")),
+            max_run_seconds=float(os.getenv("THREADS_PURGE_MAX_RUN_SECONDS", "300")),
+            interval=float(os.getenv("THREADS_PURGE_INTERVAL", "60")),
+        )
+
+
+@dataclass
+class PurgeReport:
+    threads: int = 0
+    messages: int = 0
+    skipped_batches: int = 0
+    complete: bool = True
+
+
+class ThreadPurger:
+    def __init__(self, config: PurgeConfig | None = None) -> None:
+        self.config = config or PurgeConfig.from_env()
+
+    async def run(self) -> PurgeReport | None:
+        """One purge pass. None if another worker holds the lock."""
+        async with lock_engine.connect() as lock_conn:
+            locked = await lock_conn.scalar(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": ADVISORY_LOCK_KEY}
+            )
+            await lock_conn.commit()
+            if not locked:
+                logger.debug("Thread purge already running elsewhere")
+                return None
+            try:
+                return await self._run()
+            finally:
+                await lock_conn.execute(
+                    text("SELECT pg_advisory_unlock(:key)"), {"key": ADVISORY_LOCK_KEY}
+                )
+                await lock_conn.commit()
+
+    async def _run(self) -> PurgeReport:
+        report = PurgeReport()
+        deadline = time.monotonic() + self.config.max_run_seconds
+        after_ts, after_id = _MIN_TS, _MIN_ID
+        out_of_time = False
+        while not out_of_time:
+            async with engine.connect() as conn:
+                threads = (await conn.execute(
+                    _DELETED_THREADS_SQL, {"after_ts": after_ts, "after_id": after_id, "limit": 100}
+                )).all()
+                await conn.commit()
+            if not threads:
+                break
+            for thread_id, deleted_at in threads:
+                after_ts, after_id = deleted_at, thread_id
+                if time.monotonic() >= deadline:
+                    out_of_time = True
+                    break
+                if not await self._purge_thread(thread_id, deadline, report):
+                    # Locked (retried next run) or out of time; other threads go on
+                    report.complete = False
+        if out_of_time:
+            report.complete = False
+
+        if report.threads or not report.complete:
+            logger.info(
+                "Thread purge: %s threads, %s messages deleted, %s batches skipped%s",
+                report.threads,
+                report.messages,
+                report.skipped_batches,
+                "" if report.complete else " (incomplete)",
+            )
+        return report
+
+    async def _purge_thread(self, thread_id: uuid.UUID, deadline: float, report: PurgeReport) -> bool:
+        """True once the thread is gone."""
+        after_ts, after_id = _MIN_TS, _MIN_ID
+        while True:
+            if time.monotonic() >= deadline:
+                return False
+            started = time.monotonic()
+            try:
+                async with engine.begin() as conn:
+                    await self._set_budgets(conn)
+                    row = (await conn.execute(_MESSAGES_BATCH_SQL, {
+                        "thread_id": thread_id,
+                        "after_ts": after_ts,
+                        "after_id": after_id,
+                        "limit": self.config.batch_size,
+                    })).one()
+            except DBAPIError as e:
+                return self._skipped(thread_id, e, report)
+
+            if not row.deleted:
+                break
+            report.messages += row.deleted
+            purged_rows.inc(row.deleted, table="messages")
+            after_ts, after_id = row.last_ts, row.last_id
+
+            # I/O budget: no faster than max_rows_per_sec
+            pause = row.deleted / self.config.max_rows_per_sec - (time.monotonic() - started)
+            if pause > 0:
+                await asyncio.sleep(pause)
+
+        try:
+            async with engine.begin() as conn:
+                await self._set_budgets(conn)
+                deleted = (await conn.execute(_DELETE_THREAD_SQL, {"thread_id": thread_id})).rowcount
+        except DBAPIError as e:
+            return self._skipped(thread_id, e, report)
+        report.threads += deleted
+        purged_rows.inc(deleted, table="threads")
+        return True
+
+    def _skipped(self, thread_id: uuid.UUID, error: DBAPIError, report: PurgeReport) -> bool:
+        # lock_timeout / statement_timeout: leave the rest for the next run
+        logger.warning("Thread purge batch skipped for thread=%s: %s", thread_id, error.orig)
+        purge_skipped.inc()
+        report.skipped_batches += 1
+        return False
+
+    async def _set_budgets(self, conn: AsyncConnection) -> None:
+        await conn.execute(text(f"SET LOCAL lock_timeout = {int(self.config.lock_timeout_ms)}"))
+        await conn.execute(text(f"SET LOCAL statement_timeout = {int(self.config.statement_timeout_ms)}"))
+
+
+class PurgeJob:
+    """Background task: ThreadPurger.run() every THREADS_PURGE_INTERVAL seconds or when woken."""
+
+    def __init__(self, purger: ThreadPurger) -> None:
+        self.purger = purger
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._loop(), name="threads-purge")
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            self._wake.clear()
+            try:
+                await self.purger.run()
+            except Exception:
+                logger.exception("Thread purge run failed")
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.purger.config.interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+# Set by init_threads(); ThreadService.delete() wakes it after commit
+job: PurgeJob | None = None
+
+
+def wake() -> None:
+    if job is not None:
+        job.wake()
+
+
+def enabled() -> bool:
+    return os.getenv("THREADS_PURGE_ENABLED", "1") == "1"
@@ -2,14 +2,18 @@
 import json
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from fastapi.responses import StreamingResponse
 
+from app.core.projection import rows_response
+
 from app.modules.agents.deps import get_agent_service
 from app.modules.agents.service import AgentService
 from app.modules.threads.deps import (
     get_langchain_service,
+    get_message_reader,
     get_message_service,
+    get_thread_reader,
     get_thread_service,
 )
 from app.modules.threads.models import MessageRole
@@ -52,16 +56,15 @@ async def create_thread(
 @router.get("/tenant/{tenant_id}", response_model=list[ThreadRead])
 async def list_threads(
     tenant_id: uuid.UUID,
-    thread_service: ThreadService = Depends(get_thread_service),
-) -> list[ThreadRead]:
-    threads = await thread_service.get_by_tenant(tenant_id)
-    return [ThreadRead.from_thread(t) for t in threads]
+    thread_service: ThreadService = Depends(get_thread_reader),
+):
+    return rows_response(await thread_service.list_rows_by_tenant(tenant_id))
 
 
 @router.get("/{thread_id}", response_model=ThreadRead)
 async def get_thread(
     thread_id: uuid.UUID,
-    thread_service: ThreadService = Depends(get_thread_service),
+    thread_service: ThreadService = Depends(get_thread_reader),
 ) -> ThreadRead:
     thread = await thread_service.get(thread_id)
     if not thread:
@@ -69,28 +72,27 @@ async def get_thread(
     return ThreadRead.from_thread(thread)
 
 
-@router.delete("/{thread_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete("/{thread_id}", status_code=status.HTTP_202_ACCEPTED)
 async def delete_thread(
     thread_id: uuid.UUID,
     thread_service: ThreadService = Depends(get_thread_service),
-) -> None:
-    thread = await thread_service.get(thread_id)
-    if not thread:
+) -> Response:
+    """Soft delete; messages are purged in the background."""
+    if not await thread_service.delete(thread_id):
         raise _thread_not_found()
-    await thread_service.delete(thread)
+    return Response(status_code=status.HTTP_202_ACCEPTED)
 
 
 @router.get("/{thread_id}/messages", response_model=list[MessageRead])
 async def get_thread_messages(
     thread_id: uuid.UUID,
-    thread_service: ThreadService = Depends(get_thread_service),
-    message_service: MessageService = Depends(get_message_service),
-) -> list[MessageRead]:
+    thread_service: ThreadService = Depends(get_thread_reader),
+    message_service: MessageService = Depends(get_message_reader),
+):
     thread = await thread_service.get(thread_id)
     if not thread:
         raise _thread_not_found()
-    messages = await message_service.get_history(thread_id)
-    return [MessageRead.from_message(m) for m in messages]
+    return rows_response(await message_service.history_rows(thread_id))
 
 
 @router.post("/{thread_id}/messages")
@@ -132,7 +134,7 @@ async def send_message(
 
     history = await message_service.get_history(thread_id)
     await message_service.create(
-        thread_id, data.agent_id, MessageRole.user, data.content
+        thread_id, data.agent_id, MessageRole.user, data.content, tenant_id=thread.tenant_id
     )
 
     async def event_stream():
@@ -153,7 +155,7 @@ async def send_message(
         await thread_service.ensure_agent_in_thread(thread_id, system_agent.id)
         full_content = "".join(collected)
         await message_service.create(
-            thread_id, system_agent.id, MessageRole.assistant, full_content
+            thread_id, system_agent.id, MessageRole.assistant, full_content, tenant_id=thread.tenant_id
         )
 
     return StreamingResponse(
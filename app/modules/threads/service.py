@@ -1,14 +1,76 @@
 """Thread and Message services: DB operations and business logic."""
 import uuid
+from datetime import datetime, timezone
 
-from sqlalchemy import select
+from typing import Sequence
+
+from sqlalchemy import bindparam, func, select, type_coerce, update
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.core.cache import TTLCache
+from app.core.database import on_commit
+from app.core.writebehind import WriteBehindBuffer
 from app.modules.agents.models import Agent
-from app.modules.threads.models import Message, MessageRole, Thread
+from app.modules.events import stream
+from app.modules.threads import purge
+from app.modules.threads.models import Message, MessageRole, Thread, thread_agents
 from app.modules.threads.schemas import ThreadCreate
 
+# Messages from concurrent requests share one INSERT and commit
+_message_writes = WriteBehindBuffer(Message.__table__)
+
+# Hot statements are built once: executing a prebuilt statement skips
+# construction and reuses its memoized cache key (see app.core.database)
+_THREAD_BY_ID = (
+    select(Thread)
+    .where(Thread.id == bindparam("thread_id"))
+    .options(selectinload(Thread.agents))
+)
+_HISTORY = (
+    select(Message)
+    .where(Message.thread_id == bindparam("thread_id"))
+    .order_by(Message.created_at.asc())
+)
+
+# Projections with the ThreadRead / MessageRead fields (app.core.projection)
+_THREAD_ROWS_BY_TENANT = (
+    select(
+        Thread.id,
+        Thread.tenant_id,
+        type_coerce(
+            func.array_remove(func.array_agg(thread_agents.c.agent_id), None),
+            ARRAY(UUID(as_uuid=True)),
+        ).label("agent_ids"),
+        Thread.title,
+        Thread.metadata_.label("metadata"),
+        Thread.created_at,
+        Thread.updated_at,
+    )
+    .outerjoin(thread_agents, thread_agents.c.thread_id == Thread.id)
+    .where(Thread.tenant_id == bindparam("tenant_id"))
+    .group_by(Thread.id)
+    .order_by(Thread.updated_at.desc())
+)
+_HISTORY_ROWS = (
+    select(
+        Message.id,
+        Message.thread_id,
+        Message.agent_id,
+        Message.role,
+        Message.content,
+        Message.created_at,
+    )
+    .where(Message.thread_id == bindparam("thread_id"))
+    .order_by(Message.created_at.asc())
+)
+
+# str(thread_id) -> tenant_id, filled as threads are read; lets the rate
+# limiter charge thread requests to the tenant without a query
+thread_tenants: TTLCache[str, uuid.UUID] = TTLCache(maxsize=100_000)
+
 
 class ThreadService:
     def __init__(self, session: AsyncSession) -> None:
@@ -27,6 +89,7 @@ class ThreadService:
         self._session.add(thread)
         await self._session.flush()
         await self._session.refresh(thread)
+        thread_tenants.set(str(thread.id), thread.tenant_id)
         return thread
 
     async def ensure_agent_in_thread(self, thread_id: uuid.UUID, agent_id: uuid.UUID) -> None:
@@ -43,12 +106,11 @@ class ThreadService:
             await self._session.flush()
 
     async def get(self, thread_id: uuid.UUID) -> Thread | None:
-        result = await self._session.execute(
-            select(Thread)
-            .where(Thread.id == thread_id)
-            .options(selectinload(Thread.agents))
-        )
-        return result.scalar_one_or_none()
+        result = await self._session.execute(_THREAD_BY_ID, {"thread_id": thread_id})
+        thread = result.scalar_one_or_none()
+        if thread is not None:
+            thread_tenants.set(str(thread.id), thread.tenant_id)
+        return thread
 
     async def get_by_tenant(self, tenant_id: uuid.UUID) -> list[Thread]:
         result = await self._session.execute(
@@ -59,9 +121,29 @@ class ThreadService:
         )
         return list(result.scalars().all())
 
-    async def delete(self, thread: Thread) -> None:
-        await self._session.delete(thread)
-        await self._session.flush()
+    async def list_rows_by_tenant(self, tenant_id: uuid.UUID) -> Sequence[Row]:
+        """ThreadRead columns of the tenant's threads, most recently updated first."""
+        result = await self._session.execute(_THREAD_ROWS_BY_TENANT, {"tenant_id": tenant_id})
+        return result.all()
+
+    async def delete(self, thread_id: uuid.UUID) -> bool:
+        """
+        Soft delete: one UPDATE, the thread disappears from queries at once.
+        Messages and the row are removed later by the purger (threads/purge.py).
+        False if there is no such active thread.
+        """
+        now = datetime.now(timezone.utc)
+        result = await self._session.execute(
+            update(Thread)
+            .where(Thread.id == thread_id, Thread.deleted_at.is_(None))
+            .values(deleted_at=now, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        if not result.rowcount:
+            return False
+        thread_tenants.pop(str(thread_id))
+        on_commit(self._session, purge.wake)
+        return True
 
 
 class MessageService:
@@ -74,22 +156,41 @@ class MessageService:
         agent_id: uuid.UUID,
         role: MessageRole,
         content: str,
+        tenant_id: uuid.UUID | None = None,
     ) -> Message:
+        """
+        Durable create through the write-behind buffer: returns once the row is
+        committed in its own transaction. Thread and agent must already be committed.
+        tenant_id (the thread's) puts the message on the tenant stream.
+        """
+        now = datetime.now(timezone.utc)
         message = Message(
+            id=uuid.uuid4(),
             thread_id=thread_id,
             agent_id=agent_id,
             role=role,
             content=content,
+            created_at=now,
+            updated_at=now,
         )
-        self._session.add(message)
-        await self._session.flush()
-        await self._session.refresh(message)
+        await _message_writes.write({
+            "id": message.id,
+            "thread_id": message.thread_id,
+            "agent_id": message.agent_id,
+            "role": message.role,
+            "content": message.content,
+            "created_at": message.created_at,
+            "updated_at": message.updated_at,
+        })
+        if tenant_id is not None:
+            stream.publish([stream.message_item(tenant_id, message)])
         return message
 
     async def get_history(self, thread_id: uuid.UUID) -> list[Message]:
-        result = await self._session.execute(
-            select(Message)
-            .where(Message.thread_id == thread_id)
-            .order_by(Message.created_at.asc())
-        )
+        result = await self._session.execute(_HISTORY, {"thread_id": thread_id})
         return list(result.scalars().all())
+
+    async def history_rows(self, thread_id: uuid.UUID) -> Sequence[Row]:
+        """MessageRead columns of the thread's messages in order."""
+        result = await self._session.execute(_HISTORY_ROWS, {"thread_id": thread_id})
+        return result.all()
@@ -7,7 +7,65 @@ CREATE TABLE IF NOT EXISTS events.log
     integration_id String,
     tenant_id String,
 
-    event_type String
+    event_type String,
+
+    event_id UUID,
+    external_id Nullable(String)
 )
 ENGINE = MergeTree
 ORDER BY (tenant_id, timestamp);
+
+-- Tables created before the event sink wrote here
+ALTER TABLE events.log ADD COLUMN IF NOT EXISTS event_id UUID;
+ALTER TABLE events.log ADD COLUMN IF NOT EXISTS external_id Nullable(String);
+
+-- Rollups for /api/events/stats: event counts per minute and per hour.
+-- SummingMergeTree collapses rows with the same key on merge; always read with sum(events).
+CREATE TABLE IF NOT EXISTS events.counts_1m
+(
+    bucket DateTime,
+    tenant_id String,
+    integration_id String,
+    event_type String,
+    events UInt64
+)
+ENGINE = SummingMergeTree(events)
+PARTITION BY toYYYYMM(bucket)
+ORDER BY (tenant_id, bucket, integration_id, event_type)
+TTL bucket + INTERVAL 90 DAY;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS events.counts_1m_mv TO events.counts_1m AS
+SELECT
+    toStartOfMinute(timestamp) AS bucket,
+    tenant_id,
+    integration_id,
+    event_type,
+    count() AS events
+FROM events.log
+GROUP BY bucket, tenant_id, integration_id, event_type;
+
+CREATE TABLE IF NOT EXISTS events.counts_1h
+(
+    bucket DateTime,
+    tenant_id String,
+    integration_id String,
+    event_type String,
+    events UInt64
+)
+ENGINE = SummingMergeTree(events)
+PARTITION BY toYYYYMM(bucket)
+ORDER BY (tenant_id, bucket, integration_id, event_type);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS events.counts_1h_mv TO events.counts_1h AS
+SELECT
+    toStartOfHour(timestamp) AS bucket,
+    tenant_id,
+    integration_id,
+    event_type,
+    count() AS events
+FROM events.log
+GROUP BY bucket, tenant_id, integration_id, event_type;
+
+-- Backfill of rollups for rows written before the views existed (run once, manually):
+-- INSERT INTO events.counts_1m SELECT toStartOfMinute(timestamp), tenant_id, integration_id, event_type, count() FROM events.log GROUP BY 1, 2, 3, 4;
+-- INSERT INTO events.counts_1h SELECT toStartOfHour(timestamp), tenant_id, integration_id, event_type, count() FROM events.log GROUP BY 1, 2, 3, 4;
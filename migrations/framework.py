@@ -0,0 +1,397 @@
+"""
+Фреймворк миграций данных: keyset-батчи, чекпоинты, параллельные диапазоны.
+
+Миграция описывается подклассом DataMigration (таблица, ключ, SQL батча) и
+объявляется в модуле migrations/data_migrations/ как MIGRATION = MyMigration().
+
+- Ключ (id, уникальный и проиндексированный: int или UUID) делится на
+  диапазоны (lower, upper]; диапазоны обрабатываются параллельно workers
+  задачами, каждая на своём соединении.
+- Внутри диапазона граница следующего батча ищется по индексу
+  (key > position ORDER BY key OFFSET batch_size - 1 LIMIT 1): стоимость батча
+  не зависит от того, сколько уже пройдено (в отличие от LIMIT/OFFSET).
+- Батч и сдвиг чекпоинта (таблица data_migration_checkpoints) коммитятся в
+  одной транзакции: после падения миграция продолжается с последнего батча,
+  ни один батч не применяется дважды.
+- Каждый батч выполняется с lock_timeout / statement_timeout; батч, не
+  получивший блокировок, повторяется с растущей паузой.
+- Throttle приостанавливает работу, пока лаг реплик (pg_stat_replication)
+  больше max_lag или в базе слишком много сессий ждут блокировок.
+- Прогресс (строки, строк/с, диапазоны) печатается каждые report_every секунд.
+
+    class BackfillTitles(DataMigration):
+        name = "002_backfill_titles"
+        table = "threads"
+        sql = '''
+            UPDATE threads SET title = 'New thread'
+            WHERE id > :lower AND id <= :upper AND title = ''
+        '''
+
+    MIGRATION = BackfillTitles()
+"""
+import asyncio
+import os
+import time
+import uuid
+from dataclasses import dataclass
+from typing import AsyncIterator
+
+import sqlalchemy as sa
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+
+from app.core.database import Base
+
+checkpoints = sa.Table(
+    "data_migration_checkpoints",
+    Base.metadata,
+    sa.Column("migration", sa.String(255), primary_key=True),
+    sa.Column("range_no", sa.Integer, primary_key=True),
+    # Ключи хранятся текстом: int или UUID, см. DataMigration.key_type
+    sa.Column("lower", sa.Text, nullable=False),
+    sa.Column("upper", sa.Text, nullable=False),
+    sa.Column("position", sa.Text, nullable=False),
+    sa.Column("rows", sa.BigInteger, nullable=False, server_default="0"),
+    sa.Column("done", sa.Boolean, nullable=False, server_default=sa.false()),
+    sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+)
+
+# SQLSTATE: lock_not_available (lock_timeout), query_canceled (statement_timeout)
+_RETRYABLE = {"55P03", "57014"}
+
+_UUID_SPACE = 1 << 128
+
+_LAG_SQL = text("""
+SELECT coalesce(max(extract(epoch FROM replay_lag)), 0) FROM pg_stat_replication
+""")
+_LOCK_WAITERS_SQL = text("""
+SELECT count(*) FROM pg_stat_activity
+WHERE wait_event_type = 'Lock' AND pid <> pg_backend_pid()
+""")
+
+
+class DataMigration:
+    """
+    Описание миграции. Обязательны name, table и sql (или свой process()).
+    sql получает :lower и :upper — границы батча (lower, upper] по key.
+    """
+
+    name: str = ""
+    table: str = ""
+    key: str = "id"
+    key_type: type = uuid.UUID  # uuid.UUID или int
+    sql: str = ""
+
+    batch_size: int = 5000
+    workers: int = 4
+    # Диапазонов на воркер: меньше простоя, когда диапазоны неравномерны
+    ranges_per_worker: int = 4
+    lock_timeout_ms: int = 2000
+    statement_timeout_ms: int = 30_000
+    max_retries: int = 10
+
+    async def process(self, conn: AsyncConnection, lower, upper) -> int:
+        """Обработать строки с key в (lower, upper]; вернуть число затронутых строк."""
+        result = await conn.execute(text(self.sql), {"lower": lower, "upper": upper})
+        return max(result.rowcount, 0)
+
+
+@dataclass
+class MigrationReport:
+    name: str
+    rows: int = 0
+    batches: int = 0
+    retries: int = 0
+    seconds: float = 0.0
+    resumed: bool = False
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+class Throttle:
+    """
+    Общая для воркеров пауза: пока лаг реплик больше max_lag секунд или
+    сессий, ждущих блокировок, больше max_lock_waiters. Проверка не чаще
+    раза в interval секунд.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        max_lag: float = 5.0,
+        max_lock_waiters: int = 10,
+        interval: float = 1.0,
+    ) -> None:
+        self.engine = engine
+        self.max_lag = max_lag
+        self.max_lock_waiters = max_lock_waiters
+        self.interval = interval
+        self.paused = 0.0
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def from_env(cls, engine: AsyncEngine) -> "Throttle":
+        return cls(
+            engine,
+            max_lag=float(os.getenv("DATA_MIGRATION_MAX_LAG", "5")),
+            max_lock_waiters=int(os.getenv("DATA_MIGRATION_MAX_LOCK_WAITERS", "10")),
+            interval=float(os.getenv("DATA_MIGRATION_THROTTLE_INTERVAL", "1")),
+        )
+
+    async def wait(self) -> None:
+        async with self._lock:
+            if time.monotonic() - self._checked_at < self.interval:
+                return
+            while True:
+                lag, waiters = await self._check()
+                self._checked_at = time.monotonic()
+                if lag <= self.max_lag and waiters <= self.max_lock_waiters:
+                    return
+                print(f"  пауза: лаг реплик {lag:.1f} с, ожидающих блокировок {waiters}")
+                self.paused += self.interval
+                await asyncio.sleep(self.interval)
+
+    async def _check(self) -> tuple[float, int]:
+        async with self.engine.connect() as conn:
+            lag = await conn.scalar(_LAG_SQL)
+            waiters = await conn.scalar(_LOCK_WAITERS_SQL)
+            await conn.commit()
+        return float(lag or 0), int(waiters or 0)
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _bound_sql(migration: DataMigration) -> sa.TextClause:
+    table, key = _quote(migration.table), _quote(migration.key)
+    return text(
+        f"SELECT {key} FROM {table} WHERE {key} > :position AND {key} <= :upper "
+        f"ORDER BY {key} OFFSET :offset LIMIT 1"
+    )
+
+
+async def next_bound(conn: AsyncConnection, migration: DataMigration, position, upper):
+    """
+    Верхняя граница следующего батча после position (не дальше upper):
+    одна короткая проходка по индексу ключа. None — строк больше нет.
+    """
+    found = await conn.scalar(
+        _bound_sql(migration),
+        {"position": position, "upper": upper, "offset": migration.batch_size - 1},
+    )
+    if found is not None:
+        return found
+    # Меньше batch_size строк до конца диапазона: последний батч
+    table, key = _quote(migration.table), _quote(migration.key)
+    rest = await conn.scalar(
+        text(f"SELECT 1 FROM {table} WHERE {key} > :position AND {key} <= :upper LIMIT 1"),
+        {"position": position, "upper": upper},
+    )
+    return upper if rest else None
+
+
+async def keyset_batches(
+    conn: AsyncConnection,
+    migration: DataMigration,
+    lower,
+    upper,
+) -> AsyncIterator[tuple]:
+    """Границы (lower, upper] батчей по batch_size строк, по порядку ключа."""
+    position = lower
+    while True:
+        bound = await next_bound(conn, migration, position, upper)
+        if bound is None:
+            return
+        yield position, bound
+        if bound == upper:
+            return
+        position = bound
+
+
+def _encode(value) -> str:
+    return str(value)
+
+
+def _decode(migration: DataMigration, value: str):
+    return uuid.UUID(value) if migration.key_type is uuid.UUID else int(value)
+
+
+async def _split(conn: AsyncConnection, migration: DataMigration) -> list[tuple]:
+    """Диапазоны (lower, upper] по ключу: UUID — равные доли 128-битного пространства, int — min..max."""
+    parts = max(1, migration.workers * migration.ranges_per_worker)
+    if migration.key_type is uuid.UUID:
+        bounds = [uuid.UUID(int=min(i * (_UUID_SPACE // parts), _UUID_SPACE - 1)) for i in range(parts)]
+        bounds.append(uuid.UUID(int=_UUID_SPACE - 1))
+        return list(zip(bounds, bounds[1:]))
+
+    table, key = _quote(migration.table), _quote(migration.key)
+    low, high = (await conn.execute(text(f"SELECT min({key}), max({key}) FROM {table}"))).one()
+    if low is None:
+        return []
+    low -= 1
+    step = max(1, -(-(high - low) // parts))
+    bounds = list(range(low, high, step)) + [high]
+    return list(zip(bounds, bounds[1:]))
+
+
+async def _load_ranges(engine: AsyncEngine, migration: DataMigration) -> tuple[list[dict], bool]:
+    """Чекпоинты миграции; при первом запуске — разбиение на диапазоны."""
+    async with engine.begin() as conn:
+        rows = (await conn.execute(
+            sa.select(checkpoints).where(checkpoints.c.migration == migration.name)
+            .order_by(checkpoints.c.range_no)
+        )).mappings().all()
+        if rows:
+            return [dict(r) for r in rows], True
+        ranges = await _split(conn, migration)
+        created = [
+            {
+                "migration": migration.name,
+                "range_no": i,
+                "lower": _encode(lower),
+                "upper": _encode(upper),
+                "position": _encode(lower),
+                "rows": 0,
+                "done": False,
+            }
+            for i, (lower, upper) in enumerate(ranges)
+        ]
+        if created:
+            await conn.execute(sa.insert(checkpoints), created)
+        return created, False
+
+
+class _Progress:
+    def __init__(self, migration: DataMigration, report: MigrationReport, ranges: int, done: int) -> None:
+        self.migration = migration
+        self.report = report
+        self.ranges = ranges
+        self.done = done
+        self.started = time.monotonic()
+
+    def line(self) -> str:
+        elapsed = time.monotonic() - self.started
+        rate = self.report.rows / elapsed if elapsed else 0.0
+        return (
+            f"  {self.migration.name}: {self.report.rows:,} строк, {rate:,.0f} строк/с, "
+            f"диапазонов {self.done}/{self.ranges}, повторов {self.report.retries}"
+        )
+
+
+async def _run_range(
+    engine: AsyncEngine,
+    migration: DataMigration,
+    checkpoint: dict,
+    throttle: Throttle,
+    report: MigrationReport,
+) -> None:
+    upper = _decode(migration, checkpoint["upper"])
+    position = _decode(migration, checkpoint["position"])
+    retries = 0
+    async with engine.connect() as conn:
+        while True:
+            await throttle.wait()
+            try:
+                async with conn.begin():
+                    await conn.execute(text(f"SET LOCAL lock_timeout = {int(migration.lock_timeout_ms)}"))
+                    await conn.execute(
+                        text(f"SET LOCAL statement_timeout = {int(migration.statement_timeout_ms)}")
+                    )
+                    bound = await next_bound(conn, migration, position, upper)
+                    rows = 0 if bound is None else await migration.process(conn, position, bound)
+                    finished = bound is None or bound == upper
+                    await conn.execute(
+                        checkpoints.update()
+                        .where(
+                            checkpoints.c.migration == migration.name,
+                            checkpoints.c.range_no == checkpoint["range_no"],
+                        )
+                        .values(
+                            position=_encode(upper if finished else bound),
+                            rows=checkpoints.c.rows + rows,
+                            done=finished,
+                            updated_at=sa.func.now(),
+                        )
+                    )
+            except DBAPIError as e:
+                if getattr(e.orig, "sqlstate", None) not in _RETRYABLE or retries >= migration.max_retries:
+                    raise
+                retries += 1
+                report.retries += 1
+                await asyncio.sleep(min(30.0, 0.1 * 2 ** retries))
+                continue
+
+            retries = 0
+            report.rows += rows
+            report.batches += 1
+            if finished:
+                return
+            position = bound
+
+
+async def run(
+    migration: DataMigration,
+    engine: AsyncEngine | None = None,
+    throttle: Throttle | None = None,
+    report_every: float = 5.0,
+) -> MigrationReport:
+    """Выполнить (или продолжить) миграцию; диапазоны — параллельно migration.workers задачами."""
+    if not migration.name or not migration.table:
+        raise ValueError("DataMigration needs name and table")
+    own_engine = engine is None
+    if engine is None:
+        engine = create_async_engine(
+            os.environ["DATABASE_URL"],
+            pool_size=migration.workers + 1,
+            max_overflow=1,
+        )
+    throttle = throttle or Throttle.from_env(engine)
+    report = MigrationReport(name=migration.name)
+    started = time.monotonic()
+    try:
+        ranges, report.resumed = await _load_ranges(engine, migration)
+        pending = [r for r in ranges if not r["done"]]
+        progress = _Progress(migration, report, len(ranges), len(ranges) - len(pending))
+        if not pending:
+            print(f"  {migration.name}: уже выполнена")
+            return report
+        if report.resumed:
+            print(f"  {migration.name}: продолжение, осталось диапазонов {len(pending)}/{len(ranges)}")
+
+        queue: asyncio.Queue[dict] = asyncio.Queue()
+        for checkpoint in pending:
+            queue.put_nowait(checkpoint)
+
+        async def worker() -> None:
+            while not queue.empty():
+                checkpoint = queue.get_nowait()
+                await _run_range(engine, migration, checkpoint, throttle, report)
+                progress.done += 1
+
+        async def reporter() -> None:
+            while True:
+                await asyncio.sleep(report_every)
+                print(progress.line())
+
+        reporting = asyncio.create_task(reporter())
+        try:
+            async with asyncio.TaskGroup() as tg:
+                for _ in range(min(migration.workers, len(pending))):
+                    tg.create_task(worker())
+        finally:
+            reporting.cancel()
+        report.seconds = time.monotonic() - started
+        print(progress.line())
+        print(
+            f"  {migration.name}: готово за {report.seconds:.1f} с, "
+            f"{report.rows_per_sec:,.0f} строк/с, пауз {throttle.paused:.0f} с"
+        )
+        return report
+    finally:
+        if own_engine:
+            await engine.dispose()
@@ -0,0 +1,419 @@
+"""
+Онлайн-изменения схемы больших таблиц: хелперы для ревизий Alembic и оценка
+блокировок для `scripts/migrate.py up --dry-run`.
+
+Ревизия выполняется в транзакции, и любая взятая блокировка держится до её
+конца. Хелперы выносят тяжёлые шаги из транзакции (autocommit) и дробят их:
+
+- create_index_concurrently / drop_index_concurrently: индекс строится без
+  блокировки записи; оставшийся от прерванной попытки INVALID-индекс
+  пересоздаётся;
+- add_unique_constraint: уникальный индекс CONCURRENTLY, затем
+  ADD CONSTRAINT ... USING INDEX;
+- add_not_null: CHECK (col IS NOT NULL) NOT VALID (мгновенно), VALIDATE
+  (проход по таблице без блокировки записи), SET NOT NULL (Postgres 12+
+  берёт доказательство из проверенного CHECK и не сканирует таблицу);
+- backfill: UPDATE keyset-батчами, каждый батч — своя транзакция с
+  lock_timeout / statement_timeout;
+- короткие DDL под ACCESS EXCLUSIVE выполняются с lock_timeout и повторами,
+  чтобы не вставать в очередь за долгим запросом и не блокировать всех за собой.
+
+    from migrations import online
+
+    def upgrade() -> None:
+        op.add_column("messages", sa.Column("lang", sa.String(8), nullable=True))
+        online.backfill("messages", "lang = 'en'", where="lang IS NULL")
+        online.add_not_null("messages", "lang")
+        online.create_index_concurrently("ix_messages_lang", "messages", ["lang"])
+
+В режиме --sql (и --dry-run) хелперы печатают те же шаги; backfill — одним
+UPDATE с пометкой `-- online.backfill`.
+"""
+import re
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterator, Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.exc import DBAPIError
+
+LOCK_TIMEOUT_MS = 2000
+STATEMENT_TIMEOUT_MS = 30_000
+LOCK_RETRIES = 10
+
+# SQLSTATE: lock_not_available (lock_timeout)
+_LOCK_NOT_AVAILABLE = "55P03"
+
+BACKFILL_MARK = "-- online.backfill"
+
+
+def _offline() -> bool:
+    return op.get_context().as_sql
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+@contextmanager
+def timeouts(lock_timeout_ms: int = LOCK_TIMEOUT_MS, statement_timeout_ms: int = 0) -> Iterator[None]:
+    """lock_timeout / statement_timeout на время блока (0 — без ограничения)."""
+    op.execute(f"SET lock_timeout = {int(lock_timeout_ms)}")
+    op.execute(f"SET statement_timeout = {int(statement_timeout_ms)}")
+    try:
+        yield
+    finally:
+        op.execute("RESET lock_timeout")
+        op.execute("RESET statement_timeout")
+
+
+def execute_with_lock_retries(
+    sql: str,
+    lock_timeout_ms: int = LOCK_TIMEOUT_MS,
+    retries: int = LOCK_RETRIES,
+) -> None:
+    """
+    Короткий DDL вне транзакции ревизии: ждёт блокировку не дольше
+    lock_timeout_ms, при неудаче повторяет с растущей паузой.
+    """
+    with op.get_context().autocommit_block(), timeouts(lock_timeout_ms):
+        if _offline():
+            op.execute(sql)
+            return
+        for attempt in range(retries + 1):
+            try:
+                op.execute(sql)
+                return
+            except DBAPIError as e:
+                if getattr(e.orig, "sqlstate", None) != _LOCK_NOT_AVAILABLE or attempt == retries:
+                    raise
+                time.sleep(min(10.0, 0.2 * 2 ** attempt))
+
+
+def create_index_concurrently(
+    name: str,
+    table: str,
+    columns: Sequence[str],
+    unique: bool = False,
+    where: str | None = None,
+    **kw,
+) -> None:
+    """CREATE INDEX CONCURRENTLY вне транзакции; INVALID-остаток прошлой попытки удаляется."""
+    with op.get_context().autocommit_block():
+        if not _offline():
+            valid = op.get_bind().scalar(
+                sa.text(
+                    "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                    "WHERE c.relname = :name AND pg_table_is_visible(c.oid)"
+                ),
+                {"name": name},
+            )
+            if valid is False:
+                op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+        op.create_index(
+            name,
+            table,
+            list(columns),
+            unique=unique,
+            postgresql_where=sa.text(where) if where else None,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+            **kw,
+        )
+
+
+def add_unique_constraint(name: str, table: str, columns: Sequence[str]) -> None:
+    """
+    UNIQUE-ограничение без долгой блокировки: уникальный индекс CONCURRENTLY,
+    затем ADD CONSTRAINT ... USING INDEX (мгновенно, индекс получает имя ограничения).
+    """
+    create_index_concurrently(name, table, columns, unique=True)
+    if not _offline():
+        exists = op.get_bind().scalar(
+            sa.text("SELECT 1 FROM pg_constraint WHERE conname = :name AND conrelid = to_regclass(:table)"),
+            {"name": name, "table": table},
+        )
+        if exists:
+            return
+    execute_with_lock_retries(
+        f"ALTER TABLE {_quote(table)} ADD CONSTRAINT {_quote(name)} UNIQUE USING INDEX {_quote(name)}"
+    )
+
+
+def drop_index_concurrently(name: str, table: str) -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+def validate_constraint(table: str, constraint: str) -> None:
+    """VALIDATE CONSTRAINT вне транзакции: SHARE UPDATE EXCLUSIVE, запись не блокируется."""
+    with op.get_context().autocommit_block(), timeouts(LOCK_TIMEOUT_MS):
+        op.execute(f"ALTER TABLE {_quote(table)} VALIDATE CONSTRAINT {_quote(constraint)}")
+
+
+def add_not_null(table: str, column: str, lock_timeout_ms: int = LOCK_TIMEOUT_MS) -> None:
+    """NOT NULL без долгой ACCESS EXCLUSIVE: NOT VALID CHECK, VALIDATE, SET NOT NULL."""
+    constraint = f"ck_{table}_{column}_not_null"[:63]
+    quoted_table, quoted_column = _quote(table), _quote(column)
+    execute_with_lock_retries(
+        f"ALTER TABLE {quoted_table} ADD CONSTRAINT {_quote(constraint)} "
+        f"CHECK ({quoted_column} IS NOT NULL) NOT VALID",
+        lock_timeout_ms,
+    )
+    validate_constraint(table, constraint)
+    execute_with_lock_retries(
+        f"ALTER TABLE {quoted_table} ALTER COLUMN {quoted_column} SET NOT NULL",
+        lock_timeout_ms,
+    )
+    execute_with_lock_retries(
+        f"ALTER TABLE {quoted_table} DROP CONSTRAINT {_quote(constraint)}",
+        lock_timeout_ms,
+    )
+
+
+def backfill(
+    table: str,
+    set_: str,
+    where: str = "TRUE",
+    key: str = "id",
+    batch_size: int = 5000,
+    lock_timeout_ms: int = LOCK_TIMEOUT_MS,
+    statement_timeout_ms: int = STATEMENT_TIMEOUT_MS,
+    pause: float = 0.0,
+) -> int:
+    """
+    UPDATE table SET set_ WHERE where — keyset-батчами по key, каждый батч
+    отдельной транзакцией. set_ и where — SQL; в set_ таблица доступна как t.
+    Для многочасовых заполнений — migrations/framework.py (чекпоинты,
+    параллельность).
+    """
+    quoted_table, quoted_key = _quote(table), _quote(key)
+    first = sa.text(_BACKFILL_SQL.format(table=quoted_table, key=quoted_key, set_=set_, where=where, after=""))
+    rest = sa.text(_BACKFILL_SQL.format(
+        table=quoted_table, key=quoted_key, set_=set_, where=where, after=f"AND {quoted_key} > :after"
+    ))
+    total, after = 0, None
+    with op.get_context().autocommit_block(), timeouts(lock_timeout_ms, statement_timeout_ms):
+        if _offline():
+            op.execute(f"{BACKFILL_MARK} batch_size={batch_size}\nUPDATE {quoted_table} t SET {set_} WHERE {where}")
+            return 0
+        bind = op.get_bind()
+        while True:
+            stmt, params = (first, {}) if after is None else (rest, {"after": after})
+            for attempt in range(LOCK_RETRIES + 1):
+                try:
+                    row = bind.execute(stmt, {**params, "limit": batch_size}).one()
+                    break
+                except DBAPIError as e:
+                    if getattr(e.orig, "sqlstate", None) != _LOCK_NOT_AVAILABLE or attempt == LOCK_RETRIES:
+                        raise
+                    time.sleep(min(10.0, 0.2 * 2 ** attempt))
+            if not row.updated:
+                break
+            total += row.updated
+            after = row.last_key
+            print(f"  {table}: обновлено {total:,} строк")
+            if pause:
+                time.sleep(pause)
+    return total
+
+
+_BACKFILL_SQL = """
+WITH batch AS (
+    SELECT {key} FROM {table}
+    WHERE ({where}) {after}
+    ORDER BY {key}
+    LIMIT :limit
+),
+updated AS (
+    UPDATE {table} t SET {set_}
+    FROM batch
+    WHERE t.{key} = batch.{key}
+    RETURNING t.{key} AS key
+)
+SELECT count(*) AS updated, (array_agg(key ORDER BY key DESC))[1] AS last_key
+FROM updated
+"""
+
+
+# -------- оценка блокировок (scripts/migrate.py up --dry-run) --------
+
+
+@dataclass
+class LockImpact:
+    sql: str
+    lock: str
+    # "чтение и запись" | "запись" | "ничего"
+    blocks: str
+    # Проход по таблице под блокировкой: "scan" | "rewrite" | "rows" | ""
+    work: str = ""
+    table: str | None = None
+    note: str = ""
+
+
+@dataclass
+class Transaction:
+    statements: list[LockImpact] = field(default_factory=list)
+    autocommit: bool = False
+
+
+_NAME = r'"?([\w.]+)"?'
+
+# (шаблон, блокировка, что блокирует, работа под блокировкой, примечание); первый подходящий
+_RULES = [
+    (rf"^{BACKFILL_MARK}", "ROW EXCLUSIVE", "ничего", "", "батчами, короткие блокировки строк"),
+    (r"^CREATE (UNIQUE )?INDEX CONCURRENTLY", "SHARE UPDATE EXCLUSIVE", "ничего", "scan", ""),
+    (r"^CREATE (UNIQUE )?INDEX", "SHARE", "запись", "scan", "используйте create_index_concurrently"),
+    (r"^DROP INDEX CONCURRENTLY", "SHARE UPDATE EXCLUSIVE", "ничего", "", ""),
+    (r"^DROP INDEX", "ACCESS EXCLUSIVE", "чтение и запись", "", "используйте drop_index_concurrently"),
+    (r"^ALTER TABLE .* VALIDATE CONSTRAINT", "SHARE UPDATE EXCLUSIVE", "ничего", "scan", ""),
+    (r"^ALTER TABLE .* ADD CONSTRAINT .* FOREIGN KEY .* NOT VALID", "SHARE ROW EXCLUSIVE", "запись", "", ""),
+    (r"^ALTER TABLE .* NOT VALID", "ACCESS EXCLUSIVE", "чтение и запись", "", ""),
+    (
+        r"^ALTER TABLE .* (ADD CONSTRAINT .* )?FOREIGN KEY",
+        "SHARE ROW EXCLUSIVE", "запись", "scan", "NOT VALID, затем validate_constraint",
+    ),
+    (r"^ALTER TABLE .* USING INDEX", "ACCESS EXCLUSIVE", "чтение и запись", "", ""),
+    (
+        r"^ALTER TABLE .* ADD (CONSTRAINT .* )?CHECK",
+        "ACCESS EXCLUSIVE", "чтение и запись", "scan", "NOT VALID, затем validate_constraint",
+    ),
+    (
+        r"^ALTER TABLE .* ADD (CONSTRAINT .* )?(UNIQUE|PRIMARY KEY)",
+        "ACCESS EXCLUSIVE", "чтение и запись", "scan",
+        "create_index_concurrently(unique=True), затем ADD CONSTRAINT ... USING INDEX",
+    ),
+    (
+        r"^ALTER TABLE .* ALTER (COLUMN )?\S+ (SET DATA )?TYPE ",
+        "ACCESS EXCLUSIVE", "чтение и запись", "rewrite", "перезапись таблицы",
+    ),
+    (
+        r"^ALTER TABLE .* SET NOT NULL",
+        "ACCESS EXCLUSIVE", "чтение и запись", "scan", "без скана только с проверенным CHECK (add_not_null)",
+    ),
+    (
+        r"^ALTER TABLE .* ADD (COLUMN )?.* DEFAULT .*(GEN_RANDOM_UUID|UUID_GENERATE_V4|RANDOM|CLOCK_TIMESTAMP|NEXTVAL)\s*\(",
+        "ACCESS EXCLUSIVE", "чтение и запись", "rewrite", "volatile DEFAULT перезаписывает таблицу",
+    ),
+    (r"^ALTER TABLE", "ACCESS EXCLUSIVE", "чтение и запись", "", ""),
+    (r"^DROP TABLE", "ACCESS EXCLUSIVE", "чтение и запись", "", ""),
+    (r"^TRUNCATE", "ACCESS EXCLUSIVE", "чтение и запись", "", ""),
+    (r"^CREATE (OR REPLACE )?(CONSTRAINT )?TRIGGER", "SHARE ROW EXCLUSIVE", "запись", "", ""),
+    (r"^DROP TRIGGER", "ACCESS EXCLUSIVE", "чтение и запись", "", ""),
+    (r"^(UPDATE|DELETE)", "ROW EXCLUSIVE", "запись", "rows", "одним запросом: используйте backfill"),
+    (r"^INSERT", "ROW EXCLUSIVE", "ничего", "", ""),
+    (r"^CREATE TABLE", "—", "ничего", "", "новая таблица"),
+]
+
+_NOT_NULL_CHECK = rf"ADD CONSTRAINT \S+ CHECK \({_NAME} IS NOT NULL\)"
+_SET_NOT_NULL = rf"ALTER COLUMN {_NAME} SET NOT NULL"
+
+_TABLE_PATTERNS = [
+    rf"^ALTER TABLE (?:IF EXISTS )?(?:ONLY )?{_NAME}",
+    rf"^CREATE (?:UNIQUE )?INDEX (?:CONCURRENTLY )?(?:IF NOT EXISTS )?{_NAME} ON (?:ONLY )?{_NAME}",
+    rf"^DROP INDEX (?:CONCURRENTLY )?(?:IF EXISTS )?{_NAME}",
+    rf"^DROP TABLE (?:IF EXISTS )?{_NAME}",
+    rf"^TRUNCATE (?:TABLE )?{_NAME}",
+    rf"^UPDATE {_NAME}",
+    rf"^DELETE FROM {_NAME}",
+    rf"^INSERT INTO {_NAME}",
+    rf"^CREATE (?:OR REPLACE )?(?:CONSTRAINT )?TRIGGER .* ON {_NAME}",
+    rf"^DROP TRIGGER (?:IF EXISTS )?{_NAME} ON {_NAME}",
+]
+
+
+def _table(sql: str, index_tables: dict[str, str]) -> str | None:
+    statement = sql.split("\n", 1)[1] if sql.startswith(BACKFILL_MARK) else sql
+    for pattern in _TABLE_PATTERNS:
+        match = re.search(pattern, statement, re.IGNORECASE | re.DOTALL)
+        if match is None:
+            continue
+        name = match.group(match.lastindex).split(".")[-1]
+        if pattern.startswith("^DROP INDEX"):
+            return index_tables.get(name)
+        return name
+    return None
+
+
+def classify(sql: str, index_tables: dict[str, str] | None = None) -> LockImpact | None:
+    """Блокировка одного оператора; None — оператор не берёт блокировок таблиц."""
+    normalized = " ".join(sql.split()) if not sql.startswith(BACKFILL_MARK) else sql
+    upper = normalized.upper()
+    if upper.startswith(("SET ", "RESET ", "SELECT ", "COMMENT ", "CREATE TYPE", "CREATE FUNCTION",
+                         "CREATE OR REPLACE FUNCTION", "DROP FUNCTION", "DROP TYPE")):
+        return None
+    if upper.startswith("UPDATE ALEMBIC_VERSION") or upper.startswith("INSERT INTO ALEMBIC_VERSION"):
+        return None
+    for pattern, lock, blocks, work, note in _RULES:
+        if re.search(pattern, normalized, re.IGNORECASE | re.DOTALL):
+            return LockImpact(normalized, lock, blocks, work, _table(normalized, index_tables or {}), note)
+    return LockImpact(normalized, "?", "?", "", _table(normalized, index_tables or {}), "не распознано")
+
+
+def analyze(sql: str, index_tables: dict[str, str] | None = None) -> list[Transaction]:
+    """SQL из `alembic upgrade --sql` -> транзакции с блокировками операторов."""
+    transactions = [Transaction(autocommit=True)]
+    # (таблица, колонка) с CHECK (col IS NOT NULL): SET NOT NULL после VALIDATE не сканирует
+    checked: set[tuple[str | None, str]] = set()
+    for raw in _statements(sql):
+        upper = raw.upper()
+        if upper in ("BEGIN", "START TRANSACTION"):
+            transactions.append(Transaction())
+            continue
+        if upper == "COMMIT":
+            transactions.append(Transaction(autocommit=True))
+            continue
+        impact = classify(raw, index_tables)
+        if impact is not None and (check := re.search(_NOT_NULL_CHECK, impact.sql, re.IGNORECASE)):
+            checked.add((impact.table, check.group(1)))
+        if impact is not None and (column := re.search(_SET_NOT_NULL, impact.sql, re.IGNORECASE)):
+            if (impact.table, column.group(1)) in checked:
+                impact.work, impact.note = "", "по проверенному CHECK, без скана"
+        if impact is not None:
+            transactions[-1].statements.append(impact)
+    return [t for t in transactions if t.statements]
+
+
+_DOLLAR_QUOTE = re.compile(r"\$(?:[A-Za-z_][A-Za-z_0-9]*)?\$")
+
+
+def _statements(sql: str) -> Iterator[str]:
+    """
+    Операторы, разделённые ';' вне строк, идентификаторов в кавычках и
+    $tag$-блоков (тела plpgsql). Комментарии отбрасываются, кроме пометок backfill.
+    """
+    buffer: list[str] = []
+    i, n = 0, len(sql)
+    while i < n:
+        char = sql[i]
+        if sql.startswith("--", i):
+            end = sql.find("\n", i)
+            end = n if end == -1 else end
+            if sql.startswith(BACKFILL_MARK, i):
+                buffer.append(sql[i:end])
+            i = end
+        elif char in "'\"":
+            # '' / "" внутри — экранированная кавычка: две половины подряд дают то же
+            end = sql.find(char, i + 1)
+            end = n if end == -1 else end + 1
+            buffer.append(sql[i:end])
+            i = end
+        elif char == "$" and (quote := _DOLLAR_QUOTE.match(sql, i)):
+            end = sql.find(quote.group(), quote.end())
+            end = n if end == -1 else end + len(quote.group())
+            buffer.append(sql[i:end])
+            i = end
+        elif char == ";":
+            statement = "".join(buffer).strip()
+            buffer = []
+            if statement:
+                yield statement
+            i += 1
+        else:
+            buffer.append(char)
+            i += 1
+    statement = "".join(buffer).strip()
+    if statement:
+        yield statement
@@ -2,8 +2,11 @@
 Запуск миграций: схемы (DDL) и данных (DML).
 
 Схемы — через Alembic.
-Данные — через модули в migrations/data_migrations/ с функцией migrate().
+Данные — через модули в migrations/data_migrations/: MIGRATION (DataMigration,
+см. migrations/framework.py — батчи, чекпоинты, параллельность) или функция
+migrate() для простых случаев.
 """
+import asyncio
 import importlib
 import os
 import sys
@@ -32,7 +35,9 @@ def run_schema_migrations() -> None:
 
 
 def run_data_migrations() -> None:
-    """Миграции данных (DML) — отдельно от схемы."""
+    """Миграции данных (DML) — отдельно от схемы. DataMigration продолжается с чекпоинта."""
+    if "DATABASE_URL" not in os.environ:
+        os.environ["DATABASE_URL"] = _default_database_url()
     data_migrations_dir = PROJECT_ROOT / "migrations" / "data_migrations"
 
     if not data_migrations_dir.exists():
@@ -43,7 +48,12 @@ def run_data_migrations() -> None:
             module_name = f"migrations.data_migrations.{filename[:-3]}"
             try:
                 module = importlib.import_module(module_name)
-                if hasattr(module, "migrate"):
+                if hasattr(module, "MIGRATION"):
+                    from migrations.framework import run
+
+                    print(f"Запуск миграции данных: {filename}")
+                    asyncio.run(run(module.MIGRATION))
+                elif hasattr(module, "migrate"):
                     print(f"Запуск миграции данных: {filename}")
                     module.migrate()
             except Exception as e:
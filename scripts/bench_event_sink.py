@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+"""
+Бенчмарк BufferedEventSink: событий в секунду от N конкурентных продюсеров.
+
+По умолчанию пишет в MemoryEventWriter (локальная замена ClickHouse);
+с --clickhouse — в events.log (переменные CLICKHOUSE_*).
+
+    python scripts/bench_event_sink.py --events 1000000 --producers 50
+    python scripts/bench_event_sink.py --clickhouse --events 200000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+
+def _row(tenant: str, integration: str, n: int) -> dict:
+    return {
+        "timestamp": datetime.now(timezone.utc),
+        "event_id": uuid.uuid4(),
+        "tenant_id": tenant,
+        "integration_id": integration,
+        "event_type": "telegram.message.received",
+        "external_id": str(n),
+    }
+
+
+async def run(args: argparse.Namespace) -> None:
+    from app.modules.events.sink import (
+        BufferedEventSink,
+        ClickHouseEventWriter,
+        MemoryEventWriter,
+    )
+
+    if args.clickhouse:
+        os.environ.setdefault("CLICKHOUSE_HOST", "localhost")
+        writer = ClickHouseEventWriter()
+    else:
+        writer = MemoryEventWriter()
+
+    spill_dir = tempfile.mkdtemp(prefix="event-sink-bench-")
+    sink = BufferedEventSink(
+        writer,
+        batch_size=args.batch_size,
+        flush_interval=args.flush_interval,
+        max_buffer=args.max_buffer,
+        spill_dir=spill_dir,
+    )
+    sink.start()
+
+    per_producer = args.events // args.producers
+    integration = str(uuid.uuid4())
+
+    async def producer(p: int) -> None:
+        tenant = f"tenant-{p % 10}"
+        for start in range(0, per_producer, args.commit_size):
+            # Один "коммит" = пачка событий одного запроса
+            await sink.wait_for_capacity()
+            n = min(args.commit_size, per_producer - start)
+            sink.add([_row(tenant, integration, start + i) for i in range(n)])
+            await asyncio.sleep(0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(producer(p) for p in range(args.producers)))
+    produced = time.perf_counter() - t0
+    await sink.close()
+    total = time.perf_counter() - t0
+
+    events = per_producer * args.producers
+    print(f"writer:           {writer.__class__.__name__}")
+    print(f"events:           {events}")
+    print(f"producers:        {args.producers} (по {args.commit_size} событий за add)")
+    print(f"produce:          {events / produced:,.0f} events/s")
+    print(f"end-to-end:       {events / total:,.0f} events/s ({total:.2f} s)")
+    if isinstance(writer, MemoryEventWriter):
+        print(f"batches written:  {len(writer.batches)}, rows: {writer.rows}")
+    spilled = list(Path(spill_dir).glob("*.ndjson"))
+    print(f"spill files left: {len(spilled)} ({spill_dir})")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Пропускная способность event sink")
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--producers", type=int, default=50)
+    parser.add_argument("--commit-size", type=int, default=1, help="Событий в одном add()")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--flush-interval", type=float, default=1.0)
+    parser.add_argument("--max-buffer", type=int, default=100_000)
+    parser.add_argument("--clickhouse", action="store_true", help="Писать в настоящий ClickHouse")
+    asyncio.run(run(parser.parse_args()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+"""
+Бенчмарк старта IntegrationRegistry: eager (импорт всех коннекторов) против
+lazy (чтение манифеста) на синтетических коннекторах.
+
+Каждый замер — в отдельном процессе, чтобы импорт был холодным.
+
+    python scripts/bench_integrations_discovery.py --connectors 50 --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import textwrap
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+PACKAGE = "bench_connectors"
+
+CONNECTOR_TEMPLATE = '''\
+from pydantic import BaseModel, Field
+
+from app.integrations.base import BaseIntegration
+from app.integrations.models import Event
+from app.integrations.specs import ActionSpec, EventSpec, SecretSpec
+
+from .client import Client
+
+
+class Send(BaseModel):
+    chat_id: str = Field(description="Chat id")
+    text: str = Field(description="Text")
+
+
+class Connector{n}(BaseIntegration):
+    name = "Synthetic {n}"
+    key = "synthetic_{n}"
+
+    secrets = [SecretSpec(name="token", description="Token")]
+    actions = [
+        ActionSpec(name="send", description="Send", model=Send, handler="send"),
+    ]
+    events = [EventSpec(name="synthetic_{n}.received", description="Incoming")]
+
+    def __init__(self, token: str):
+        self.client = Client(token)
+
+    async def handle_webhook(self, payload: dict) -> Event:
+        return Event(type="synthetic_{n}.received", payload=payload)
+
+    async def send(self, data: Send):
+        return None
+'''
+
+MEASURE = textwrap.dedent('''\
+    import json, resource, sys, time
+    from app.integrations.registry import IntegrationRegistry
+    lazy = sys.argv[1] == "lazy"
+    before = len(sys.modules)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    t0 = time.perf_counter()
+    registry = IntegrationRegistry("{package}")
+    registry.discover(lazy=lazy)
+    elapsed = time.perf_counter() - t0
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({{
+        "seconds": elapsed,
+        "rss_kib": rss_after - rss_before,
+        "modules": len(sys.modules) - before,
+        "known": len(registry.manifest()),
+    }}))
+''')
+
+
+def _client_source(n: int, functions: int) -> str:
+    """Имитация тяжёлого SDK: много определений на уровне модуля."""
+    body = [
+        "import asyncio, decimal, email.mime.text, json, xml.etree.ElementTree",
+        "",
+        "class Client:",
+        "    def __init__(self, token: str):",
+        "        self.token = token",
+        "",
+    ]
+    for i in range(functions):
+        body.append(f"def _op_{n}_{i}(x, y={i}):\n    return [x, y, {i!r}, str(x) * {i % 7}]\n")
+    return "\n".join(body)
+
+
+def build_package(root: Path, connectors: int, functions: int) -> None:
+    pkg = root / PACKAGE
+    pkg.mkdir()
+    for n in range(connectors):
+        sub = pkg / f"synthetic_{n}"
+        sub.mkdir()
+        (sub / "__init__.py").write_text(
+            f"from .connector import Connector{n}\n", encoding="utf-8"
+        )
+        (sub / "connector.py").write_text(CONNECTOR_TEMPLATE.format(n=n), encoding="utf-8")
+        (sub / "client.py").write_text(_client_source(n, functions), encoding="utf-8")
+
+
+def run(root: Path, mode: str, env: dict) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", MEASURE.format(package=PACKAGE), mode],
+        cwd=root,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Eager vs lazy discovery коннекторов")
+    parser.add_argument("--connectors", type=int, default=50)
+    parser.add_argument("--functions", type=int, default=400, help="Размер синтетического SDK")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        build_package(root, args.connectors, args.functions)
+
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join([str(root), str(PROJECT_ROOT)])
+
+        subprocess.run(
+            [sys.executable, str(PROJECT_ROOT / "scripts" / "build_integrations_manifest.py"),
+             "--package", PACKAGE],
+            cwd=root,
+            env=env,
+            check=True,
+            capture_output=True,
+        )
+
+        print(f"Коннекторов: {args.connectors}, прогонов: {args.runs}")
+        print(f"{'mode':<6} {'median ms':>10} {'min ms':>8} {'+RSS KiB':>9} {'modules':>8}")
+        for mode in ("eager", "lazy"):
+            run(root, mode, env)  # прогрев: .pyc уже скомпилированы, как в проде
+            results = [run(root, mode, env) for _ in range(args.runs)]
+            times = [r["seconds"] * 1000 for r in results]
+            print(
+                f"{mode:<6} {statistics.median(times):>10.1f} {min(times):>8.1f} "
+                f"{results[-1]['rss_kib']:>9} {results[-1]['modules']:>8}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+"""
+Бенчмарк накладных расходов RateLimitMiddleware на запрос (цель: < 50 мкс).
+
+Middleware вызывается напрямую как ASGI-приложение поверх пустого
+приложения; из времени вычитается вызов пустого приложения без middleware.
+Сценарии: путь без лимита, разрешённый запрос (много тенантов), отказ 429.
+
+    python scripts/bench_rate_limit.py --requests 200000 --tenants 10000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+
+async def _empty_app(scope, receive, send) -> None:
+    pass
+
+
+async def _receive():
+    return {"type": "http.request", "body": b""}
+
+
+async def _send(message) -> None:
+    pass
+
+
+async def _measure(app, scopes: list[dict]) -> float:
+    t0 = time.perf_counter()
+    for scope in scopes:
+        await app(scope, _receive, _send)
+    return (time.perf_counter() - t0) / len(scopes)
+
+
+def _scope(method: str, path: str) -> dict:
+    return {"type": "http", "method": method, "path": path, "headers": []}
+
+
+async def run(args: argparse.Namespace) -> None:
+    from app.api.ratelimits import build_limiter
+    from app.core.ratelimit import RateLimitMiddleware
+
+    n = args.requests
+    tenants = [str(uuid.uuid4()) for _ in range(args.tenants)]
+    scenarios = {
+        "без лимита (GET /api/tenants/)": [_scope("GET", "/api/tenants/")] * n,
+        "разрешён (webhook, много тенантов)": [
+            _scope("POST", f"/api/webhooks/telegram/{tenants[i % len(tenants)]}") for i in range(n)
+        ],
+        "отказ 429 (один тенант)": [_scope("POST", f"/api/webhooks/telegram/{tenants[0]}")] * n,
+    }
+
+    baseline = await _measure(_empty_app, scenarios["без лимита (GET /api/tenants/)"])
+    for name, scopes in scenarios.items():
+        # Свежий limiter: разрешённый сценарий не должен упираться в лимит
+        os.environ["RATE_LIMIT_WEBHOOKS"] = "1000000000,1000000000" if "разрешён" in name else "1,1"
+        middleware = RateLimitMiddleware(_empty_app, build_limiter())
+        await _measure(middleware, scopes[:1000])  # прогрев
+        per_request = await _measure(middleware, scopes) - baseline
+        print(f"{name:<40} {per_request * 1e6:8.2f} мкс/запрос")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Накладные расходы rate limit middleware")
+    parser.add_argument("--requests", type=int, default=200_000)
+    parser.add_argument("--tenants", type=int, default=10_000)
+    asyncio.run(run(parser.parse_args()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+"""Генерация манифеста коннекторов (app/integrations/connectors/manifest.json)."""
+import argparse
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Манифест коннекторов для ленивой загрузки в IntegrationRegistry",
+    )
+    parser.add_argument(
+        "--package",
+        default="app.integrations.connectors",
+        help="Пакет с коннекторами (по умолчанию: app.integrations.connectors)",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Только проверить, что манифест актуален (для CI)",
+    )
+    args = parser.parse_args()
+
+    from app.integrations import manifest
+
+    if args.check:
+        path = manifest.manifest_path(args.package)
+        expected = manifest.dumps(manifest.build_manifest(args.package))
+        actual = path.read_text(encoding="utf-8") if path.exists() else ""
+        if actual != expected:
+            print(
+                f"Манифест устарел: {path}. Выполните: make integrations-manifest",
+                file=sys.stderr,
+            )
+            return 1
+        print(f"OK: манифест актуален ({path})")
+        return 0
+
+    path = manifest.write_manifest(args.package)
+    print(f"Манифест записан: {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -16,13 +16,13 @@ if "DATABASE_URL" not in os.environ:
     )
 
 
-def get_config():
+def get_config(output_buffer=None):
     """Конфигурация Alembic."""
     from alembic.config import Config
 
     os.chdir(PROJECT_ROOT)
     config_file = PROJECT_ROOT / "alembic.ini"
-    return Config(str(config_file))
+    return Config(str(config_file), output_buffer=output_buffer)
 
 
 def cmd_up(revision: str) -> int:
@@ -33,6 +33,130 @@ def cmd_up(revision: str) -> int:
     return 0
 
 
+# Грубые скорости для оценки времени под блокировкой
+SCAN_BYTES_PER_SEC = 200 * 1024 * 1024
+REWRITE_BYTES_PER_SEC = 50 * 1024 * 1024
+UPDATE_ROWS_PER_SEC = 50_000
+
+
+async def _database_state() -> tuple[str | None, dict[str, tuple[int, int]], dict[str, str]]:
+    """Текущая ревизия, {таблица: (строк, байт)} и {индекс: таблица} из БД."""
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    engine = create_async_engine(os.environ["DATABASE_URL"])
+    try:
+        async with engine.connect() as conn:
+            has_version = await conn.scalar(text("SELECT to_regclass('alembic_version') IS NOT NULL"))
+            current = (
+                await conn.scalar(text("SELECT version_num FROM alembic_version")) if has_version else None
+            )
+            tables = {
+                row.relname: (max(int(row.reltuples), 0), row.size)
+                for row in await conn.execute(text(
+                    "SELECT c.relname, c.reltuples, pg_table_size(c.oid) AS size FROM pg_class c "
+                    "WHERE c.relkind IN ('r', 'p') AND c.relnamespace = current_schema()::regnamespace"
+                ))
+            }
+            indexes = {
+                row.indexname: row.tablename
+                for row in await conn.execute(text(
+                    "SELECT indexname, tablename FROM pg_indexes WHERE schemaname = current_schema()"
+                ))
+            }
+    finally:
+        await engine.dispose()
+    return current, tables, indexes
+
+
+def _estimate(impact, tables: dict[str, tuple[int, int]]) -> float | None:
+    """Секунды работы под блокировкой; None — размер таблицы неизвестен."""
+    if not impact.work:
+        return 0.0
+    if impact.table not in tables:
+        return None
+    rows, size = tables[impact.table]
+    if impact.work == "rewrite":
+        return size / REWRITE_BYTES_PER_SEC
+    if impact.work == "rows":
+        return rows / UPDATE_ROWS_PER_SEC
+    return size / SCAN_BYTES_PER_SEC
+
+
+def _format_seconds(seconds: float | None) -> str:
+    if seconds is None:
+        return "?"
+    if seconds < 1:
+        return "<1 с"
+    return f"~{seconds:,.0f} с" if seconds < 120 else f"~{seconds / 60:,.0f} мин"
+
+
+def cmd_dry_run(revision: str, from_revision: str | None) -> int:
+    """Оценка блокировок непримененных ревизий без изменения БД."""
+    import asyncio
+    import io
+
+    from alembic import command
+    from alembic.script import ScriptDirectory
+
+    from migrations import online
+
+    tables: dict[str, tuple[int, int]] = {}
+    indexes: dict[str, str] = {}
+    current = from_revision
+    try:
+        db_current, tables, indexes = asyncio.run(_database_state())
+        if current is None:
+            current = db_current
+    except Exception as e:
+        print(f"БД недоступна ({e}): оценка без размеров таблиц", file=sys.stderr)
+
+    script = ScriptDirectory.from_config(get_config())
+    pending = list(reversed(list(script.iterate_revisions(revision, current or "base"))))
+    if not pending:
+        print(f"Нет непримененных ревизий (текущая: {current or 'base'})")
+        return 0
+
+    print(f"Текущая ревизия: {current or 'base'}, к применению: {len(pending)}")
+    for script_revision in pending:
+        print(f"\n{script_revision.revision}: {script_revision.doc}")
+        buffer = io.StringIO()
+        config = get_config(buffer)
+        config.attributes["configure_logger"] = False
+        down = script_revision.down_revision or "base"
+        try:
+            command.upgrade(config, f"{down}:{script_revision.revision}", sql=True)
+        except Exception as e:
+            print(f"  SQL не построить без подключения ({type(e).__name__}: {e}); проверьте вручную")
+            continue
+
+        for transaction in online.analyze(buffer.getvalue(), indexes):
+            held = 0.0
+            blocking = set()
+            for impact in transaction.statements:
+                seconds = _estimate(impact, tables)
+                size = ""
+                if impact.table in tables:
+                    rows, size_bytes = tables[impact.table]
+                    size = f" [{rows:,} строк, {size_bytes / 1024 / 1024:,.0f} МБ]"
+                print(f"  {impact.lock:<22} блокирует: {impact.blocks:<15} {_format_seconds(seconds):>8}  "
+                      f"{impact.table or '?'}{size}")
+                print(f"      {impact.sql.splitlines()[-1][:100]}")
+                if impact.note:
+                    print(f"      ! {impact.note}")
+                if impact.blocks != "ничего":
+                    blocking.add(impact.table or "?")
+                held = held + seconds if held is not None and seconds is not None else None
+            # Блокировки держатся, пока идёт работа следующих операторов
+            busy = any(i.work or i.lock == "?" for i in transaction.statements)
+            if not transaction.autocommit and blocking and busy and len(transaction.statements) > 1:
+                print(
+                    f"  ! в одной транзакции: блокировки {', '.join(sorted(blocking))} "
+                    f"держатся до COMMIT ({_format_seconds(held)})"
+                )
+    return 0
+
+
 def cmd_down(revision: str) -> int:
     """Откатить миграции."""
     from alembic import command
@@ -85,6 +209,7 @@ def main() -> int:
 Примеры:
   python scripts/migrate.py up              # Применить все миграции
   python scripts/migrate.py up --revision head
+  python scripts/migrate.py up --dry-run    # Оценить блокировки, ничего не применяя
   python scripts/migrate.py production      # Схема + данные (для продакшена)
   python scripts/migrate.py down            # Откатить последнюю миграцию
   python scripts/migrate.py create "add users table"
@@ -102,7 +227,22 @@ def main() -> int:
         default="head",
         help="Целевая ревизия (по умолчанию: head)",
     )
-    up_parser.set_defaults(handler=lambda ns: cmd_up(ns.revision))
+    up_parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Не применять: показать блокировки и время работы под ними",
+    )
+    up_parser.add_argument(
+        "--from",
+        dest="from_revision",
+        default=None,
+        help="Текущая ревизия для --dry-run, если БД недоступна",
+    )
+    up_parser.set_defaults(
+        handler=lambda ns: cmd_dry_run(ns.revision, ns.from_revision)
+        if ns.dry_run
+        else cmd_up(ns.revision)
+    )
 
     # down - откатить миграции
     down_parser = subparsers.add_parser("down", help="Откатить миграции")
@@ -0,0 +1,169 @@
+"""Agent directory stays consistent after agent writes, in this worker and in others."""
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.modules.agents import cache
+from app.modules.agents.cache import AgentDirectory, directory
+from app.modules.agents.models import Agent, AgentNature
+from app.modules.agents.schemas import AgentCreate, AgentUpdate
+from app.modules.agents.service import AgentService
+from app.modules.threads import models as _threads_models  # noqa: F401  (Agent relationships)
+
+
+class FakeSession(AsyncSession):
+    """
+    Real session and transaction (so on_commit hooks run on commit and are
+    dropped on rollback) without a database: statements are recorded and rows
+    come from `rows`.
+    """
+
+    def __init__(self, rows: list[Agent] = ()) -> None:
+        super().__init__()
+        self.sync_session.begin()
+        self.rows = {row.id: row for row in rows}
+        self.statements: list[tuple[str, dict]] = []
+
+    async def execute(self, statement, params=None, **kw):
+        self.statements.append((str(statement), params or {}))
+
+    def add(self, instance, _warn=True) -> None:
+        instance.id = instance.id or uuid.uuid4()
+        self.rows[instance.id] = instance
+
+    async def get(self, entity, ident, **kw):
+        return self.rows.get(ident)
+
+    async def flush(self, objects=None) -> None:
+        pass
+
+    async def refresh(self, instance, *args, **kw) -> None:
+        pass
+
+    def notifications(self, channel: str) -> list[str]:
+        return [
+            params["payload"]
+            for sql, params in self.statements
+            if "pg_notify" in sql and params.get("channel") == channel
+        ]
+
+
+@pytest.fixture(autouse=True)
+def clear_directory():
+    directory.clear()
+    yield
+    directory.clear()
+
+
+def make_agent(tenant_id: uuid.UUID | None, nature: AgentNature = AgentNature.System) -> Agent:
+    return Agent(id=uuid.uuid4(), tenant_id=tenant_id, first_name="Bot", second_name="", nature=nature)
+
+
+def cache_agent(target: AgentDirectory, agent: Agent) -> None:
+    generation = target.generation
+    target.put(cache.by_id(agent.id), agent, generation)
+    target.put(cache.by_tenant(agent.tenant_id, agent.nature), agent, generation)
+
+
+async def rename(agent: Agent, session: FakeSession) -> None:
+    """AgentService.update with the cached copy, as the router passes it."""
+    cached = directory.get(cache.by_id(agent.id))
+    await AgentService(session).update(cached, AgentUpdate(first_name="Renamed"))
+
+
+def test_update_evicts_once_committed():
+    agent = make_agent(uuid.uuid4())
+    cache_agent(directory, agent)
+    session = FakeSession([agent])
+
+    async def scenario():
+        await rename(agent, session)
+        # Not committed yet: other requests keep reading the committed row
+        assert directory.get(cache.by_id(agent.id)).first_name == "Bot"
+        await session.commit()
+
+    asyncio.run(scenario())
+
+    assert directory.get(cache.by_id(agent.id)) is None
+    assert directory.get(cache.by_tenant(agent.tenant_id, AgentNature.System)) is None
+
+
+def test_rolled_back_update_keeps_cache():
+    agent = make_agent(uuid.uuid4())
+    cache_agent(directory, agent)
+    session = FakeSession([agent])
+
+    async def scenario():
+        await rename(agent, session)
+        await session.rollback()
+
+    asyncio.run(scenario())
+
+    assert directory.get(cache.by_id(agent.id)).first_name == "Bot"
+
+
+def test_create_evicts_cached_missing_agent():
+    """A tenant cached as having no human agent sees the one created for it."""
+    tenant_id = uuid.uuid4()
+    key = cache.by_tenant(tenant_id, AgentNature.Human)
+    directory.put(key, None, directory.generation)
+    session = FakeSession()
+
+    async def scenario():
+        await AgentService(session).create(tenant_id, AgentCreate(first_name="User", nature=AgentNature.Human))
+        await session.commit()
+
+    asyncio.run(scenario())
+
+    assert directory.get(key) is None
+
+
+def test_update_notifies_other_workers():
+    """The NOTIFY sent in the writer's transaction evicts the agent in another worker's directory."""
+    agent = make_agent(uuid.uuid4(), AgentNature.Human)
+    other_worker = AgentDirectory(maxsize=100, ttl=None)
+    cache_agent(other_worker, agent)
+    cache_agent(directory, agent)
+    session = FakeSession([agent])
+
+    async def scenario():
+        await rename(agent, session)
+        await session.commit()
+
+    asyncio.run(scenario())
+
+    [payload] = session.notifications(cache.CHANNEL)
+    # The callback app.modules.agents.bootstrap registers with the listener
+    other_worker.on_notify(payload)
+
+    assert other_worker.get(cache.by_id(agent.id)) is None
+    assert other_worker.get(cache.by_tenant(agent.tenant_id, AgentNature.Human)) is None
+
+
+def test_read_racing_update_is_not_cached():
+    agent = make_agent(uuid.uuid4())
+    session = FakeSession([agent])
+    generation = directory.generation  # a read starts
+
+    async def scenario():
+        await AgentService(session).update(agent, AgentUpdate(first_name="Renamed"))
+        await session.commit()
+
+    asyncio.run(scenario())
+    directory.put(cache.by_id(agent.id), make_agent(agent.tenant_id), generation)  # and finishes late
+
+    assert directory.get(cache.by_id(agent.id)) is None
+
+
+def test_reconnect_hook_clears_directory():
+    """Notifications sent while the listener was down are lost: its on_reconnect hook clears everything."""
+    agent = make_agent(uuid.uuid4())
+    cache_agent(directory, agent)
+    directory.put_origin_ids(agent.tenant_id, {("telegram", "42"): agent.id})
+
+    directory.clear()
+
+    assert directory.get(cache.by_id(agent.id)) is None
+    assert directory.origin_ids(agent.tenant_id, [("telegram", "42")]) == ({}, [("telegram", "42")])
@@ -0,0 +1,54 @@
+"""iter_json_items: JSON arrays, NDJSON and single multi-line values."""
+import asyncio
+import json
+
+import pytest
+
+from app.core.jsonstream import ItemTooLarge, JSONStreamError, iter_json_items
+
+
+def parse(body: bytes, chunk_size: int = 3, **kw) -> list:
+    async def chunks():
+        for i in range(0, len(body), chunk_size):
+            yield body[i:i + chunk_size]
+
+    async def collect():
+        return [item async for item in iter_json_items(chunks(), **kw)]
+
+    return asyncio.run(collect())
+
+
+def test_array():
+    assert parse(b' [{"a": 1}, 4.5, "x"] ') == [{"a": 1}, 4.5, "x"]
+
+
+def test_invalid_array_raises():
+    with pytest.raises(JSONStreamError):
+        parse(b'[{"a": 1} {"b": 2}]')
+
+
+def test_ndjson_reports_bad_lines_individually():
+    items = parse(b'{"a": 1}\nnot json\n{"b": 2}\n')
+
+    assert items[0] == {"a": 1}
+    assert isinstance(items[1], json.JSONDecodeError)
+    assert items[2] == {"b": 2}
+
+
+def test_pretty_printed_object_is_one_item():
+    assert parse(b'{\n  "a": 1,\n  "b": [1, 2]\n}\n') == [{"a": 1, "b": [1, 2]}]
+
+
+def test_invalid_multiline_body_raises_once():
+    with pytest.raises(JSONStreamError):
+        parse(b'{\n  "a": 1,\n}\n')
+
+
+def test_several_pretty_printed_objects_raise():
+    with pytest.raises(JSONStreamError):
+        parse(b'{\n  "a": 1\n}\n{\n  "b": 2\n}\n')
+
+
+def test_single_value_size_is_bounded():
+    with pytest.raises(ItemTooLarge):
+        parse(b'{\n  "a": "' + b"x" * 100 + b'"\n}', max_item_bytes=50)
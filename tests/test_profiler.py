@@ -0,0 +1,59 @@
+"""query_budget(): statement counting and the QueryBudgetExceeded paths."""
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.core.profiler import QueryBudgetExceeded, query_budget
+
+
+@pytest.fixture
+def engine():
+    # install() only needs .sync_engine; no async SQLite driver is required
+    sync_engine = create_engine("sqlite://")
+    yield SimpleNamespace(sync_engine=sync_engine)
+    sync_engine.dispose()
+
+
+def run(engine, *statements: str, params: list[dict] | None = None) -> None:
+    with engine.sync_engine.connect() as conn:
+        for i, sql in enumerate(statements):
+            conn.execute(text(sql), params[i] if params else {})
+
+
+def test_within_budget(engine):
+    with query_budget(2, engine=engine) as profile:
+        run(engine, "SELECT 1", "SELECT 2")
+
+    assert profile.count == 2
+    assert set(profile.statements) == {"SELECT 1", "SELECT 2"}
+
+
+def test_too_many_queries(engine):
+    with pytest.raises(QueryBudgetExceeded, match="3 queries, budget 2"):
+        with query_budget(2, engine=engine):
+            run(engine, "SELECT 1", "SELECT 2", "SELECT 3")
+
+
+def test_repeated_statement(engine):
+    """The same SQL with different parameters is one statement run several times (N+1)."""
+    with pytest.raises(QueryBudgetExceeded, match="repeated more than 1 times") as exc:
+        with query_budget(10, max_repeats=1, engine=engine):
+            run(engine, *["SELECT :n"] * 3, params=[{"n": n} for n in range(3)])
+
+    assert "3x" in str(exc.value)
+
+
+def test_error_in_block_is_not_masked(engine):
+    with pytest.raises(ZeroDivisionError):
+        with query_budget(0, engine=engine):
+            run(engine, "SELECT 1")
+            1 / 0
+
+
+def test_stops_counting_after_exit(engine):
+    with query_budget(1, engine=engine) as profile:
+        run(engine, "SELECT 1")
+    run(engine, "SELECT 2", "SELECT 3")
+
+    assert profile.count == 1